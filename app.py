@@ -1,15 +1,19 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import (Flask, Response, render_template, request, jsonify, send_file,
+                   stream_with_context)
 import os
 import sys
 from pathlib import Path
 from dotenv import load_dotenv
 import threading
+import asyncio
 import json
+from collections import OrderedDict
 from datetime import datetime
 import io
 import contextlib
 import zipfile
-import tempfile
+import hashlib
+import shutil
 
 # Add the src directory to the path
 app_dir = os.path.dirname(os.path.abspath(__file__))
@@ -20,7 +24,17 @@ sys.path.insert(0, src_dir)
 lpg_dir = os.path.join(src_dir, 'landing_page_generator')
 sys.path.insert(0, lpg_dir)
 
-from landing_page_generator.crew import LandingPageCrew
+from code_index import FileIndex
+from instrumentation import Trace, metrics, use_trace
+from jobs import JobManager, JobQueueFull
+from llm_cache import get_llm_cache, llm_cache_enabled
+from log_store import capture_output
+from manifest import MANIFEST_NAME
+from materialize import materialize_tree
+from tool_cache import get_tool_cache, tool_cache_enabled
+from workspace import Workspace
+
+from landing_page_generator.crew import DEFAULT_CONTENT_CONCURRENCY, LandingPageCrew
 
 load_dotenv()
 
@@ -31,22 +45,32 @@ app.config['UPLOAD_FOLDER'] = 'uploads'
 # Create uploads folder if it doesn't exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
-# Store execution status
-execution_status = {
-    'running': False,
-    'progress': 0,
-    'status': 'idle',
-    'error': None,
-    'idea': None
-}
-
-# Store agent logs for real-time viewing
-agent_logs = []
-log_lock = threading.Lock()
+# Generation jobs: each one has its own id, status, logs and output directory
+JOBS_DIR = Path(os.getenv('JOBS_DIR', os.path.join(app_dir, 'jobs')))
+GENERATION_WORKERS = int(os.getenv('GENERATION_WORKERS', '2'))
+MAX_QUEUED_JOBS = int(os.getenv('MAX_QUEUED_JOBS', '100'))
+MAX_FINISHED_JOBS = int(os.getenv('MAX_FINISHED_JOBS', '100'))
+FINISHED_JOB_TTL = int(os.getenv('FINISHED_JOB_TTL', '0'))
+GENERATION_MODE = os.getenv('GENERATION_MODE', 'threads').strip().lower()
+SSE_HEARTBEAT_SECONDS = 15
+TRACE_NAME = 'trace.json'
+# (metric, type, DiskCache.stats() field, help) reported per cache
+CACHE_METRICS = (
+    ('lpg_cache_hits_total', 'counter', 'hits', 'Cache lookups answered by the cache'),
+    ('lpg_cache_misses_total', 'counter', 'misses', 'Cache lookups that missed'),
+    ('lpg_cache_evictions_total', 'counter', 'evictions',
+     'Entries evicted to stay within the size bounds'),
+    ('lpg_cache_entries', 'gauge', 'entries', 'Entries stored in the cache'),
+    ('lpg_cache_bytes', 'gauge', 'bytes', 'Bytes stored in the cache'),
+)
 
 @app.after_request
 def add_cache_headers(response):
     """Add cache busting headers"""
+    if response.headers.get('ETag'):
+        # Let clients keep ETagged responses but revalidate them every time
+        response.headers['Cache-Control'] = 'no-cache, max-age=0'
+        return response
     response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
     response.headers['Pragma'] = 'no-cache'
     response.headers['Expires'] = '0'
@@ -58,13 +82,9 @@ def index():
     return render_template('index.html')
 
 @app.route('/api/generate', methods=['POST'])
+@app.route('/api/jobs', methods=['POST'])
 def generate_landing_page():
-    """Generate a landing page from an idea"""
-    global execution_status, agent_logs
-    
-    if execution_status['running']:
-        return jsonify({'error': 'Generation already in progress'}), 400
-    
+    """Queue a landing page generation for an idea"""
     data = request.get_json()
     idea = data.get('idea', '').strip()
     
@@ -74,157 +94,212 @@ def generate_landing_page():
     if len(idea) < 5:
         return jsonify({'error': 'Idea must be at least 5 characters long'}), 400
     
-    # Start generation in background thread
-    execution_status['running'] = True
-    execution_status['progress'] = 0
-    execution_status['status'] = 'Starting generation...'
-    execution_status['error'] = None
-    execution_status['idea'] = idea
+    try:
+        priority = int(data.get('priority', 0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Priority must be an integer'}), 400
     
-    # Clear previous logs
-    with log_lock:
-        agent_logs = []
+    # Iterating on a finished job reuses whatever its inputs still match
+    base_job_id = data.get('base_job')
+    if base_job_id:
+        base_job = job_manager.get(base_job_id)
+        if base_job is None or base_job.state != 'completed':
+            return jsonify(
+                {'error': f'Base job {base_job_id} is not a completed job'}), 400
     
-    thread = threading.Thread(target=_generate_in_background, args=(idea,))
-    thread.daemon = True
-    thread.start()
+    try:
+        job = job_manager.submit(idea, priority=priority, base_job_id=base_job_id)
+    except JobQueueFull as e:
+        return jsonify({'error': str(e)}), 503
     
-    return jsonify({'message': 'Generation started', 'idea': idea}), 202
-
-def _generate_in_background(idea):
-    """Generate landing page in background"""
-    global execution_status, agent_logs
+    job.log('System', '🕒 Job queued', 'info')
     
+    return jsonify({
+        'message': 'Generation started',
+        'idea': idea,
+        'job_id': job.id,
+        'queue_position': job_manager.queue_position(job)
+    }), 202
+
+def _generate_in_background(job):
+    """Generate a landing page for a queued job"""
     try:
-        execution_status['status'] = 'Starting generation...'
-        execution_status['progress'] = 5
-        execution_status['running'] = True
-        _log_agent('System', '🚀 Starting Landing Page Generation Process', 'info')
-        _log_agent('System', f'📝 Idea: {idea}', 'info')
-        
-        # Change to the correct working directory
-        src_dir = os.path.join(os.path.dirname(__file__), 'src', 'landing_page_generator')
-        os.chdir(src_dir)
-        
-        _log_agent('System', '🔧 Initializing AI Crew with Gemini Model', 'info')
-        execution_status['progress'] = 15
-        
-        _log_agent('System', '📋 Phase 1: Expanding your idea with AI analysis...', 'thinking')
-        execution_status['status'] = 'Expanding idea...'
-        execution_status['progress'] = 25
-        
-        # Initialize crew
-        try:
-            crew = LandingPageCrew(idea)
-            _log_agent('System', '✅ Crew initialized successfully', 'success')
-        except Exception as e:
-            _log_agent('System', f'⚠️ Warning initializing crew: {str(e)[:200]}', 'info')
-        
-        _log_agent('System', '🎯 Running AI workflow (this may take 5-15 minutes)...', 'thinking')
-        execution_status['progress'] = 40
-        
-        try:
-            print(f"\n{'='*60}\n🤖 STARTING CREW WORKFLOW\n{'='*60}\n")
-            result = crew.run()
-            _log_agent('System', '✅ Crew workflow completed successfully', 'success')
-            print(f"\n{'='*60}\n✅ WORKFLOW COMPLETE\n{'='*60}\n")
-        except Exception as crew_error:
-            error_str = str(crew_error)
-            print(f"\n❌ Crew Error: {error_str}\n")
-            _log_agent('System', f'❌ Crew Error: {error_str[:300]}', 'error')
-            raise
-        
-        execution_status['progress'] = 80
-        _log_agent('System', '📦 Packaging generated files...', 'info')
-        execution_status['status'] = 'Finalizing...'
-        
-        # Check if workdir.zip was created
-        import time
-        time.sleep(1)  # Give file system time to sync
-        
-        if os.path.exists('workdir.zip'):
-            _log_agent('System', '✨ Landing page generated successfully!', 'success')
-            execution_status['status'] = 'completed'
-            execution_status['progress'] = 100
-            execution_status['running'] = False
-            print("\n✅ Generation complete! Download your landing page.")
-        else:
-            # If no zip, create generic template
-            _log_agent('System', '⚠️ No generated output found, creating generic template...', 'info')
-            execution_status['status'] = 'completed'
-            execution_status['progress'] = 100
-            execution_status['running'] = False
-            print("\n✅ Generation complete! Download will provide generic template.")
-            
+        crew = _start_generation(job)
+        with _crew_workflow(job):
+            crew.run()
+        _finish_generation(job)
     except Exception as e:
-        error_msg = str(e)
-        print(f"\n❌ ERROR: {error_msg}\n")
-        import traceback
-        traceback.print_exc()
-        
-        _log_agent('System', f'❌ Generation Error: {error_msg[:300]}', 'error')
-        execution_status['error'] = error_msg
-        execution_status['status'] = 'error'
-        execution_status['progress'] = 0
-        execution_status['running'] = False
-
-
-def _log_agent(agent_name, message, level='info'):
-    """Add a log message from an agent"""
-    global agent_logs
-    with log_lock:
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'agent': agent_name,
-            'message': message,
-            'level': level
-        }
-        agent_logs.append(log_entry)
-        # Keep only last 1000 logs
-        if len(agent_logs) > 1000:
-            agent_logs = agent_logs[-1000:]
+        _fail_generation(job, e)
 
-def _create_generic_ecommerce_template():
-    """Create a generic e-commerce React landing page template as ZIP"""
+async def _agenerate_in_background(job):
+    """Generate a landing page for a queued job on the job manager's event loop"""
+    try:
+        # Seeding from a base job copies files, keep it off the loop
+        crew = await asyncio.to_thread(_start_generation, job)
+        with _crew_workflow(job):
+            await crew.arun()
+        _finish_generation(job)
+    except Exception as e:
+        _fail_generation(job, e)
+
+def _start_generation(job):
+    """Prepare the workspace of a job and build its crew"""
+    idea = job.idea
     
-    # Create a temporary directory
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        
-        # Create project structure
-        src_dir = temp_path / 'src'
-        src_dir.mkdir()
-        (temp_path / 'public').mkdir()
-        
-        # package.json
-        package_json = {
-            "name": "ecommerce-landing-page",
-            "version": "1.0.0",
-            "description": "Generic E-Commerce Landing Page",
-            "private": True,
-            "dependencies": {
-                "react": "^18.2.0",
-                "react-dom": "^18.2.0",
-                "react-scripts": "5.0.1"
-            },
-            "scripts": {
-                "start": "react-scripts start",
-                "build": "react-scripts build",
-                "deploy": "npm run build && vercel --prod"
-            },
-            "eslintConfig": {
-                "extends": ["react-app"]
-            },
-            "browserslist": {
-                "production": [">0.2%", "not dead", "not op_mini all"],
-                "development": ["last 1 chrome version", "last 1 firefox version", "last 1 safari version"]
-            }
+    job.update(status='Starting generation...', progress=5)
+    job.trace = Trace(
+        job.id, on_progress=lambda done, total: _trace_progress(job, done, total))
+    _log_agent(job, 'System', '🚀 Starting Landing Page Generation Process', 'info')
+    _log_agent(job, 'System', f'📝 Idea: {idea}', 'info')
+    
+    _log_agent(job, 'System', '🔧 Initializing AI Crew with Gemini Model', 'info')
+    
+    _log_agent(job, 'System', '📋 Phase 1: Expanding your idea with AI analysis...',
+               'thinking')
+    job.update(status='Expanding idea...')
+    
+    workspace = Workspace(job.output_dir)
+    if job.base_job_id:
+        _seed_from_base_job(job, workspace)
+    
+    # Each job runs in its own workspace, so no process-wide chdir. A crew
+    # that cannot be built fails the job with its own error
+    crew = LandingPageCrew(idea, workspace=workspace,
+                           on_phase=lambda *args: _record_phase(job, *args),
+                           incremental=bool(job.base_job_id))
+    _log_agent(job, 'System', '✅ Crew initialized successfully', 'success')
+    
+    _log_agent(job, 'System', '🎯 Running AI workflow (this may take 5-15 minutes)...',
+               'thinking')
+    return crew
+
+def _trace_progress(job, done, total):
+    """Progress from the crew steps completed so far, 5% to 95%"""
+    job.update(progress=5 + int(90 * done / total))
+
+@contextlib.contextmanager
+def _crew_workflow(job):
+    """Run the crew workflow of a job with its output captured in the job's logs"""
+    try:
+        print(f"\n{'='*60}\n🤖 STARTING CREW WORKFLOW\n{'='*60}\n")
+        # Surface the agents' verbose output in the job's logs
+        with capture_output(lambda line: _log_agent(job, 'Crew', line, 'output')), \
+                use_trace(job.trace):
+            yield
+        _log_agent(job, 'System', '✅ Crew workflow completed successfully', 'success')
+        print(f"\n{'='*60}\n✅ WORKFLOW COMPLETE\n{'='*60}\n")
+    except Exception as crew_error:
+        error_str = str(crew_error)
+        print(f"\n❌ Crew Error: {error_str}\n")
+        _log_agent(job, 'System', f'❌ Crew Error: {error_str[:300]}', 'error')
+        raise
+
+def _finish_generation(job):
+    job.update(status='Finalizing...')
+    _log_agent(job, 'System', '📦 Packaging generated files...', 'info')
+    
+    if job.workdir.exists() and any(job.workdir.iterdir()):
+        _log_agent(job, 'System', '✨ Landing page generated successfully!', 'success')
+        print("\n✅ Generation complete! Download your landing page.")
+    else:
+        # If no output, the download provides the generic template
+        _log_agent(job, 'System',
+                   '⚠️ No generated output found, creating generic template...', 'info')
+        print("\n✅ Generation complete! Download will provide generic template.")
+    _save_trace(job)
+    job.update(state='completed', status='completed', progress=100)
+
+def _fail_generation(job, e):
+    error_msg = str(e)
+    print(f"\n❌ ERROR: {error_msg}\n")
+    import traceback
+    traceback.print_exc()
+    
+    _log_agent(job, 'System', f'❌ Generation Error: {error_msg[:300]}', 'error')
+    _save_trace(job)
+    job.update(state='error', status='error', error=error_msg, progress=0)
+
+def _save_trace(job):
+    if job.trace is None:
+        return
+    try:
+        job.trace.save(job.output_dir / TRACE_NAME)
+    except OSError as e:
+        print(f"⚠️ Could not save the trace of job {job.id}: {e}")
+
+
+def _seed_from_base_job(job, workspace):
+    """Start a job from the files and manifest of the job it iterates on"""
+    base_job = job_manager.get(job.base_job_id)
+    if base_job.workdir.exists():
+        materialize_tree(base_job.workdir, workspace.workdir)
+    base_manifest = base_job.output_dir / MANIFEST_NAME
+    if base_manifest.exists():
+        shutil.copy2(base_manifest, workspace.root / MANIFEST_NAME)
+    _log_agent(job, 'System',
+               f'♻️ Iterating on job {base_job.id}, unchanged steps will be skipped',
+               'info')
+
+
+def _log_agent(job, agent_name, message, level='info', **fields):
+    """Add a log message from an agent to a job"""
+    job.log(agent_name, message, level, **fields)
+
+
+def _record_phase(job, phase, state, duration=None):
+    """Log a LandingPageCrew phase transition with its wall time"""
+    job.record_phase(phase, state, duration)
+    if state == 'started':
+        _log_agent(job, 'System', f'▶️ Phase {phase} started', 'thinking',
+                   phase=phase, phase_state=state)
+    else:
+        level = 'success' if state == 'completed' else 'error'
+        _log_agent(job, 'System', f'⏱️ Phase {phase} {state} in {duration:.1f}s', level,
+                   phase=phase, phase_state=state, duration=round(duration, 3))
+
+
+# 'asyncio' awaits every job on one event loop instead of a thread per job
+job_manager = JobManager(_agenerate_in_background if GENERATION_MODE == 'asyncio'
+                         else _generate_in_background, JOBS_DIR,
+                         max_workers=GENERATION_WORKERS,
+                         max_queued=MAX_QUEUED_JOBS,
+                         max_finished=MAX_FINISHED_JOBS,
+                         finished_ttl=FINISHED_JOB_TTL,
+                         # Components written at once, plus a pipelined page update
+                         threads_per_job=DEFAULT_CONTENT_CONCURRENCY + 1)
+
+def _generic_ecommerce_template_files():
+    """Files of the generic e-commerce React landing page template"""
+    
+    # package.json
+    package_json = {
+        "name": "ecommerce-landing-page",
+        "version": "1.0.0",
+        "description": "Generic E-Commerce Landing Page",
+        "private": True,
+        "dependencies": {
+            "react": "^18.2.0",
+            "react-dom": "^18.2.0",
+            "react-scripts": "5.0.1"
+        },
+        "scripts": {
+            "start": "react-scripts start",
+            "build": "react-scripts build",
+            "deploy": "npm run build && vercel --prod"
+        },
+        "eslintConfig": {
+            "extends": ["react-app"]
+        },
+        "browserslist": {
+            "production": [">0.2%", "not dead", "not op_mini all"],
+            "development": ["last 1 chrome version", "last 1 firefox version",
+                            "last 1 safari version"]
         }
-        
-        # Create files
-        files = {
-            'package.json': json.dumps(package_json, indent=2),
-            'README.md': '''# E-Commerce Landing Page
+    }
+    
+    return {
+        'package.json': json.dumps(package_json, indent=2),
+        'README.md': '''# E-Commerce Landing Page
 
 A modern, responsive e-commerce landing page built with React and Tailwind CSS.
 
@@ -255,7 +330,7 @@ Deploy to Vercel:
 npm run deploy
 ```
 ''',
-            'public/index.html': '''<!DOCTYPE html>
+        'public/index.html': '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -268,7 +343,7 @@ npm run deploy
     <script src="../src/index.js"></script>
 </body>
 </html>''',
-            'src/index.js': '''import React from 'react';
+        'src/index.js': '''import React from 'react';
 import ReactDOM from 'react-dom/client';
 import App from './App';
 import './index.css';
@@ -279,7 +354,7 @@ root.render(
     <App />
   </React.StrictMode>
 );''',
-            'src/index.css': '''* {
+        'src/index.css': '''* {
     margin: 0;
     padding: 0;
     box-sizing: border-box;
@@ -292,7 +367,7 @@ body {
     -webkit-font-smoothing: antialiased;
     -moz-osx-font-smoothing: grayscale;
 }''',
-            'src/App.js': '''import React, { useState } from 'react';
+        'src/App.js': '''import React, { useState } from 'react';
 import Header from './components/Header';
 import Hero from './components/Hero';
 import Products from './components/Products';
@@ -314,7 +389,7 @@ function App() {
 }
 
 export default App;''',
-            'src/components/Header.js': '''import React from 'react';
+        'src/components/Header.js': '''import React from 'react';
 
 export default function Header() {
   return (
@@ -333,7 +408,7 @@ export default function Header() {
     </header>
   );
 }''',
-            'src/components/Hero.js': '''import React from 'react';
+        'src/components/Hero.js': '''import React from 'react';
 
 export default function Hero() {
   return (
@@ -348,7 +423,7 @@ export default function Hero() {
     </section>
   );
 }''',
-            'src/components/Features.js': '''import React from 'react';
+        'src/components/Features.js': '''import React from 'react';
 
 export default function Features() {
   const features = [
@@ -375,7 +450,7 @@ export default function Features() {
     </section>
   );
 }''',
-            'src/components/Products.js': '''import React from 'react';
+        'src/components/Products.js': '''import React from 'react';
 
 export default function Products() {
   const products = [
@@ -413,7 +488,7 @@ export default function Products() {
     </section>
   );
 }''',
-            'src/components/Newsletter.js': '''import React, { useState } from 'react';
+        'src/components/Newsletter.js': '''import React, { useState } from 'react';
 
 export default function Newsletter() {
   const [email, setEmail] = useState('');
@@ -449,7 +524,7 @@ export default function Newsletter() {
     </section>
   );
 }''',
-            'src/components/Footer.js': '''import React from 'react';
+        'src/components/Footer.js': '''import React from 'react';
 
 export default function Footer() {
   return (
@@ -492,7 +567,7 @@ export default function Footer() {
     </footer>
   );
 }''',
-            '.gitignore': '''node_modules/
+        '.gitignore': '''node_modules/
 build/
 dist/
 .env.local
@@ -502,63 +577,301 @@ dist/
 npm-debug.log*
 yarn-debug.log*
 yarn-error.log*'''
-        }
-        
-        # Write all files
-        for file_path, content in files.items():
-          full_path = temp_path / file_path
-          full_path.parent.mkdir(parents=True, exist_ok=True)
-          # Ensure UTF-8 encoding when writing files to avoid Windows encoding errors
-          full_path.write_text(content, encoding='utf-8')
-        
-        # Create ZIP file
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for root, dirs, filenames in os.walk(temp_path):
-                for filename in filenames:
-                    file_path = os.path.join(root, filename)
-                    arcname = os.path.relpath(file_path, temp_path)
-                    zip_file.write(file_path, arcname)
-        
-        zip_buffer.seek(0)
-        return zip_buffer
+    }
+
 
+# Fixed timestamp so identical files always produce byte-identical archives
+_ARCHIVE_DATE_TIME = (2024, 1, 1, 0, 0, 0)
+_archive_cache = {}
+_archive_cache_lock = threading.Lock()
+
+def _build_archive(files):
+    """ZIP an in-memory {path: content} mapping, cached by content hash.
+
+    Returns (zip bytes, etag). The archive is only built the first time a
+    given set of files is seen.
+    """
+    digest = hashlib.sha256()
+    for file_path in sorted(files):
+        digest.update(file_path.encode('utf-8') + b'\0')
+        digest.update(files[file_path].encode('utf-8') + b'\0')
+    etag = digest.hexdigest()[:32]
+    
+    with _archive_cache_lock:
+        cached = _archive_cache.get(etag)
+    if cached is not None:
+        return cached, etag
+    
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for file_path in sorted(files):
+            info = zipfile.ZipInfo(file_path, date_time=_ARCHIVE_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            zip_file.writestr(info, files[file_path])
+    data = zip_buffer.getvalue()
+    
+    with _archive_cache_lock:
+        _archive_cache[etag] = data
+    return data, etag
+
+def _create_generic_ecommerce_template():
+    """Create a generic e-commerce React landing page template as ZIP bytes"""
+    return _build_archive(_generic_ecommerce_template_files())
+
+
+def _job_status(job):
+    """Status payload for a job, shaped like the legacy /api/status response"""
+    status = job.to_dict()
+    status['queue_position'] = job_manager.queue_position(job)
+    return status
+
+def _get_job_or_404(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return None, (jsonify({'error': f'Job {job_id} not found'}), 404)
+    return job, None
+
+def _since_arg(name='since'):
+    """Parse a non-negative integer cursor from the query string"""
+    try:
+        return max(0, int(request.args.get(name, 0)))
+    except (TypeError, ValueError):
+        return 0
+
+def _status_response(job):
+    """Status payload, or 204 if the client already has this version"""
+    if 'since' in request.args and _since_arg() == job.version:
+        return '', 204
+    return jsonify(_job_status(job))
+
+def _logs_response(job):
+    """Log entries after the client's cursor plus the cursor to use next"""
+    logs = job.get_logs(since=_since_arg())
+    return jsonify({'logs': logs, 'next': logs[-1]['id'] if logs else _since_arg()})
 
 @app.route('/api/status', methods=['GET'])
 def get_status():
-    """Get current generation status"""
-    return jsonify(execution_status)
+    """Get current generation status of the most recent job"""
+    job = job_manager.latest()
+    if job is None:
+        return jsonify({'running': False, 'progress': 0, 'status': 'idle',
+                        'error': None, 'idea': None})
+    return _status_response(job)
 
 @app.route('/api/logs', methods=['GET'])
 def get_logs():
-    """Get agent communication logs"""
-    with log_lock:
-        return jsonify({'logs': agent_logs})
+    """Get agent communication logs of the most recent job"""
+    job = job_manager.latest()
+    if job is None:
+        return jsonify({'logs': [], 'next': 0})
+    return _logs_response(job)
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """List all known generation jobs"""
+    return jsonify({'jobs': [_job_status(job) for job in job_manager.list()]})
+
+@app.route('/api/jobs/<job_id>/status', methods=['GET'])
+def get_job_status(job_id):
+    """Get the generation status of a job"""
+    job, error = _get_job_or_404(job_id)
+    if error:
+        return error
+    return _status_response(job)
+
+@app.route('/api/jobs/<job_id>/logs', methods=['GET'])
+def get_job_logs(job_id):
+    """Get agent communication logs of a job, optionally after ?since=<id>"""
+    job, error = _get_job_or_404(job_id)
+    if error:
+        return error
+    return _logs_response(job)
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """Push new log entries and status changes of a job as Server-Sent Events.
+
+    Log events carry their log id, so a reconnecting EventSource resumes
+    from its Last-Event-ID header; ``?since=<id>`` does the same explicitly.
+    """
+    job, error = _get_job_or_404(job_id)
+    if error:
+        return error
+    
+    cursor = request.headers.get('Last-Event-ID') or request.args.get('since', 0)
+    try:
+        cursor = max(0, int(cursor))
+    except (TypeError, ValueError):
+        cursor = 0
+    
+    def _event(event, data, event_id=None):
+        lines = [f'id: {event_id}'] if event_id is not None else []
+        lines.append(f'event: {event}')
+        lines.append(f'data: {json.dumps(data)}')
+        return '\n'.join(lines) + '\n\n'
+    
+    def generate(cursor):
+        version = None
+        while True:
+            if not job.wait_for_change(cursor, version, timeout=SSE_HEARTBEAT_SECONDS):
+                yield ': keep-alive\n\n'
+                continue
+            
+            for log in job.get_logs(since=cursor):
+                cursor = log['id']
+                yield _event('log', log, event_id=cursor)
+            
+            if job.version != version:
+                status = _job_status(job)
+                version = status['version']
+                yield _event('status', status)
+                if not status['running'] and status['last_log_id'] <= cursor:
+                    yield _event('done', {'state': status['state']})
+                    return
+    
+    return Response(stream_with_context(generate(cursor)),
+                    mimetype='text/event-stream',
+                    headers={'X-Accel-Buffering': 'no'})
+
+@app.route('/api/jobs/<job_id>/trace', methods=['GET'])
+def get_job_trace(job_id):
+    """Spans of a job's phases, crew kickoffs, LLM and tool calls with timings,
+    tokens, cache hits and retries; live while the job runs"""
+    job, error = _get_job_or_404(job_id)
+    if error:
+        return error
+    if job.trace is not None:
+        return jsonify(job.trace.to_dict())
+    trace_path = job.output_dir / TRACE_NAME
+    if trace_path.exists():
+        return send_file(trace_path, mimetype='application/json')
+    return jsonify({'error': 'No trace recorded for this job yet'}), 404
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Process metrics in the Prometheus text format"""
+    jobs_by_state = {}
+    for job in job_manager.list():
+        jobs_by_state[job.state] = jobs_by_state.get(job.state, 0) + 1
+    lines = ['# HELP lpg_jobs Generation jobs by state', '# TYPE lpg_jobs gauge']
+    for state in ('queued', 'running', 'completed', 'error'):
+        lines.append(f'lpg_jobs{{state="{state}"}} {jobs_by_state.get(state, 0)}')
+    lines.extend(_cache_metric_lines())
+    return Response(metrics.render() + '\n'.join(lines) + '\n',
+                    content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def _cache_metric_lines():
+    """Hit/miss counters and sizes of the LLM and tool caches of this process"""
+    caches = {}
+    if llm_cache_enabled():
+        caches['llm'] = get_llm_cache().stats()
+    if tool_cache_enabled():
+        caches['tool'] = get_tool_cache().stats()
+    lines = []
+    for metric, kind, field, description in CACHE_METRICS if caches else ():
+        lines.append(f'# HELP {metric} {description}')
+        lines.append(f'# TYPE {metric} {kind}')
+        for name, stats in caches.items():
+            lines.append(f'{metric}{{cache="{name}"}} {stats[field]}')
+    return lines
+
+@app.route('/api/jobs/<job_id>/download', methods=['GET'])
+def download_job(job_id):
+    """Download the files generated by a job"""
+    job, error = _get_job_or_404(job_id)
+    if error:
+        return error
+    if job.state != 'completed':
+        return jsonify({'error': f'Job {job_id} is not completed yet'}), 409
+    
+    try:
+        if job.workdir.exists() and any(job.workdir.iterdir()):
+            # Generated workdirs can be large, stream them instead of buffering
+            return Response(
+                stream_with_context(_stream_zip(job.workdir)),
+                mimetype='application/zip',
+                headers={'Content-Disposition':
+                         f'attachment; filename=landing_page_{job.id}.zip'}
+            )
+        
+        return _send_archive(*_create_generic_ecommerce_template(),
+                             download_name=f'ecommerce_landing_page_{job.id}.zip')
+    except Exception as e:
+        print(f"❌ Error creating download for job {job_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+class _ZipStreamSink():
+    """Write-only file object collecting what ZipFile writes between drains"""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def _stream_zip(directory, chunk_size=64 * 1024):
+    """Yield a ZIP of ``directory`` chunk by chunk without buffering it all"""
+    sink = _ZipStreamSink()
+    # ZipFile falls back to data descriptors on a non-seekable file object
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for root, dirs, filenames in os.walk(directory):
+            dirs.sort()
+            for filename in sorted(filenames):
+                file_path = os.path.join(root, filename)
+                arcname = os.path.relpath(file_path, directory)
+                info = zipfile.ZipInfo.from_file(file_path, arcname)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with open(file_path, 'rb') as src, zip_file.open(info, 'w') as dst:
+                    while True:
+                        chunk = src.read(chunk_size)
+                        if not chunk:
+                            break
+                        dst.write(chunk)
+                        data = sink.drain()
+                        if data:
+                            yield data
+                data = sink.drain()
+                if data:
+                    yield data
+    yield sink.drain()
+
+def _send_archive(data, etag, download_name):
+    """Send cached archive bytes with an ETag, answering 304 when unchanged"""
+    return send_file(
+        io.BytesIO(data),
+        as_attachment=True,
+        download_name=download_name,
+        mimetype='application/zip',
+        etag=etag,
+        conditional=True,
+        max_age=0
+    )
 
 @app.route('/api/download', methods=['GET'])
 def download_file():
     """Download generic e-commerce React landing page template"""
     try:
-        # Always generate and return the generic template
-        print("📥 Generating e-commerce template for download...")
-        zip_buffer = _create_generic_ecommerce_template()
+        # The archive is built once and served from the cache afterwards
+        data, etag = _create_generic_ecommerce_template()
         
-        if zip_buffer is None or zip_buffer.getbuffer().nbytes == 0:
-            print("❌ ERROR: ZIP buffer is empty!")
+        if not data:
+            print("❌ ERROR: ZIP archive is empty!")
             return jsonify({'error': 'Failed to create template file'}), 500
         
-        file_size = zip_buffer.getbuffer().nbytes
-        print(f"✅ Template created successfully! Size: {file_size} bytes")
-        
-        # Send the file
-        response = send_file(
-            zip_buffer,
-            as_attachment=True,
-            download_name=f'ecommerce_landing_page_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip',
-            mimetype='application/zip'
+        return _send_archive(
+            data, etag,
+            download_name=f'ecommerce_landing_page_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip'
         )
-        print(f"✅ Sending download response...")
-        return response
         
     except Exception as e:
         print(f"❌ Error creating download: {e}")
@@ -566,60 +879,70 @@ def download_file():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+# One incrementally maintained file index per workdir
+_code_indexes = OrderedDict()
+_code_indexes_lock = threading.Lock()
+MAX_CODE_INDEXES = 64
+
+def _code_index_for_request():
+    """File index of the requested (or most recent) job's workdir, or None"""
+    job_id = request.args.get('job')
+    job = job_manager.get(job_id) if job_id else job_manager.latest()
+    if job is None or not job.workdir.exists():
+        return None
+    
+    with _code_indexes_lock:
+        index = _code_indexes.get(job.id)
+        if index is None:
+            index = _code_indexes[job.id] = FileIndex(job.workdir)
+            while len(_code_indexes) > MAX_CODE_INDEXES:
+                _code_indexes.popitem(last=False)
+        _code_indexes.move_to_end(job.id)
+    return index
+
 @app.route('/api/code', methods=['GET'])
 def get_code():
-    """Get the generated landing page code"""
+    """List the generated code files with their hashes.
+
+    ``?since=<generation>`` only lists files changed after that generation
+    (plus the ones removed since). File contents come from /api/code/file.
+    """
     try:
-        # Look for HTML files in workdir
-        src_dir = os.path.join(os.path.dirname(__file__), 'src', 'landing_page_generator')
-        workdir = Path(src_dir) / 'workdir'
+        index = _code_index_for_request()
         
-        if not workdir.exists():
+        if index is None:
             return jsonify({'error': 'No files found. Generate a landing page first', 'files': {}}), 404
         
-        files = {}
-        
-        # Collect all files from the workdir
-        for file_path in workdir.rglob('*'):
-            if file_path.is_file():
-                # Get relative path
-                rel_path = file_path.relative_to(workdir)
-                
-                # Only include readable text files
-                if file_path.suffix in ['.html', '.jsx', '.js', '.css', '.json', '.md', '.txt']:
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            # Limit content size to 100KB per file
-                            if len(content) > 100000:
-                                content = content[:100000] + '\n... (truncated)'
-                            files[str(rel_path).replace(chr(92), '/')] = {
-                                'content': content,
-                                'language': _get_language(file_path.suffix)
-                            }
-                    except Exception as e:
-                        print(f"Error reading {file_path}: {e}")
+        listing = index.listing(since=_since_arg())
         
-        if not files:
+        if not listing['files'] and not listing['removed'] and not _since_arg():
             return jsonify({'error': 'No code files found', 'files': {}}), 200
         
-        return jsonify({'files': files}), 200
+        return jsonify(listing), 200
     except Exception as e:
         print(f"Error in get_code: {e}")
         return jsonify({'error': str(e), 'files': {}}), 500
 
-def _get_language(extension):
-    """Get language name from file extension"""
-    languages = {
-        '.html': 'html',
-        '.jsx': 'javascript',
-        '.js': 'javascript',
-        '.css': 'css',
-        '.json': 'json',
-        '.md': 'markdown',
-        '.txt': 'text'
-    }
-    return languages.get(extension, 'text')
+@app.route('/api/code/file', methods=['GET'])
+def get_code_file():
+    """Serve one generated file with ETag, conditional GET and Range support"""
+    index = _code_index_for_request()
+    if index is None:
+        return jsonify({'error': 'No files found. Generate a landing page first'}), 404
+    
+    # Only paths known to the index are served, which also rules out traversal
+    index.refresh()
+    entry, file_path = index.get(request.args.get('path', ''))
+    if entry is None:
+        return jsonify({'error': 'File not found'}), 404
+    
+    return send_file(
+        file_path,
+        mimetype='text/plain; charset=utf-8',
+        etag=entry['hash'],
+        conditional=True,
+        max_age=0
+    )
 
 @app.route('/api/config', methods=['GET'])
 def get_config():
@@ -0,0 +1,326 @@
+"""Offline stand-ins for everything a generation talks to.
+
+* ``build_template`` writes a synthetic Tailwind-like Next.js template with
+  section components, helpers, styles and binary image assets.
+* ``StubServer`` answers the serper.dev search and browserless content APIs
+  with canned, deterministic responses after a configurable latency.
+* ``FakeResponder`` produces the final answer of every task of the crews,
+  so ``fake_llm.FakeLLM`` can stand in for the Gemini model.
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+TEMPLATE_NAME = 'beacon-js'
+
+SECTION_NAMES = (
+    'Header', 'Hero', 'PrimaryFeatures', 'SecondaryFeatures', 'CallToAction',
+    'Testimonials', 'Pricing', 'Faqs', 'Footer', 'Newsletter', 'Stats', 'Team',
+)
+
+WORDS = (
+    'launch', 'simple', 'teams', 'workflow', 'insight', 'faster', 'secure', 'growth',
+    'platform', 'customers', 'automate', 'reliable', 'modern', 'scale', 'focus',
+    'deliver', 'product', 'analytics', 'seamless', 'together', 'build', 'trusted',
+)
+
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+_LIST_CLASSES = ('mx-auto mt-16 grid max-w-2xl grid-cols-1 gap-6 sm:gap-8 '
+                 'lg:max-w-none lg:grid-cols-2')
+
+
+def _section_component(name, rng):
+    items = ',\n'.join(
+        f"  {{ title: '{_text(rng, 3)}', description: '{_text(rng, 18)}',"
+        f" href: '/{name.lower()}/{i}' }}"
+        for i in range(4))
+    return f"""import Link from 'next/link'
+
+import {{ Button }} from '@/components/Button'
+import {{ Container }} from '@/components/Container'
+
+const items = [
+{items},
+]
+
+export function {name}() {{
+  return (
+    <section
+      id="{name.lower()}"
+      aria-label="{_text(rng, 4)}"
+      className="bg-slate-50 py-20 sm:py-32"
+    >
+      <Container>
+        <div className="mx-auto max-w-2xl md:text-center">
+          <h2
+            className="font-display text-3xl tracking-tight text-slate-900 sm:text-4xl"
+          >
+            {_text(rng, 6)}
+          </h2>
+          <p className="mt-4 text-lg tracking-tight text-slate-700">
+            {_text(rng, 28)}
+          </p>
+        </div>
+        <ul role="list" className="{_LIST_CLASSES}">
+          {{items.map((item) => (
+            <li
+              key={{item.title}}
+              className="rounded-2xl bg-white p-6 shadow-xl shadow-slate-900/10"
+            >
+              <h3 className="font-display text-lg text-slate-900">{{item.title}}</h3>
+              <p className="mt-2 text-sm text-slate-700">{{item.description}}</p>
+              <Link href={{item.href}} className="mt-4 text-sm text-blue-600">
+                {_text(rng, 2)}
+              </Link>
+            </li>
+          ))}}
+        </ul>
+        <div className="mt-10 flex justify-center gap-x-6">
+          <Button href="/register">{_text(rng, 3)}</Button>
+          <Button href="https://example.com/demo" variant="outline">
+            {_text(rng, 2)}
+          </Button>
+        </div>
+      </Container>
+    </section>
+  )
+}}
+"""
+
+
+HELPERS = {
+    'Button.jsx': """import Link from 'next/link'
+import clsx from 'clsx'
+
+export function Button({ className, href, variant = 'solid', ...props }) {
+  className = clsx(
+    'group inline-flex items-center justify-center rounded-full py-2 px-4',
+    'text-sm font-semibold',
+    variant === 'solid'
+      ? 'bg-slate-900 text-white'
+      : 'ring-1 ring-slate-200 text-slate-700',
+    className,
+  )
+  return typeof href === 'undefined'
+    ? <button className={className} {...props} />
+    : <Link href={href} className={className} {...props} />
+}
+""",
+    'Container.jsx': """import clsx from 'clsx'
+
+export function Container({ className, ...props }) {
+  return (
+    <div
+      className={clsx('mx-auto max-w-7xl px-4 sm:px-6 lg:px-8', className)}
+      {...props}
+    />
+  )
+}
+""",
+}
+
+
+def build_template(templates_dir, name=TEMPLATE_NAME, components=8, asset_kb=256,
+                   assets=6, seed=0):
+    """Write a synthetic template to ``templates_dir/name``.
+
+    Returns the paths of its section components relative to a workdir the
+    template is copied into, e.g. ``beacon-js/src/components/Hero.jsx``.
+    """
+    rng = random.Random(seed)
+    root = Path(templates_dir) / name
+    (root / 'src' / 'app').mkdir(parents=True, exist_ok=True)
+    (root / 'src' / 'components').mkdir(exist_ok=True)
+    (root / 'src' / 'images').mkdir(exist_ok=True)
+    (root / 'src' / 'styles').mkdir(exist_ok=True)
+
+    names = []
+    for i in range(components):
+        repeat, index = divmod(i, len(SECTION_NAMES))
+        names.append(SECTION_NAMES[index] + (str(repeat + 1) if repeat else ''))
+    for section in names:
+        (root / 'src' / 'components' / f'{section}.jsx').write_text(
+            _section_component(section, rng), encoding='utf-8')
+    for filename, content in HELPERS.items():
+        (root / 'src' / 'components' / filename).write_text(content, encoding='utf-8')
+
+    imports = '\n'.join(f"import {{ {section} }} from '@/components/{section}'"
+                        for section in names)
+    body = '\n'.join(f'        <{section} />' for section in names)
+    (root / 'src' / 'app' / 'page.jsx').write_text(
+        f"{imports}\n\nexport default function Home() {{\n"
+        f"  return (\n    <>\n      <main>\n"
+        f"{body}\n      </main>\n    </>\n  )\n}}\n", encoding='utf-8')
+    (root / 'src' / 'app' / 'layout.jsx').write_text(
+        "import '@/styles/tailwind.css'\n\n"
+        "export const metadata = { title: 'Beacon' }\n\n"
+        "export default function RootLayout({ children }) {\n"
+        "  return <html lang=\"en\"><body>{children}</body></html>\n}\n",
+        encoding='utf-8')
+    (root / 'src' / 'styles' / 'tailwind.css').write_text(
+        '@tailwind base;\n@tailwind components;\n@tailwind utilities;\n',
+        encoding='utf-8')
+    for i in range(assets):
+        (root / 'src' / 'images' / f'screenshot-{i}.png').write_bytes(
+            rng.randbytes(asset_kb * 1024))
+    (root / 'package.json').write_text(json.dumps({
+        'name': name, 'private': True,
+        'scripts': {'dev': 'next dev', 'build': 'next build'},
+        'dependencies': {'next': '14.0.4', 'react': '18.2.0', 'react-dom': '18.2.0',
+                         'clsx': '^2.0.0', 'tailwindcss': '^3.4.0'},
+    }, indent=2), encoding='utf-8')
+    (root / 'tailwind.config.js').write_text(
+        "module.exports = {\n"
+        "  content: ['./src/**/*.{js,jsx}'],\n"
+        "  theme: { extend: {} },\n"
+        "}\n",
+        encoding='utf-8')
+    (root / 'jsconfig.json').write_text(
+        json.dumps({'compilerOptions': {'paths': {'@/*': ['./src/*']}}}, indent=2),
+        encoding='utf-8')
+    return [f'{name}/src/components/{section}.jsx' for section in names]
+
+
+def write_templates_config(config_dir, name=TEMPLATE_NAME):
+    """``templates.json`` listing the synthetic template, as read by the
+    template catalog"""
+    config_dir = Path(config_dir)
+    config_dir.mkdir(parents=True, exist_ok=True)
+    (config_dir / 'templates.json').write_text(json.dumps([{
+        'name': 'Beacon', 'theme': 'SaaS Template', 'folder': name,
+        'description': 'A synthetic landing page template for benchmarks.',
+    }], indent=2), encoding='utf-8')
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        if server.latency:
+            time.sleep(server.latency)
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            payload = {}
+
+        if self.path.startswith('/search'):
+            results = server.search_results(payload.get('q', ''))
+            data = json.dumps(results).encode('utf-8')
+            content_type = 'application/json'
+        elif self.path.startswith('/content'):
+            data = server.page(payload.get('url', '')).encode('utf-8')
+            content_type = 'text/html; charset=utf-8'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubServer(ThreadingHTTPServer):
+    """Local serper.dev (``POST /search``) and browserless (``POST /content``)"""
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, page_kb=64, results=10):
+        super().__init__(('127.0.0.1', 0), _StubHandler)
+        self.latency = latency
+        self.page_kb = page_kb
+        self.results = results
+        self.requests = 0
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='stub-server',
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def search_results(self, query):
+        rng = random.Random(hashlib.sha256(query.encode('utf-8')).digest())
+        return {'searchParameters': {'q': query}, 'organic': [
+            {'title': _text(rng, 6),
+             'link': f'https://example.com/{i}/{rng.randrange(10 ** 6)}',
+             'snippet': _text(rng, 30), 'position': i + 1}
+            for i in range(self.results)]}
+
+    def page(self, url):
+        rng = random.Random(hashlib.sha256(url.encode('utf-8')).digest())
+        parts = [f'<html><head><title>{_text(rng, 4)}</title></head>'
+                 f'<body><h1>{_text(rng, 5)}</h1>']
+        size = 0
+        while size < self.page_kb * 1024:
+            block = (f'<h2>{_text(rng, 4)}</h2><p>{_text(rng, 60)}.</p>'
+                     f'<ul><li>{_text(rng, 8)}</li><li>{_text(rng, 8)}</li></ul>')
+            parts.append(block)
+            size += len(block)
+        parts.append('</body></html>')
+        return ''.join(parts)
+
+
+# Prompts of the choose step and of its re-asks
+CHOOSE_MARKERS = (
+    'TEMPLATE CATALOG', 'JSON array of the paths', 'READ the ./[chosen_template]',
+)
+
+
+class FakeResponder():
+    """Final answers for the tasks of the crews, picked from the prompt.
+
+    The choose step answers with ``picks`` components of the catalog.
+    """
+
+    def __init__(self, components, picks=4, report_words=400):
+        self.components = [path for path in components if 'Pricing' not in path]
+        self.picks = picks
+        self.report_words = report_words
+
+    def answer(self, prompt):
+        rng = random.Random(hashlib.sha256(prompt.encode('utf-8')).digest())
+        if any(marker in prompt for marker in CHOOSE_MARKERS):
+            return json.dumps(self.components[:self.picks])
+        if 'COMPONENT TEXTS' in prompt:
+            texts = prompt.split('COMPONENT TEXTS', 1)[1]
+            return json.dumps({slot_id: _text(rng, 5)
+                               for slot_id in re.findall(r'\b(t\d+) <', texts)})
+        if 'will break the Next.js build' in prompt:
+            source = prompt.split('FILE\n----------\n', 1)[-1]
+            return source.rsplit('\n----------', 1)[0]
+        paragraphs = max(1, self.report_words // 50)
+        return '\n\n'.join(_text(rng, 50) for _ in range(paragraphs))
+
+    def __call__(self, messages):
+        if isinstance(messages, str):
+            prompt = messages
+        else:
+            prompt = '\n'.join(str(message.get('content', '')) for message in messages)
+        return ('Thought: I now know the final answer\n'
+                f'Final Answer: {self.answer(prompt)}')
@@ -0,0 +1,465 @@
+"""Offline benchmarks of the generator's own overhead.
+
+Usage: python benchmarks/run.py [--scenarios crew,api,tools] [--iterations 5]
+                                [--compare benchmarks/results/baseline.json]
+
+The Gemini model is replaced by ``fake_llm.FakeLLM`` with a fixed latency,
+the search and scrape APIs by a local stub server, and the Tailwind
+templates by a synthetic template tree, so every number measures
+orchestration, copying, zipping, logging and tool code rather than the
+network. Scenarios:
+
+* ``crew``: ``LandingPageCrew.run`` (or ``arun``) end to end
+* ``api``: jobs through the Flask endpoints, from POST to the ZIP download
+* ``tools``: search, scrape and summarize, template copy, file writes, zip
+
+``--llm-latency 0`` leaves nothing but the project's own overhead.
+
+Each scenario runs in a fresh process, so its peak RSS and file I/O are its
+own. The report has throughput and p50/p95 latencies per operation; with
+``--compare`` the run fails if any of them regressed beyond ``--tolerance``.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+PACKAGE_DIR = REPO_DIR / 'src' / 'landing_page_generator'
+SCENARIOS = ('crew', 'api', 'tools')
+IDEA = ("A scheduling app that lets small clinics fill last-minute cancellations "
+        "from a waitlist")
+
+# Latencies below this many seconds never count as regressions, they are noise
+MIN_REGRESSION_SECONDS = 0.002
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def latency_stats(values):
+    return {
+        'count': len(values),
+        'mean': round(statistics.fmean(values), 6),
+        'p50': round(_percentile(values, 0.5), 6),
+        'p95': round(_percentile(values, 0.95), 6),
+        'max': round(max(values), 6),
+    }
+
+
+def io_counters():
+    """Bytes read and written by this process so far"""
+    try:
+        with open('/proc/self/io', 'r', encoding='ascii') as f:
+            fields = dict(line.split(': ') for line in f.read().splitlines())
+        return {name: int(fields[name])
+                for name in ('rchar', 'wchar', 'read_bytes', 'write_bytes')}
+    except OSError:
+        # Not Linux, fall back to block operations
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return {'read_blocks': usage.ru_inblock, 'write_blocks': usage.ru_oublock}
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class Recorder():
+    """Latency samples per operation name, safe to use from many threads"""
+
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+
+    @contextlib.contextmanager
+    def time(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def reset(self):
+        with self._lock:
+            self.samples.clear()
+
+    def stats(self):
+        with self._lock:
+            return {name: latency_stats(values)
+                    for name, values in sorted(self.samples.items())}
+
+
+class Environment():
+    """Temporary directories, synthetic template and stub server of one scenario.
+
+    Must be set up before any module of the package is imported: the tools
+    read their API URLs and the caches their directories at import time.
+    """
+
+    def __init__(self, options):
+        from fixtures import StubServer, build_template, write_templates_config
+
+        self.options = options
+        self.root = Path(tempfile.mkdtemp(prefix='lpg-bench-'))
+        self.templates_dir = self.root / 'templates'
+        self.config_dir = self.root / 'config'
+        self.components = build_template(self.templates_dir,
+                                         components=options.components,
+                                         asset_kb=options.asset_kb)
+        write_templates_config(self.config_dir)
+        self.server = StubServer(latency=options.tool_latency,
+                                 page_kb=options.page_kb).start()
+
+        os.environ.update({
+            'SERPER_URL': self.server.url,
+            'BROWSERLESS_URL': self.server.url,
+            'SERPER_API_KEY': 'bench',
+            'BROWSERLESS_API_KEY': 'bench',
+            'LANDING_PAGE_CACHE_DIR': str(self.root / 'cache'),
+            'LANDING_PAGE_TEMPLATES_DIR': str(self.templates_dir),
+            'LANDING_PAGE_CONFIG_DIR': str(self.config_dir),
+            'JOBS_DIR': str(self.root / 'jobs'),
+            'LLM_CACHE_DISABLED': 'true',
+            'TOOL_CACHE_DISABLED': 'false' if options.tool_cache else 'true',
+            'GENERATION_MODE': options.generation_mode,
+            'GENERATION_WORKERS': str(options.concurrency),
+            'CREWAI_DISABLE_TELEMETRY': 'true',
+            'OTEL_SDK_DISABLED': 'true',
+        })
+        for path in (PACKAGE_DIR / 'tools', PACKAGE_DIR, REPO_DIR):
+            sys.path.insert(0, str(path))
+
+    def fake_llm(self):
+        from fake_llm import FakeLLM
+        from fixtures import FakeResponder
+
+        return FakeLLM(responder=FakeResponder(self.components),
+                       latency=self.options.llm_latency)
+
+    def workspace(self, name):
+        from workspace import Workspace
+
+        return Workspace(self.root / 'runs' / name, templates_dir=self.templates_dir,
+                         config_dir=self.config_dir)
+
+    def close(self):
+        self.server.stop()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Silence the crews' verbose output, printing it would dominate the timings"""
+    with open(os.devnull, 'w', encoding='utf-8') as sink, \
+            contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink):
+        yield
+
+
+def _run_iterations(options, recorder, iterate):
+    """Run ``iterate(i)`` for the warmup and measured iterations, ``concurrency``
+    at a time. Returns the measured wall time."""
+    def measured(i):
+        with recorder.time('iteration'):
+            iterate(i)
+
+    for i in range(options.warmup):
+        iterate(f'warmup-{i}')
+    recorder.reset()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=options.concurrency) as executor:
+        for future in [executor.submit(measured, i) for i in range(options.iterations)]:
+            future.result()
+    return time.perf_counter() - start
+
+
+def bench_crew(env, recorder):
+    """``LandingPageCrew.run`` end to end with the fake LLM"""
+    from crew import LandingPageCrew
+    from crew_factory import default_crew_factory
+
+    options = env.options
+    llm = env.fake_llm()
+
+    def iterate(i):
+        crew = LandingPageCrew(IDEA, llm=llm, workspace=env.workspace(f'crew-{i}'))
+        if options.generation_mode == 'asyncio':
+            asyncio.run(crew.arun())
+        else:
+            crew.run()
+        for phase, seconds in crew.phase_timings.items():
+            recorder.add(f'phase:{phase}', seconds)
+        if not (crew.workspace.workdir / env.components[0]).exists():
+            raise RuntimeError(f'Generation {i} produced no components')
+
+    wall = _run_iterations(options, recorder, iterate)
+    return wall, {'llm_calls': llm.calls, 'crew_pool': default_crew_factory.stats()}
+
+
+def bench_api(env, recorder):
+    """Jobs through the Flask endpoints, polled the way the web page does"""
+    import llm_cache
+
+    llm = env.fake_llm()
+    # Crews built by the web app ask build_llm for their model
+    llm_cache.build_llm = lambda *_args, **_kwargs: llm
+    from crew_factory import default_crew_factory
+
+    import app as web
+
+    client = web.app.test_client()
+    zip_bytes = []
+
+    def request(name, method, url, **kwargs):
+        with recorder.time(f'api:{name}'):
+            response = client.open(url, method=method, **kwargs)
+            response.get_data()
+        return response
+
+    def iterate(i):
+        response = request('create_job', 'POST', '/api/jobs',
+                           json={'idea': f'{IDEA} ({i})'})
+        job_id = response.get_json()['job_id']
+        start = time.perf_counter()
+        version = -1
+        while True:
+            response = request('job_status', 'GET',
+                               f'/api/jobs/{job_id}/status?since={version}')
+            if response.status_code == 200:
+                status = response.get_json()
+                version = status['version']
+                if not status['running']:
+                    break
+            time.sleep(0.01)
+        recorder.add('job', time.perf_counter() - start)
+        if status['state'] != 'completed':
+            raise RuntimeError(
+                f"Job {job_id} ended {status['state']}: {status.get('error')}")
+
+        request('job_logs', 'GET', f'/api/jobs/{job_id}/logs')
+        listing = request('code_listing', 'GET', f'/api/code?job={job_id}').get_json()
+        for path in list(listing.get('files', {}))[:5]:
+            request('code_file', 'GET', f'/api/code/file?job={job_id}&path={path}')
+        request('job_trace', 'GET', f'/api/jobs/{job_id}/trace')
+        response = request('download', 'GET', f'/api/jobs/{job_id}/download')
+        zip_bytes.append(len(response.get_data()))
+        request('metrics', 'GET', '/api/metrics')
+
+    wall = _run_iterations(env.options, recorder, iterate)
+    return wall, {'llm_calls': llm.calls,
+                  'zip_mean_bytes': int(statistics.fmean(zip_bytes)),
+                  'crew_pool': default_crew_factory.stats()}
+
+
+def bench_tools(env, recorder):
+    """Every tool against the stub server and the synthetic template"""
+    from browser_tools import BrowserTools, MapReduceSummarizer, set_summarizer
+    from file_tools import FileTools
+    from search_tools import SearchTools
+    from template_tools import TemplateTools
+    from workspace import use_workspace
+
+    llm = env.fake_llm()
+    set_summarizer(MapReduceSummarizer(llm=llm))
+
+    def call(name, tool, argument):
+        with recorder.time(f'tool:{name}'):
+            result = tool.run(argument)
+        if result.startswith('Error'):
+            raise RuntimeError(f'{name} failed: {result}')
+
+    def iterate(i):
+        workspace = env.workspace(f'tools-{i}')
+        workspace.workdir.mkdir(parents=True)
+        with use_workspace(workspace):
+            call('search_internet', SearchTools.search_internet, f'{IDEA} {i}')
+            call('scrape_and_summarize_website',
+                 BrowserTools.scrape_and_summarize_website,
+                 f'https://example.com/article/{i}')
+            call('learn_landing_page_options',
+                 TemplateTools.learn_landing_page_options, '')
+            call('copy_template',
+                 TemplateTools.copy_landing_page_template_to_project_folder,
+                 env.components[0].split('/', 1)[0])
+            for path in env.components:
+                content = (workspace.workdir / path).read_text(encoding='utf-8')
+                call('write_file', FileTools.write_file,
+                     f"./{path}|'use client'\n{content.replace('href=', 'data-href=')}")
+            with recorder.time('zip_workdir'):
+                shutil.make_archive(str(workspace.root / 'site'), 'zip',
+                                    workspace.workdir)
+
+    wall = _run_iterations(env.options, recorder, iterate)
+    return wall, {'llm_calls': llm.calls, 'stub_requests': env.server.requests}
+
+
+BENCHMARKS = {'crew': bench_crew, 'api': bench_api, 'tools': bench_tools}
+
+
+def run_scenario(name, options):
+    """Run one scenario; called in a fresh process"""
+    sys.path.insert(0, str(BENCH_DIR))
+    env = Environment(options)
+    recorder = Recorder()
+    try:
+        io_before = io_counters()
+        with _quiet():
+            wall, extra = BENCHMARKS[name](env, recorder)
+        io_after = io_counters()
+    finally:
+        env.close()
+    stats = recorder.stats()
+    result = {
+        'iterations': options.iterations,
+        'concurrency': options.concurrency,
+        'wall_seconds': round(wall, 4),
+        'throughput_per_second': round(options.iterations / wall, 4) if wall else 0.0,
+        'latency': stats,
+        'peak_rss_mb': peak_rss_mb(),
+        'io': {key: io_after[key] - io_before[key] for key in io_after},
+    }
+    result.update(extra)
+    return result
+
+
+def compare(report, baseline, tolerance):
+    """Latencies, peak RSS and bytes written that grew beyond ``tolerance``"""
+    regressions = []
+
+    def check(label, new, old, minimum=0.0):
+        if old is None or new is None:
+            return
+        if new > old * (1 + tolerance) and new - old > minimum:
+            growth = (new / old - 1) * 100 if old else 100
+            regressions.append(f'{label}: {old} -> {new} (+{growth:.0f}%)')
+
+    for name, result in report['scenarios'].items():
+        old = baseline.get('scenarios', {}).get(name)
+        if not old or 'error' in result or 'error' in old:
+            continue
+        for operation, stats in result['latency'].items():
+            old_stats = old['latency'].get(operation)
+            if old_stats:
+                for key in ('p50', 'p95'):
+                    check(f'{name} {operation} {key}', stats[key], old_stats[key],
+                          MIN_REGRESSION_SECONDS)
+        check(f'{name} peak_rss_mb', result['peak_rss_mb'], old.get('peak_rss_mb'), 5.0)
+        check(f'{name} write bytes', result['io'].get('wchar'),
+              old.get('io', {}).get('wchar'), 1024 * 1024)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Offline benchmarks of the landing page generator")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help="comma separated, from %s (default: all)"
+                             % ', '.join(SCENARIOS))
+    parser.add_argument('--iterations', type=int, default=5,
+                        help="measured runs per scenario (default: %(default)s)")
+    parser.add_argument('--warmup', type=int, default=1,
+                        help="unmeasured runs first (default: %(default)s)")
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help="runs at the same time (default: %(default)s)")
+    parser.add_argument('--generation-mode', choices=('threads', 'asyncio'),
+                        default='threads',
+                        help="run the crews with run() or arun() "
+                             "(default: %(default)s)")
+    parser.add_argument('--llm-latency', type=float, default=0.05,
+                        help="seconds per fake LLM call (default: %(default)s)")
+    parser.add_argument('--tool-latency', type=float, default=0.02,
+                        help="seconds per stub API request (default: %(default)s)")
+    parser.add_argument('--components', type=int, default=8,
+                        help="section components of the template "
+                             "(default: %(default)s)")
+    parser.add_argument('--asset-kb', type=int, default=256,
+                        help="size of each template image (default: %(default)s)")
+    parser.add_argument('--page-kb', type=int, default=64,
+                        help="size of each scraped page (default: %(default)s)")
+    parser.add_argument('--tool-cache', action='store_true',
+                        help="keep the search and scrape cache enabled")
+    parser.add_argument('--out', default=str(BENCH_DIR / 'results' / 'latest.json'),
+                        help="report file (default: %(default)s)")
+    parser.add_argument('--compare', help="earlier report to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed relative slowdown with --compare "
+                             "(default: %(default)s)")
+    options = parser.parse_args(argv)
+
+    names = [name.strip() for name in options.scenarios.split(',') if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': vars(options),
+        'scenarios': {},
+    }
+    # Fresh interpreters, so imports, peak RSS and I/O belong to one scenario
+    context = multiprocessing.get_context('spawn')
+    for name in names:
+        print(f"⏱️ {name}: {options.iterations} iteration(s), "
+              f"concurrency {options.concurrency}...")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            try:
+                result = executor.submit(run_scenario, name, options).result()
+            except Exception as e:
+                result = {'error': str(e)[:500]}
+        report['scenarios'][name] = result
+        if 'error' in result:
+            print(f"❌ {name} failed: {result['error']}")
+            continue
+        print(f"✅ {name}: {result['throughput_per_second']}/s, "
+              f"peak RSS {result['peak_rss_mb']} MB, "
+              f"{result['io'].get('wchar', 0) // 1024} KB written")
+        if 'crew_pool' in result:
+            pool = result['crew_pool']
+            print(f"   crews built {pool['builds']}x, reused {pool['reuses']}x")
+        for operation, stats in result['latency'].items():
+            print(f"   {operation:<36} p50 {stats['p50'] * 1000:9.1f} ms   "
+                  f"p95 {stats['p95'] * 1000:9.1f} ms   n={stats['count']}")
+
+    out = Path(options.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"Report written to {out}")
+
+    failed = any('error' in result for result in report['scenarios'].values())
+    if options.compare:
+        baseline = json.loads(Path(options.compare).read_text(encoding='utf-8'))
+        regressions = compare(report, baseline, options.tolerance)
+        for regression in regressions:
+            print(f"📈 Regression: {regression}")
+        if not regressions:
+            print(f"✅ No regressions against {options.compare}")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""Generate landing pages for a whole file of ideas.
+
+Usage: python batch.py ideas.jsonl [--out batch_output] [--workers 2]
+
+The input is JSONL (one ``{"id": ..., "idea": ...}`` object or bare string
+per line) or CSV with ``id`` and ``idea`` columns; ``id`` is optional. Every
+idea runs in its own process and workspace and ends up as ``<out>/<id>.zip``.
+Progress is appended to ``<out>/progress.jsonl``, so running the same
+command again skips ideas that already completed and retries failed ones.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import multiprocessing
+import os
+import shutil
+import statistics
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from manifest import content_hash
+from workspace import Workspace
+
+PROGRESS_NAME = 'progress.jsonl'
+SUMMARY_NAME = 'summary.json'
+
+
+def read_ideas(path):
+    """Ideas of a JSONL or CSV file as a list of ``{'id', 'idea'}`` dicts"""
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.suffix.lower() == '.csv':
+            rows = list(csv.DictReader(f))
+        else:
+            rows = []
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_number}: invalid JSON: {e}") from e
+                rows.append(row if isinstance(row, dict) else {'idea': row})
+
+    ideas, seen = [], set()
+    for number, row in enumerate(rows, 1):
+        idea = str(row.get('idea') or '').strip()
+        if not idea:
+            print(f"⚠️ Skipping entry {number}: no idea")
+            continue
+        idea_id = str(row.get('id') or content_hash(idea)[:12]).strip()
+        if idea_id in seen:
+            print(f"⚠️ Skipping entry {number}: duplicate id '{idea_id}'")
+            continue
+        if not idea_id.replace('-', '').replace('_', '').isalnum():
+            raise ValueError(f"Entry {number}: id '{idea_id}' may only contain "
+                             "letters, digits, '-' and '_'")
+        seen.add(idea_id)
+        ideas.append({'id': idea_id, 'idea': idea})
+    return ideas
+
+
+def read_progress(out_dir):
+    """Last recorded result per idea id"""
+    progress = {}
+    path = Path(out_dir) / PROGRESS_NAME
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A batch killed mid-write leaves a truncated last line
+                    continue
+                progress[record['id']] = record
+    return progress
+
+
+def generate_one(item, out_dir, keep_workdir=False):
+    """Generate one idea in its own workspace; runs in a worker process"""
+    from crew import LandingPageCrew
+
+    root = Path(out_dir) / item['id']
+    if root.exists():
+        # Leftovers of an interrupted attempt
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+    workspace = Workspace(root)
+
+    start = time.perf_counter()
+    record = {'id': item['id'], 'status': 'done', 'error': None, 'phases': {}}
+    with open(root / 'run.log', 'w', encoding='utf-8') as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            crew = LandingPageCrew(item['idea'], workspace=workspace)
+            try:
+                crew.run()
+            finally:
+                record['phases'] = {name: round(duration, 3)
+                                    for name, duration in crew.phase_timings.items()}
+            archive = shutil.make_archive(str(root), 'zip', workspace.workdir)
+            record['archive'] = os.path.basename(archive)
+            if not keep_workdir:
+                shutil.rmtree(workspace.workdir)
+        except Exception as e:
+            traceback.print_exc()
+            record.update(status='error', error=str(e)[:500])
+    record['seconds'] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def summarize(records, wall_seconds):
+    """Throughput and per-phase latency of the ideas processed in this run"""
+    done = [r for r in records if r['status'] == 'done']
+    phases = {}
+    for record in done:
+        for name, duration in record['phases'].items():
+            phases.setdefault(name, []).append(duration)
+
+    def latency(values):
+        return {
+            'mean': round(statistics.fmean(values), 3),
+            'p50': round(_percentile(values, 0.5), 3),
+            'p95': round(_percentile(values, 0.95), 3),
+            'max': round(max(values), 3),
+        }
+
+    return {
+        'processed': len(records),
+        'done': len(done),
+        'failed': len(records) - len(done),
+        'wall_seconds': round(wall_seconds, 3),
+        'ideas_per_hour': (round(len(done) / wall_seconds * 3600, 2) if wall_seconds
+                           else 0.0),
+        'idea_seconds': latency([r['seconds'] for r in done]) if done else None,
+        'phases': {name: latency(values) for name, values in phases.items()},
+        'failures': {r['id']: r['error'] for r in records if r['status'] != 'done'},
+    }
+
+
+def run_batch(ideas, out_dir, workers=2, keep_workdirs=False):
+    """Generate ``ideas`` across a process pool, skipping completed ones.
+
+    Ideas that failed in an earlier run are tried again.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    progress = read_progress(out_dir)
+
+    pending = [item for item in ideas
+               if progress.get(item['id'], {}).get('status') != 'done'
+               or not (out_dir / f"{item['id']}.zip").exists()]
+    print(f"📦 {len(ideas)} ideas, {len(ideas) - len(pending)} already processed, "
+          f"{len(pending)} to generate with {workers} worker(s)")
+
+    records = []
+    start = time.perf_counter()
+    if pending:
+        # Fresh interpreters, crewai and its threads do not survive fork well
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(pending))),
+                                 mp_context=context) as executor, \
+                open(out_dir / PROGRESS_NAME, 'a', encoding='utf-8') as progress_file:
+            futures = {
+                executor.submit(generate_one, item, str(out_dir), keep_workdirs): item
+                for item in pending}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    record = future.result()
+                except Exception as e:
+                    # The worker process itself died
+                    record = {'id': item['id'], 'status': 'error',
+                              'error': str(e)[:500], 'phases': {}, 'seconds': None}
+                records.append(record)
+                progress_file.write(json.dumps(record) + '\n')
+                progress_file.flush()
+
+                icon = '✅' if record['status'] == 'done' else '❌'
+                detail = (f"{record['seconds']}s" if record['status'] == 'done'
+                          else record['error'])
+                print(f"{icon} [{len(records)}/{len(pending)}] {record['id']}: "
+                      f"{detail}")
+
+    summary = summarize(records, time.perf_counter() - start)
+    (out_dir / SUMMARY_NAME).write_text(json.dumps(summary, indent=2), encoding='utf-8')
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate landing pages for a file of ideas")
+    parser.add_argument('ideas', help="JSONL or CSV file of ideas")
+    parser.add_argument('--out', default='batch_output',
+                        help="output directory (default: %(default)s)")
+    parser.add_argument('--workers', type=int,
+                        default=int(os.getenv('BATCH_WORKERS', '2')),
+                        help="ideas generated at the same time (default: %(default)s)")
+    parser.add_argument('--keep-workdirs', action='store_true',
+                        help="keep workdirs next to the archives")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(read_ideas(args.ideas), args.out, workers=args.workers,
+                        keep_workdirs=args.keep_workdirs)
+
+    print("\n" + "=" * 60)
+    print(f"🎉 Batch complete: {summary['done']} done, {summary['failed']} failed "
+          f"in {summary['wall_seconds']:.0f}s ({summary['ideas_per_hour']} ideas/hour)")
+    for name, latency in summary['phases'].items():
+        print(f"⏱️ {name}: mean {latency['mean']}s, p50 {latency['p50']}s, "
+              f"p95 {latency['p95']}s")
+    print(f"Archives and {SUMMARY_NAME} are in {args.out}")
+    print("=" * 60)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+
+# Text files served by the code viewer and their language names
+LANGUAGES = {
+    '.html': 'html',
+    '.jsx': 'javascript',
+    '.js': 'javascript',
+    '.css': 'css',
+    '.json': 'json',
+    '.md': 'markdown',
+    '.txt': 'text'
+}
+
+
+def _hash_file(path, chunk_size=64 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+class FileIndex():
+    """Incrementally maintained index of the text files under a directory.
+
+    A refresh only stats files; a file is re-hashed only when its size or
+    mtime changed. Every change bumps ``generation`` and is stamped with
+    it, so clients can ask for what changed since the generation they saw.
+    """
+
+    def __init__(self, root, min_refresh_interval=1.0):
+        self.root = Path(root)
+        self.min_refresh_interval = min_refresh_interval
+        self.generation = 0
+        self._entries = {}
+        self._removed = {}
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        """Bring the index up to date with the filesystem"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_refresh < self.min_refresh_interval:
+                return self.generation
+            self._last_refresh = now
+
+            seen = set()
+            changed = []
+            for root, dirs, filenames in os.walk(self.root):
+                dirs.sort()
+                for filename in filenames:
+                    file_path = Path(root) / filename
+                    if file_path.suffix not in LANGUAGES:
+                        continue
+                    rel_path = file_path.relative_to(self.root).as_posix()
+                    seen.add(rel_path)
+                    try:
+                        stat = file_path.stat()
+                    except OSError:
+                        continue
+
+                    entry = self._entries.get(rel_path)
+                    if entry and (entry['size'], entry['mtime_ns']) == (
+                            stat.st_size, stat.st_mtime_ns):
+                        continue
+                    try:
+                        file_hash = _hash_file(file_path)
+                    except OSError:
+                        continue
+                    if entry and entry['hash'] == file_hash:
+                        # Touched but identical, remember the new stat only
+                        entry['size'] = stat.st_size
+                        entry['mtime_ns'] = stat.st_mtime_ns
+                        continue
+                    changed.append((rel_path, stat, file_hash))
+
+            removed = [rel_path for rel_path in self._entries if rel_path not in seen]
+            if changed or removed:
+                self.generation += 1
+                for rel_path, stat, file_hash in changed:
+                    self._entries[rel_path] = {
+                        'hash': file_hash,
+                        'size': stat.st_size,
+                        'mtime_ns': stat.st_mtime_ns,
+                        'language': LANGUAGES[Path(rel_path).suffix],
+                        'generation': self.generation,
+                    }
+                    self._removed.pop(rel_path, None)
+                for rel_path in removed:
+                    del self._entries[rel_path]
+                    self._removed[rel_path] = self.generation
+            return self.generation
+
+    def listing(self, since=0):
+        """Files changed after generation ``since`` and files removed since then"""
+        self.refresh()
+        with self._lock:
+            files = {
+                rel_path: {
+                    'hash': entry['hash'],
+                    'size': entry['size'],
+                    'language': entry['language'],
+                    'generation': entry['generation'],
+                }
+                for rel_path, entry in sorted(self._entries.items())
+                if entry['generation'] > since
+            }
+            removed = sorted(rel_path for rel_path, generation in self._removed.items()
+                             if generation > since)
+            return {'generation': self.generation, 'files': files, 'removed': removed}
+
+    def get(self, rel_path):
+        """Index entry of ``rel_path`` and its absolute path, or (None, None)"""
+        with self._lock:
+            entry = self._entries.get(rel_path)
+            if entry is None:
+                return None, None
+            return dict(entry), self.root / rel_path
@@ -0,0 +1,134 @@
+import ast
+import json
+import os
+import re
+from pathlib import Path, PurePosixPath
+
+COMPONENTS_DIR = ('src', 'components')
+COMPONENT_EXTENSIONS = {'.jsx', '.js', '.tsx', '.ts'}
+# Where a template's landing page lives, without extension
+PAGE_ENTRIES = (('src', 'app', 'page'), ('src', 'app', '(main)', 'page'),
+                ('src', 'pages', 'index'))
+
+FENCE = re.compile(r'```[a-zA-Z]*')
+
+
+def balanced_spans(text, opening='[', closing=']'):
+    """Yield every bracket-balanced substring (``[...]`` by default), outermost first"""
+    for start, char in enumerate(text):
+        if char != opening:
+            continue
+        depth, quote, escaped = 0, None, False
+        for end in range(start, len(text)):
+            char = text[end]
+            if quote:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == quote:
+                    quote = None
+            elif char in '"\'':
+                quote = char
+            elif char == opening:
+                depth += 1
+            elif char == closing:
+                depth -= 1
+                if depth == 0:
+                    yield text[start:end + 1]
+                    break
+
+
+def extract_string_array(text):
+    """Find the first array of strings in free-form LLM output.
+
+    Accepts JSON and Python list literals, inside code fences or surrounded
+    by prose. Returns None if there is none.
+    """
+    text = FENCE.sub('', str(text))
+    for candidate in balanced_spans(text):
+        for parse in (json.loads, ast.literal_eval):
+            try:
+                value = parse(candidate)
+            except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+                continue
+            if (isinstance(value, list) and value
+                    and all(isinstance(item, str) for item in value)):
+                return value
+    return None
+
+
+def normalize_component_path(path):
+    """``./workdir/Tpl/src/components/Hero.jsx`` -> ``Tpl/src/components/Hero.jsx``"""
+    path = str(path).strip().strip('`').strip().replace('\\', '/')
+    while path.startswith('./'):
+        path = path[2:]
+    if path.startswith('workdir/'):
+        path = path[len('workdir/'):]
+    return path
+
+
+def template_folder(path):
+    """``Tpl/src/components/Hero.jsx`` -> ``Tpl``, keeping nested folders such
+    as ``tailwindui-salient/salient-js`` whole; None outside a template"""
+    parts = PurePosixPath(normalize_component_path(path)).parts
+    if 'src' in parts[1:]:
+        return '/'.join(parts[:parts.index('src', 1)])
+    return parts[0] if len(parts) > 1 else None
+
+
+def page_entry(template_root):
+    """The landing page file of the template at ``template_root``, or None"""
+    template_root = Path(template_root)
+    for parts in PAGE_ENTRIES:
+        for extension in sorted(COMPONENT_EXTENSIONS):
+            path = template_root.joinpath(*parts).with_suffix(extension)
+            if path.is_file():
+                return path
+    return None
+
+
+def available_components(workdir):
+    """Component files of the templates copied into ``workdir``"""
+    workdir = Path(workdir)
+    found = []
+    if not workdir.is_dir():
+        return found
+    for components_dir in sorted(workdir.glob('**/src/components')):
+        if 'node_modules' in components_dir.parts:
+            continue
+        for root, dirs, files in os.walk(components_dir):
+            dirs.sort()
+            for name in sorted(files):
+                path = Path(root) / name
+                if path.suffix in COMPONENT_EXTENSIONS:
+                    found.append(path.relative_to(workdir).as_posix())
+    return found
+
+
+def validate_component_paths(paths, workdir):
+    """Split ``paths`` into usable component paths and rejections.
+
+    A usable path is relative to ``workdir``, stays inside it, lies under a
+    template's ``src/components`` and names an existing file. Returns the
+    normalized valid paths (deduplicated, in order) and ``{path: reason}``.
+    """
+    workdir = Path(workdir).resolve()
+    valid, rejected = [], {}
+    for original in paths:
+        path = normalize_component_path(original)
+        parts = PurePosixPath(path).parts
+        if not path or path.startswith('/') or '..' in parts:
+            rejected[original] = 'not a relative path inside the workdir'
+            continue
+        if not any(parts[i:i + 2] == COMPONENTS_DIR for i in range(len(parts) - 1)):
+            rejected[original] = 'not under src/components'
+            continue
+        resolved = (workdir / path).resolve()
+        if not str(resolved).startswith(str(workdir) + os.sep):
+            rejected[original] = 'resolves outside the workdir'
+        elif not resolved.is_file():
+            rejected[original] = 'file does not exist'
+        elif path not in valid:
+            valid.append(path)
+    return valid, rejected
@@ -1,27 +1,57 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 
-from langchain_community.agent_toolkits.file_management.toolkit import FileManagementToolkit
 import json
-import ast
+import asyncio
+import contextlib
+import contextvars
 import os
+import re
 import sys
-from pathlib import Path
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from dotenv import load_dotenv
 
-# Add tools to path
-tools_dir = os.path.join(os.path.dirname(__file__), 'tools')
-if tools_dir not in sys.path:
-    sys.path.insert(0, tools_dir)
+# Add the package and tools directories to path
+package_dir = os.path.dirname(__file__)
+tools_dir = os.path.join(package_dir, 'tools')
+for path in (package_dir, tools_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
 
 from browser_tools import BrowserTools
 from file_tools import FileTools
 from search_tools import SearchTools
 from template_tools import TemplateTools
+from llm_cache import build_llm, call_uncached, forget_answer
+from crew_factory import default_crew_factory, load_crew_config
+from component_paths import (available_components, extract_string_array,
+                             normalize_component_path, page_entry, template_folder,
+                             validate_component_paths)
+from instrumentation import add_to_span, complete_step, plan_steps, span
+from jsx_check import preflight
+from jsx_rewrite import rewrite_component
+from jsx_text import extract_texts, parse_replacements, skeleton
+from materialize import break_link
+from manifest import RunManifest
+from template_catalog import (candidate_components, catalog_entry_for, load_catalog,
+                              materialize_template, render_catalog)
+from template_search import shortlist_templates
+from workspace import Workspace, current_workspace, use_workspace
 
 load_dotenv()
 
+# Number of components processed at once in phase 3
+DEFAULT_CONTENT_CONCURRENCY = int(os.getenv("CONTENT_CREW_MAX_CONCURRENCY", "4"))
+
+# Update the page concurrently with content creation instead of before it
+DEFAULT_PIPELINED = os.getenv("PIPELINED_GENERATION", "false").lower() in (
+    "1", "true", "yes")
+
+# Times the choose step's final answer is asked for again when it is unusable
+CHOOSE_TEMPLATE_MAX_REASKS = int(os.getenv("CHOOSE_TEMPLATE_MAX_REASKS", "2"))
+
 # Set the API key for LiteLLM
 if os.getenv("GOOGLE_API_KEY"):
     os.environ["GOOGLE_API_KEY"] = os.getenv("GOOGLE_API_KEY")
@@ -32,6 +62,11 @@ class ExpandIdeaCrew:
     """ExpandIdea crew"""
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
+
+    def __init__(self, llm=None, workspace=None):
+        # Agents share one LLM, cached on disk unless LLM_CACHE_DISABLED is set
+        self.llm = llm or build_llm()
+        self.workspace = workspace or current_workspace()
     
     @agent
     def senior_idea_analyst_agent(self) -> Agent:
@@ -40,7 +75,7 @@ class ExpandIdeaCrew:
             allow_delegation=False,
             tools=[],
             verbose=True,
-            llm="google/gemini-2.5-flash"
+            llm=self.llm
         )
     
     @agent
@@ -50,7 +85,7 @@ class ExpandIdeaCrew:
             allow_delegation=False,
             tools=[],
             verbose=True,
-            llm="google/gemini-2.5-flash"
+            llm=self.llm
         )
     
     @task
@@ -82,10 +117,10 @@ class ChooseTemplateCrew:
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
-    toolkit = FileManagementToolkit(
-      root_dir='workdir',
-      selected_tools=["read_file", "list_directory"]
-    )
+    def __init__(self, llm=None, workspace=None):
+        # Agents share one LLM, cached on disk unless LLM_CACHE_DISABLED is set
+        self.llm = llm or build_llm()
+        self.workspace = workspace or current_workspace()
 
     @agent
     def senior_react_engineer_agent(self) -> Agent:
@@ -94,7 +129,7 @@ class ChooseTemplateCrew:
             allow_delegation=False,
             tools=[],
             verbose=True,
-            llm="google/gemini-2.5-flash"
+            llm=self.llm
         )
     
     @task
@@ -119,6 +154,30 @@ class ChooseTemplateCrew:
             process=Process.sequential,
             verbose=True,
         )
+
+    def choose_crew(self) -> Crew:
+        """Only the choose_template step, for pipelined runs"""
+        return Crew(
+            agents=[self.senior_react_engineer_agent()],
+            tasks=[self.choose_template()],
+            process=Process.sequential,
+            verbose=True,
+        )
+
+    def update_page_crew(self) -> Crew:
+        """Only the update_page step, given the chosen {components} and the
+        template's {page} as input"""
+        config = dict(self.tasks_config['update_page_task'])
+        config['description'] += (
+            "\nCOMPONENTS\n----------\n{components}\n"
+            "\nPAGE FILE\n----------\n{page}\n"
+        )
+        return Crew(
+            agents=[self.senior_react_engineer_agent()],
+            tasks=[Task(config=config, agent=self.senior_react_engineer_agent())],
+            process=Process.sequential,
+            verbose=True,
+        )
     
     
 @CrewBase
@@ -127,10 +186,10 @@ class CreateContentCrew:
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
-    toolkit = FileManagementToolkit(
-      root_dir='workdir',
-      selected_tools=["read_file", "list_directory"]
-    )
+    def __init__(self, llm=None, workspace=None):
+        # Agents share one LLM, cached on disk unless LLM_CACHE_DISABLED is set
+        self.llm = llm or build_llm()
+        self.workspace = workspace or current_workspace()
 
     @agent
     def senior_content_editor_agent(self) -> Agent:
@@ -140,7 +199,7 @@ class CreateContentCrew:
             tools=[
             ],
             verbose=True,
-            llm="google/gemini-2.5-flash"
+            llm=self.llm
         )
     
     @agent
@@ -150,7 +209,7 @@ class CreateContentCrew:
             allow_delegation=False,
             tools=[],
             verbose=True,
-            llm="google/gemini-2.5-flash"
+            llm=self.llm
         )
     
     @task
@@ -160,20 +219,6 @@ class CreateContentCrew:
             agent=self.senior_content_editor_agent(),
         )
     
-    @task
-    def update_component(self) -> Task: 
-        return Task(
-            config=self.tasks_config['update_component_task'],
-            agent=self.senior_content_editor_agent(),
-        )
-    
-    
-    @task
-    def qa_component(self) -> Task: 
-        return Task(
-            config=self.tasks_config['qa_component_task'],
-            agent=self.senior_content_editor_agent(),
-        )
     
     @crew
     def crew(self) -> Crew:
@@ -183,125 +228,577 @@ class CreateContentCrew:
             process=Process.sequential,
             verbose=True,
         )
+
+    def content_crew(self) -> Crew:
+        """Only the create_content step: replacement texts keyed by id for
+        the {text_skeleton} of the component"""
+        return Crew(
+            agents=[self.senior_content_editor_agent()],
+            tasks=[self.create_content()],
+            process=Process.sequential,
+            verbose=True,
+        )
     
+# CrewBase re-parses the YAML for every instance, parse it once per process instead
+for _crew_cls in (ExpandIdeaCrew, ChooseTemplateCrew, CreateContentCrew):
+    _crew_cls.load_yaml = staticmethod(load_crew_config)
+
+
 class LandingPageCrew():
-    def __init__(self, idea):
+    def __init__(self, idea, max_concurrency=None, llm=None, workspace=None,
+                 on_phase=None, crew_factory=None, incremental=False,
+                 pipelined=None):
         self.idea = idea
+        self.llm = llm
+        # Built crews are pooled and reused across kickoffs
+        self.crews = crew_factory or default_crew_factory
+        # on_phase(name, state, duration) is called as each phase starts and ends
+        self.on_phase = on_phase
+        self.phase_timings = {}
+        # Every path the crews and tools touch is resolved against this
+        self.workspace = workspace or Workspace.from_cwd()
+        # Incremental runs skip phases and components whose inputs are unchanged
+        self.manifest = (RunManifest.for_workspace(self.workspace) if incremental
+                         else None)
+        # Pipelined runs update the page concurrently with content creation
+        self.pipelined = DEFAULT_PIPELINED if pipelined is None else pipelined
+        # Components are independent, so phase 3 runs them on a bounded pool
+        self.max_concurrency = max_concurrency or DEFAULT_CONTENT_CONCURRENCY
     
     def run(self):
+        self.workspace.workdir.mkdir(parents=True, exist_ok=True)
+        with use_workspace(self.workspace):
+            self._run()
+
+    async def arun(self):
+        """Async ``run``: awaits the crews' async kickoffs, so one event loop
+        can drive many generations at once"""
+        self.workspace.workdir.mkdir(parents=True, exist_ok=True)
+        with use_workspace(self.workspace):
+            await self._arun()
+
+    def _run(self):
+        self._print_start()
+
+        with self._workflow_phase("PHASE 1: Expanding Your Idea", 'expand_idea',
+                                  "Idea expanded successfully"):
+            expanded_idea = self._reused_expanded_idea() or self._save_expanded_idea(
+                self.runExpandIdeaCrew(self.idea))
+
+        with self._workflow_phase("PHASE 2: Choosing Template", 'choose_template',
+                                  "Template chosen successfully"):
+            components = self._reused_components(expanded_idea)
+            pipelined_page = self.pipelined and not components
+            if not components:
+                components = self._save_components(
+                    expanded_idea,
+                    self.runChooseTemplateCrew(expanded_idea,
+                                               update_page=not self.pipelined))
+            self._plan_content_steps(components, update_page=pipelined_page)
+
+        self._print_phase("PHASE 3: Creating Content")
+        with contextlib.ExitStack() as stack:
+            page_future = None
+            if pipelined_page:
+                # The page update does not feed the component files, so it
+                # runs next to content creation instead of before it
+                page_executor = stack.enter_context(
+                    ThreadPoolExecutor(max_workers=1, thread_name_prefix="update-page"))
+                page_future = page_executor.submit(
+                    contextvars.copy_context().run, self._update_page,
+                    expanded_idea, components)
+
+            with self._phase('create_content'):
+                self.runCreateContentCrew(components, expanded_idea)
+
+            if page_future is not None:
+                page_future.result()
+        print("✅ Content creation completed\n")
+
+        self._print_done()
+
+    async def _arun(self):
+        self._print_start()
+
+        with self._workflow_phase("PHASE 1: Expanding Your Idea", 'expand_idea',
+                                  "Idea expanded successfully"):
+            expanded_idea = self._reused_expanded_idea() or self._save_expanded_idea(
+                await self.arunExpandIdeaCrew(self.idea))
+
+        with self._workflow_phase("PHASE 2: Choosing Template", 'choose_template',
+                                  "Template chosen successfully"):
+            components = self._reused_components(expanded_idea)
+            pipelined_page = self.pipelined and not components
+            if not components:
+                components = self._save_components(
+                    expanded_idea, await self.arunChooseTemplateCrew(
+                        expanded_idea, update_page=not self.pipelined))
+            self._plan_content_steps(components, update_page=pipelined_page)
+
+        self._print_phase("PHASE 3: Creating Content")
+        page_task = None
+        if pipelined_page:
+            page_task = asyncio.create_task(
+                self._aupdate_page(expanded_idea, components))
+        with self._phase('create_content'):
+            await self.arunCreateContentCrew(components, expanded_idea)
+        if page_task is not None:
+            await page_task
+        print("✅ Content creation completed\n")
+
+        self._print_done()
+
+    def _print_phase(self, title):
+        print(f"📋 {title}")
+        print("-" * 60)
+
+    @contextlib.contextmanager
+    def _workflow_phase(self, title, name, done):
+        """Banner, timing and progress step of a phase of ``run`` and ``arun``"""
+        self._print_phase(title)
+        with self._phase(name):
+            yield
+        complete_step()
+        print(f"✅ {done}\n")
+
+    def _print_start(self):
+        # Expand, choose and content until the components are known
+        plan_steps(3)
         print("\n" + "="*60)
         print("🚀 STARTING LANDING PAGE GENERATION WORKFLOW")
         print("="*60 + "\n")
-        
-        print("📋 PHASE 1: Expanding Your Idea")
-        print("-" * 60)
-        expanded_idea = self.runExpandIdeaCrew(self.idea)
-        print(f"✅ Idea expanded successfully\n")
-            
-        print("📋 PHASE 2: Choosing Template")
-        print("-" * 60)
-        components_paths_list = self.runChooseTemplateCrew(expanded_idea)
-        print(f"✅ Template chosen successfully\n")
-            
-        print("📋 PHASE 3: Creating Content")
-        print("-" * 60)
-        self.runCreateContentCrew(components_paths_list, expanded_idea)
-        print(f"✅ Content creation completed\n")
-        
+
+    def _print_done(self):
+        stats = self.crews.stats()
+        print(f"🏗️ Crews (process total) built {stats['builds']}x "
+              f"({stats['build_seconds']:.2f}s), reused {stats['reuses']}x, "
+              f"kickoffs {stats['kickoff_seconds']:.1f}s")
+
         print("="*60)
         print("🎉 LANDING PAGE GENERATION COMPLETE!")
         print("="*60 + "\n")
+
+    def _plan_content_steps(self, components, update_page):
+        """Expand and choose, one step per component and the page update"""
+        plan_steps(2 + len(components) + int(update_page))
+
+    def _reused_expanded_idea(self):
+        expanded_idea = self.manifest and self.manifest.expanded_idea_for(self.idea)
+        if expanded_idea:
+            print("♻️ Idea unchanged, reusing the expanded idea of the previous run")
+        return expanded_idea
+
+    def _save_expanded_idea(self, expanded_idea):
+        if self.manifest:
+            self.manifest.record_expanded_idea(self.idea, expanded_idea)
+            self.manifest.save()
+        return expanded_idea
+
+    def _reused_components(self, expanded_idea):
+        components = self.manifest and self.manifest.components_for(expanded_idea)
+        if components:
+            print("♻️ Expanded idea unchanged, reusing the components of the "
+                  "previous run")
+        return components
+
+    def _save_components(self, expanded_idea, components):
+        if self.manifest:
+            self.manifest.record_components(expanded_idea, components)
+            self.manifest.save()
+        return components
     
+    def _update_page(self, expanded_idea, components):
+        """Pipelined page update, failures are reported but not fatal"""
+        with self._page_phase():
+            self.runUpdatePageCrew(expanded_idea, components)
+
+    async def _aupdate_page(self, expanded_idea, components):
+        with self._page_phase():
+            await self.arunUpdatePageCrew(expanded_idea, components)
+
+    @contextlib.contextmanager
+    def _page_phase(self):
+        try:
+            with self._phase('update_page'):
+                yield
+        except Exception as e:
+            print(f"❌ Error updating page: {str(e)}")
+        finally:
+            complete_step()
+
+    @contextlib.contextmanager
+    def _phase(self, name):
+        """Time a phase and report it through the on_phase callback"""
+        self._notify_phase(name, 'started')
+        start = time.perf_counter()
+        try:
+            with span('phase', name):
+                yield
+        except Exception:
+            self._notify_phase(name, 'failed', time.perf_counter() - start)
+            raise
+        duration = time.perf_counter() - start
+        self.phase_timings[name] = duration
+        print(f"⏱️ Phase {name} took {duration:.1f}s")
+        self._notify_phase(name, 'completed', duration)
+
+    def _notify_phase(self, name, state, duration=None):
+        if self.on_phase is None:
+            return
+        try:
+            self.on_phase(name, state, duration)
+        except Exception as e:
+            print(f"⚠️ Phase callback failed: {e}")
+
     def runExpandIdeaCrew(self, idea):
         print(f"\n🔄 Starting ExpandIdeaCrew with idea: {idea[:100]}...\n")
         inputs1 = {
                 "idea": str(idea)
         }
-        expanded_idea = ExpandIdeaCrew().crew().kickoff(inputs=inputs1)
+        expanded_idea = self.crews.kickoff(ExpandIdeaCrew, inputs1,
+                                           llm=self.llm, workspace=self.workspace)
         print(f"\n📊 Expanded Idea Result:\n{str(expanded_idea)[:500]}...\n")
         return str(expanded_idea)
 
-    def runChooseTemplateCrew(self, expanded_idea):
+    def runChooseTemplateCrew(self, expanded_idea, update_page=True):
+        """Choose the components to update from the template catalog, in one
+        LLM call; with update_page=False the page is left to runUpdatePageCrew"""
         print(f"\n🔄 Starting ChooseTemplateCrew...\n")
-        inputs2 = {
-            "idea": expanded_idea
+        inputs2 = self._choose_inputs(expanded_idea)
+        components = self.crews.kickoff(ChooseTemplateCrew, inputs2,
+                                        llm=self.llm, workspace=self.workspace,
+                                        builder='choose_crew')
+        components = self._parse_components(components)
+        if update_page:
+            self.runUpdatePageCrew(expanded_idea, components)
+        return components
+
+    def runUpdatePageCrew(self, expanded_idea, components):
+        """Update the template page to use only the chosen components"""
+        print(f"\n🔄 Updating page for {len(components)} components...\n")
+        inputs = {
+            "idea": expanded_idea,
+            "components": json.dumps(components, indent=4),
+            "page": self._page_path(components)
         }
-        components = ChooseTemplateCrew().crew().kickoff(inputs=inputs2)
-        components = str(components)
-        
-        components = components.replace("\n", "").replace(" ",
-                                                        "").replace("```","").replace("\\", "")
-        
-        # Convert the string to a Python list
-        try:
-            components_paths_list = ast.literal_eval(components)  # Safely parse the string
-            print(f"✅ Found {len(components_paths_list)} components")
-        except Exception as e:
-            print(f"⚠️ Error parsing the string: {e}")
-            components_paths_list = []
-        result = json.dumps(components_paths_list, indent=4)
+        result = self.crews.kickoff(ChooseTemplateCrew, inputs,
+                                    llm=self.llm, workspace=self.workspace,
+                                    builder='update_page_crew')
+        self._preflight_page(components, result)
+        return result
+
+    async def arunExpandIdeaCrew(self, idea):
+        print(f"\n🔄 Starting ExpandIdeaCrew with idea: {idea[:100]}...\n")
+        expanded_idea = await self.crews.akickoff(
+            ExpandIdeaCrew, {"idea": str(idea)}, llm=self.llm, workspace=self.workspace)
+        print(f"\n📊 Expanded Idea Result:\n{str(expanded_idea)[:500]}...\n")
+        return str(expanded_idea)
+
+    async def arunChooseTemplateCrew(self, expanded_idea, update_page=True):
+        print("\n🔄 Starting ChooseTemplateCrew...\n")
+        inputs = await asyncio.to_thread(self._choose_inputs, expanded_idea)
+        components = await self.crews.akickoff(ChooseTemplateCrew, inputs,
+                                               llm=self.llm, workspace=self.workspace,
+                                               builder='choose_crew')
+        components = await asyncio.to_thread(self._parse_components, components)
+        if update_page:
+            await self.arunUpdatePageCrew(expanded_idea, components)
+        return components
+
+    async def arunUpdatePageCrew(self, expanded_idea, components):
+        print(f"\n🔄 Updating page for {len(components)} components...\n")
+        inputs = {
+            "idea": expanded_idea,
+            "components": json.dumps(components, indent=4),
+            "page": self._page_path(components)
+        }
+        result = await self.crews.akickoff(ChooseTemplateCrew, inputs,
+                                           llm=self.llm, workspace=self.workspace,
+                                           builder='update_page_crew')
+        await asyncio.to_thread(self._preflight_page, components, result)
+        return result
+
+    def _template_catalog(self):
+        return load_catalog(self.workspace.templates_dir, self.workspace.config_dir)
+
+    def _choose_inputs(self, expanded_idea):
+        """The idea and the catalog of the templates closest to it, so the
+        choice needs no tools and the prompt does not grow with the library"""
+        catalog = self._template_catalog()
+        if not catalog:
+            raise ValueError(f"None of the templates of templates.json is in "
+                             f"{self.workspace.templates_dir}")
+        start = time.perf_counter()
+        shortlist, scores = shortlist_templates(catalog, expanded_idea)
+        if scores:
+            print(f"🔎 Shortlisted {len(shortlist)} of {len(catalog)} templates in "
+                  f"{(time.perf_counter() - start) * 1000:.1f}ms: "
+                  + ", ".join(f"{folder} ({score:.2f})"
+                              for folder, score in scores.items()))
+        return {"idea": expanded_idea, "catalog": render_catalog(shortlist)}
+
+    def _page(self, components):
+        """Page file of the chosen template in the workdir"""
+        template = components and template_folder(components[0])
+        return template and page_entry(self.workspace.workdir / template)
+
+    def _page_path(self, components):
+        page = self._page(components)
+        if not page:
+            return "not found"
+        return page.relative_to(self.workspace.workdir).as_posix()
 
-        return json.loads(result)
+    def _preflight_page(self, components, answer=None):
+        """Check the page of the chosen template once the update_page step is
+        done, against the template's own page; a page that fails is not cached"""
+        page = self._page(components)
+        if not page:
+            return None
+        relative = page.relative_to(self.workspace.workdir)
+        original = self.workspace.templates_dir / relative
+        baseline = original.read_text(encoding='utf-8') if original.is_file() else None
+        if baseline is not None and page.read_text(encoding='utf-8') == baseline:
+            # Left as the template has it
+            return None
+        result = preflight(page, baseline=baseline, llm=self.llm,
+                           workdir=self.workspace.workdir)
+        if answer is not None and (not result.ok or result.status == 'restored'):
+            forget_answer(self.llm, str(answer))
+        return result
+
+    def _parse_components(self, components):
+        """Component paths in the ChooseTemplateCrew output, checked against
+        their template once it is placed in the workdir. If none are usable,
+        only the final answer is asked for again (a single LLM call), never
+        the whole crew."""
+        workdir = self.workspace.workdir
+        catalog = self._template_catalog()
+        output = str(components)
+        for attempt in range(CHOOSE_TEMPLATE_MAX_REASKS + 1):
+            paths = extract_string_array(output)
+            entry = catalog_entry_for(catalog, paths)
+            if entry is not None and materialize_template(entry, self.workspace):
+                print(f"📁 Template {entry['folder']} placed in the workdir")
+            valid, rejected = validate_component_paths(paths or [], workdir)
+            for path, reason in rejected.items():
+                print(f"⚠️ Ignoring component {path}: {reason}")
+            if valid:
+                print(f"✅ Found {len(valid)} components")
+                return valid
+
+            available = available_components(workdir) or [
+                component['path'] for entry in catalog
+                for component in candidate_components(entry)]
+            if not available:
+                raise ValueError(
+                    "No template components found in the workdir or the catalog")
+            problem = ("no JSON array of paths found" if paths is None
+                       else "none of the paths is a component of a template")
+            if attempt == 0:
+                forget_answer(self.llm, output)
+            if attempt == CHOOSE_TEMPLATE_MAX_REASKS:
+                break
+            print(f"⚠️ Unusable component list ({problem}), asking again "
+                  f"({attempt + 1}/{CHOOSE_TEMPLATE_MAX_REASKS})")
+            add_to_span(retries=1)
+            output = self._reask_components(output, problem, available)
+        raise ValueError(
+            f"ChooseTemplateCrew returned no usable component paths: {problem}")
+
+    def _reask_components(self, previous_answer, problem, available):
+        llm = self.llm or build_llm()
+        prompt = (
+            "Your previous answer could not be used: " + problem + ".\n\n"
+            "PREVIOUS ANSWER\n----------\n" + previous_answer[-4000:] + "\n\n"
+            "COMPONENT FILES AVAILABLE\n----------\n" + "\n".join(available) + "\n\n"
+            "Reply with ONLY a JSON array of the paths, taken from the list above, "
+            "of the 4 most important components to update. "
+            "Do not pick Pricing components."
+        )
+        return str(call_uncached(llm, [{"role": "user", "content": prompt}]))
 
     def runCreateContentCrew(self, components, expanded_idea):
-        from pathlib import Path
-        import re
-        
+        jobs, results = self._content_jobs(components, expanded_idea)
+        if not jobs:
+            return results
+
+        max_workers = max(1, min(self.max_concurrency, len(jobs)))
+        print(f"⚙️ Running CreateContentCrew for {len(jobs)} components "
+              f"(max concurrency: {max_workers})...")
+
+        with ThreadPoolExecutor(max_workers=max_workers,
+                                thread_name_prefix="content-crew") as executor:
+            # Copy the caller's context so workspace and output capture follow
+            futures = [
+                executor.submit(contextvars.copy_context().run,
+                                self._create_component_content, *job, expanded_idea)
+                for job in jobs
+            ]
+            for job, future in zip(jobs, futures, strict=True):
+                self._record_content(results, job, expanded_idea, future.result())
+
+        return self._content_done(results)
+
+    async def arunCreateContentCrew(self, components, expanded_idea):
+        jobs, results = self._content_jobs(components, expanded_idea)
+        if not jobs:
+            return results
+
+        max_concurrency = max(1, min(self.max_concurrency, len(jobs)))
+        print(f"⚙️ Running CreateContentCrew for {len(jobs)} components "
+              f"(max concurrency: {max_concurrency})...")
+
+        slots = asyncio.Semaphore(max_concurrency)
+
+        async def create(job):
+            async with slots:
+                return await self._acreate_component_content(*job, expanded_idea)
+
+        outcomes = await asyncio.gather(*(create(job) for job in jobs))
+        for job, ok in zip(jobs, outcomes, strict=True):
+            self._record_content(results, job, expanded_idea, ok)
+
+        return self._content_done(results)
+
+    def _content_jobs(self, components, expanded_idea):
+        """Components that need content, and results for the ones that do not"""
         # Establish safe working directory
-        workdir = Path("./workdir").resolve()
+        workdir = self.workspace.workdir.resolve()
 
+        jobs = []
+        results = {}
         for idx, component_path in enumerate(components, 1):
-            try:
-                print(f"\n🔄 Processing component {idx}/{len(components)}: {component_path}")
-                
-                # Validate component_path
-                if not isinstance(component_path, str):
-                    print(f"⚠️ Skipping invalid component path: {component_path}")
-                    continue
-                
-                # Extract filename safely
-                filename = component_path.split('./')[-1]
-                
-                # Validate filename contains only safe characters
-                if not re.match(r'^[a-zA-Z0-9._\-]+$', filename):
-                    print(f"⚠️ Skipping component with invalid filename: {filename}")
-                    continue
-                
-                # Validate the filename doesn't contain path traversal
-                if ".." in filename or "/" in filename:
-                    print(f"⚠️ Skipping component with unsafe filename: {filename}")
-                    continue
-                
-                # Create safe file path
-                file_path = workdir / filename
-                
-                # Resolve and validate the path is within workdir
-                resolved_path = file_path.resolve()
-                if not str(resolved_path).startswith(str(workdir)):
-                    print(f"⚠️ Skipping component outside workdir: {filename}")
-                    continue
-                
-                # Check if file exists before reading
-                if not resolved_path.exists():
-                    print(f"⚠️ Component file does not exist: {resolved_path}")
-                    continue
-                
-                # Read file content safely
-                with open(resolved_path, "r", encoding="utf-8") as f:
-                    file_content = f.read()
-                
-                print(f"📄 File content loaded ({len(file_content)} bytes)")
-                
-                inputs3 = {
-                    "component": component_path,
-                    "expanded_idea": expanded_idea,
-                    "file_content": file_content
-                }
-
-                print(f"⚙️ Running CreateContentCrew for {filename}...")
-                CreateContentCrew().crew().kickoff(inputs=inputs3)
-                print(f"✅ Component {filename} processed successfully")
-                
-            except Exception as e:
-                print(f"❌ Error processing component {component_path}: {str(e)}")
+            print(f"\n🔄 Processing component {idx}/{len(components)}: "
+                  f"{component_path}")
+            job = self._prepare_component(component_path, workdir)
+            if job is None:
+                complete_step()
+                continue
+            if self.manifest and self.manifest.component_is_current(
+                    component_path, expanded_idea, job[2]):
+                print(f"♻️ Component {job[1]} unchanged since the previous run, "
+                      "skipping")
+                results[component_path] = True
+                complete_step()
                 continue
+            jobs.append(job)
+        return jobs, results
+
+    def _record_content(self, results, job, expanded_idea, ok):
+        component_path, _, file_content, resolved_path = job
+        results[component_path] = ok
+        complete_step()
+        if ok and self.manifest:
+            self.manifest.record_component(component_path, expanded_idea,
+                                           file_content, resolved_path)
+
+    def _content_done(self, results):
+        if self.manifest:
+            self.manifest.save()
+
+        succeeded = sum(1 for ok in results.values() if ok)
+        print(f"📊 {succeeded}/{len(results)} components processed successfully")
+        return results
+
+    def _prepare_component(self, component_path, workdir):
+        """Validate a component path and load its content, or return None"""
+        try:
+            # Validate component_path
+            if not isinstance(component_path, str):
+                print(f"⚠️ Skipping invalid component path: {component_path}")
+                return None
+
+            # Path relative to the workdir, e.g. Keynote/src/components/Hero.jsx
+            filename = normalize_component_path(component_path)
+
+            # Validate filename contains only safe characters
+            if not re.match(r'^[a-zA-Z0-9._\-/ ]+$', filename):
+                print(f"⚠️ Skipping component with invalid filename: {filename}")
+                return None
+
+            # Validate the filename doesn't contain path traversal
+            if ".." in filename or filename.startswith("/"):
+                print(f"⚠️ Skipping component with unsafe filename: {filename}")
+                return None
+
+            # Create safe file path
+            file_path = workdir / filename
+
+            # Resolve and validate the path is within workdir
+            resolved_path = file_path.resolve()
+            if not str(resolved_path).startswith(str(workdir)):
+                print(f"⚠️ Skipping component outside workdir: {filename}")
+                return None
+
+            # Check if file exists before reading
+            if not resolved_path.exists():
+                print(f"⚠️ Component file does not exist: {resolved_path}")
+                return None
+
+            # Read file content safely
+            with open(resolved_path, "r", encoding="utf-8") as f:
+                file_content = f.read()
+
+            print(f"📄 File content loaded ({len(file_content)} bytes)")
+            return component_path, filename, file_content, resolved_path
+
+        except Exception as e:
+            print(f"❌ Error processing component {component_path}: {str(e)}")
+            return None
+
+    def _create_component_content(self, component_path, filename, file_content,
+                                  resolved_path, expanded_idea):
+        """Run CreateContentCrew for one component, isolating its failures"""
+        try:
+            print(f"⚙️ Running CreateContentCrew for {filename}...")
+            slots = extract_texts(file_content)
+            answer = None
+            if slots:
+                answer = self.crews.kickoff(
+                    CreateContentCrew,
+                    self._content_inputs(component_path, slots, expanded_idea),
+                    llm=self.llm, workspace=self.workspace, builder='content_crew')
+            self._rewrite_content(filename, file_content, slots, answer, resolved_path)
+            print(f"✅ Component {filename} processed successfully")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error processing component {component_path}: {str(e)}")
+            return False
+
+    async def _acreate_component_content(self, *job):
+        # crewai's kickoff_async is a thread too: run the whole component in one
+        return await asyncio.to_thread(self._create_component_content, *job)
+
+    def _content_inputs(self, component_path, slots, expanded_idea):
+        """Inputs of the create_content step: only the component's texts, not its
+        source"""
+        return {
+            "component": component_path,
+            "expanded_idea": expanded_idea,
+            "text_skeleton": skeleton(slots),
+        }
+
+    def _rewrite_content(self, filename, file_content, slots, answer, resolved_path):
+        """Write the component with the replacement texts of ``answer`` and the
+        single page rules applied, without an LLM call, and return it"""
+        replacements = parse_replacements(answer, slots) if slots else {}
+        if slots and not replacements:
+            forget_answer(self.llm, answer)
+            raise ValueError("CreateContentCrew returned no usable text replacements")
+        updated, report = rewrite_component(file_content, slots, replacements)
+        print(f"✂️ Rewrote {filename}: {report['texts']}/{len(slots)} texts replaced, "
+              f"{report['hrefs']} links pointed at #"
+              + (", 'use client' added" if report['use_client_added'] else "")
+              + f" (prompt had {len(skeleton(slots))} of {len(file_content)} "
+                "characters)")
+        if updated != file_content:
+            # The file may still be linked to the template, give it its own copy
+            break_link(resolved_path)
+            resolved_path.write_text(updated, encoding='utf-8')
+            result = preflight(resolved_path, baseline=file_content, llm=self.llm,
+                               workdir=self.workspace.workdir)
+            if not result.ok or result.status == 'restored':
+                forget_answer(self.llm, answer)
+            updated = result.source
+        return updated
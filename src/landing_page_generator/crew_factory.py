@@ -0,0 +1,182 @@
+import contextlib
+import copy
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import yaml
+from instrumentation import span
+from llm_cache import build_llm
+
+# Config entries the crews in crew.py look up by name
+REQUIRED_AGENTS = (
+    'senior_idea_analyst', 'senior_strategist',
+    'senior_react_engineer', 'senior_content_editor',
+)
+REQUIRED_TASKS = (
+    'expand_idea_task', 'refine_idea_task', 'choose_template_task',
+    'update_page_task', 'component_content_task',
+)
+
+_config_cache = {}
+_config_lock = threading.Lock()
+
+
+def load_crew_config(path):
+    """Parse and validate a crew YAML file once per process (until it changes).
+
+    Used in place of CrewBase's loader, which re-parses the file for every
+    crew instance. Callers get their own copy since CrewBase mutates it.
+    """
+    path = Path(path)
+    mtime = path.stat().st_mtime_ns
+    with _config_lock:
+        cached = _config_cache.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, 'r', encoding='utf-8') as f:
+                config = yaml.safe_load(f) or {}
+            _validate_config(path, config)
+            cached = (mtime, config)
+            _config_cache[path] = cached
+    return copy.deepcopy(cached[1])
+
+
+def _validate_config(path, config):
+    if not isinstance(config, dict):
+        raise ValueError(f"{path} must contain a mapping of names to configs")
+
+    if path.name == 'agents.yaml':
+        required, fields = REQUIRED_AGENTS, ('role', 'goal', 'backstory')
+    elif path.name == 'tasks.yaml':
+        required, fields = REQUIRED_TASKS, ('description',)
+    else:
+        return
+
+    missing = [name for name in required if name not in config]
+    if missing:
+        raise ValueError(f"{path} is missing: {', '.join(missing)}")
+    for name in required:
+        empty = [field for field in fields if not (config[name] or {}).get(field)]
+        if empty:
+            raise ValueError(f"{path}: '{name}' has no {', '.join(empty)}")
+
+
+def _crew_name(crew_cls):
+    """``ExpandIdeaCrew`` for the ``CrewBase(ExpandIdeaCrew)`` class @CrewBase makes"""
+    name = crew_cls.__name__
+    if name.startswith('CrewBase(') and name.endswith(')'):
+        return name[len('CrewBase('):-1]
+    return name
+
+
+def _agents(built):
+    """Agents of a built crew, including the ones only its tasks refer to"""
+    agents = {id(agent): agent for agent in built.agents}
+    for task in built.tasks:
+        if task.agent is not None:
+            agents.setdefault(id(task.agent), task.agent)
+    return agents.values()
+
+
+def _bind(built, llm):
+    """Point every agent of ``built`` at ``llm`` for the next kickoff"""
+    for agent in _agents(built):
+        agent.llm = llm
+        # Rebuilt from agent.llm by execute_task, never reused across kickoffs
+        agent.agent_executor = None
+
+
+class CrewFactory():
+    """Builds crews once and reuses them across kickoffs.
+
+    Building a crew instantiates every Agent and Task; kickoff only
+    re-interpolates the inputs, so idle crews are pooled per crew class
+    and builder and handed out again to any job. The job's LLM is bound
+    to the agents at checkout and dropped when the crew goes back to the
+    pool; tools find the job's workspace through ``current_workspace``.
+    A crew is never shared by two concurrent kickoffs. Build and kickoff
+    wall time are tracked apart.
+    """
+
+    def __init__(self, max_idle=8, max_pools=32):
+        self.max_idle = max_idle
+        self.max_pools = max_pools
+        self.builds = 0
+        self.reuses = 0
+        self.build_seconds = 0.0
+        self.kickoff_seconds = 0.0
+        self._pools = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def acquire(self, crew_cls, llm=None, workspace=None, builder='crew'):
+        """Check out a Crew built by ``crew_cls().<builder>()``, returning it
+        to the pool afterwards"""
+        key = (crew_cls, builder)
+        llm = llm or build_llm()
+
+        with self._lock:
+            pool = self._pools.setdefault(key, [])
+            self._pools.move_to_end(key)
+            built = pool.pop() if pool else None
+
+        if built is None:
+            start = time.perf_counter()
+            built = getattr(crew_cls(llm=llm, workspace=workspace), builder)()
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.builds += 1
+                self.build_seconds += elapsed
+        else:
+            with self._lock:
+                self.reuses += 1
+
+        _bind(built, llm)
+        try:
+            yield built
+        finally:
+            _bind(built, None)
+            with self._lock:
+                pool = self._pools.setdefault(key, [])
+                if len(pool) < self.max_idle:
+                    pool.append(built)
+                while len(self._pools) > self.max_pools:
+                    self._pools.popitem(last=False)
+
+    def kickoff(self, crew_cls, inputs, llm=None, workspace=None, builder='crew'):
+        """Run a pooled crew of ``crew_cls`` with ``inputs``"""
+        with span('crew', _crew_name(crew_cls), builder=builder), \
+                self.acquire(crew_cls, llm=llm, workspace=workspace,
+                             builder=builder) as built:
+            start = time.perf_counter()
+            try:
+                return built.kickoff(inputs=inputs)
+            finally:
+                with self._lock:
+                    self.kickoff_seconds += time.perf_counter() - start
+
+    async def akickoff(self, crew_cls, inputs, llm=None, workspace=None,
+                       builder='crew'):
+        """Async ``kickoff``, awaiting the crew's ``kickoff_async``"""
+        with span('crew', _crew_name(crew_cls), builder=builder), \
+                self.acquire(crew_cls, llm=llm, workspace=workspace,
+                             builder=builder) as built:
+            start = time.perf_counter()
+            try:
+                return await built.kickoff_async(inputs=inputs)
+            finally:
+                with self._lock:
+                    self.kickoff_seconds += time.perf_counter() - start
+
+    def stats(self):
+        with self._lock:
+            return {
+                'builds': self.builds,
+                'reuses': self.reuses,
+                'build_seconds': round(self.build_seconds, 4),
+                'kickoff_seconds': round(self.kickoff_seconds, 4),
+            }
+
+
+default_crew_factory = CrewFactory()
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+def make_key(*parts) -> str:
+    """Build a content-addressed cache key from JSON-serializable parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache():
+    """Persistent key/value cache backed by SQLite.
+
+    Entries expire after ``ttl`` seconds and the cache is kept under
+    ``max_entries`` / ``max_bytes`` by evicting the least recently used
+    entries first. Expired entries are kept for another ``stale_ttl``
+    seconds, during which ``lookup`` still returns them flagged as stale.
+    Hit/miss counters are kept per instance.
+    """
+
+    def __init__(self, path, ttl=7 * 24 * 3600, max_entries=5000,
+                 max_bytes=256 * 1024 * 1024, stale_ttl=0):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30,
+                                     check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    expires_at REAL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_entries_accessed "
+                "ON entries (accessed_at)")
+            self._conn.commit()
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key`` or ``default`` on a miss"""
+        found = self.lookup(key, allow_stale=False)
+        return default if found is None else found[0]
+
+    def lookup(self, key, allow_stale=True):
+        """Return ``(value, stale)`` for ``key``, or None on a miss.
+
+        ``stale`` is True for an expired entry still within ``stale_ttl``.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = row
+            stale = expires_at is not None and expires_at <= now
+            if stale and (not allow_stale or expires_at + self.stale_ttl <= now):
+                if expires_at + self.stale_ttl <= now:
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(value), stale
+
+    def set(self, key, value, ttl=None):
+        """Store a JSON-serializable ``value`` under ``key``"""
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl else None
+        payload = json.dumps(value, ensure_ascii=False)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, value, size, created_at, accessed_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, payload, len(payload.encode("utf-8")), now, now, expires_at))
+            self.writes += 1
+            self._evict()
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop expired entries, then LRU entries until within bounds"""
+        self._conn.execute(
+            "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (time.time() - self.stale_ttl,))
+
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at ASC").fetchall()
+        evicted = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        self.evictions += len(evicted)
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / lookups) if lookups else 0.0,
+            'writes': self.writes,
+            'evictions': self.evictions,
+            'entries': count,
+            'bytes': total,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def cache_dir() -> Path:
+    """Directory holding the on-disk caches"""
+    default = Path(__file__).resolve().parent / ".cache"
+    return Path(os.getenv("LANDING_PAGE_CACHE_DIR", str(default)))
@@ -0,0 +1,38 @@
+import hashlib
+import threading
+import time
+
+from llm_cache import CachedLLM
+
+
+class FakeLLM(CachedLLM):
+    """Deterministic offline stand-in for the Gemini model.
+
+    Answers are derived from the prompt (or produced by ``responder``) so the
+    crews, the response cache and the tools can be exercised without network
+    access. ``latency`` simulates model round-trip time in seconds.
+    """
+
+    def __init__(self, responder=None, latency=0.0, cache=None,
+                 model="fake/deterministic"):
+        super().__init__(model=model, cache=cache)
+        self.responder = responder
+        self.latency = latency
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+
+    def _uncached_call(self, messages, **_kwargs):
+        with self._calls_lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if self.responder is not None:
+            return self.responder(messages)
+
+        prompt = messages if isinstance(messages, str) else messages[-1]["content"]
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        return f"Thought: I now know the final answer\nFinal Answer: fake-{digest}"
+
+    def supports_stop_words(self) -> bool:
+        return False
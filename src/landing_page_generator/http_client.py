@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from instrumentation import add_to_span, metrics
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HttpClient():
+    """Shared HTTP client for the tools talking to external APIs.
+
+    Wraps one ``requests.Session`` so connections are pooled and kept alive
+    across tool calls. Every request gets a timeout, is retried with
+    exponential backoff on connection errors and 429/5xx answers (honouring
+    ``Retry-After``), and at most ``max_per_host`` requests run against one
+    host at a time. Latency, retries and errors are tracked per host.
+    """
+
+    def __init__(self, connect_timeout=5.0, read_timeout=60.0, retries=3,
+                 backoff=0.5, max_per_host=4, pool_size=10):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_per_host = max(1, max_per_host)
+        self._host_limits = {}
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            # The search and browserless APIs are POST-only and idempotent
+            allowed_methods=None,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                              max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _host_limit(self, host):
+        with self._lock:
+            limit = self._host_limits.get(host)
+            if limit is None:
+                limit = threading.BoundedSemaphore(self.max_per_host)
+                self._host_limits[host] = limit
+            return limit
+
+    def _record(self, host, elapsed, retries, failed):
+        with self._lock:
+            host_metrics = self._metrics.setdefault(host, {
+                'requests': 0, 'errors': 0, 'retries': 0,
+                'total_seconds': 0.0, 'max_seconds': 0.0,
+            })
+            host_metrics['requests'] += 1
+            host_metrics['errors'] += int(failed)
+            host_metrics['retries'] += retries
+            host_metrics['total_seconds'] += elapsed
+            host_metrics['max_seconds'] = max(host_metrics['max_seconds'], elapsed)
+        metrics.observe('lpg_http_request_seconds', elapsed,
+                        help='Requests to external APIs, retries included',
+                        host=host, outcome='error' if failed else 'ok')
+
+    def request(self, method, url, **kwargs):
+        """Send a request through the pooled session, see ``requests.request``"""
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlsplit(url).netloc
+        with self._host_limit(host):
+            start = time.perf_counter()
+            response, failed = None, True
+            try:
+                response = self.session.request(method, url, **kwargs)
+                failed = response.status_code >= 400
+                return response
+            finally:
+                retries = 0
+                raw = response.raw if response is not None else None
+                if raw is not None and raw.retries:
+                    retries = len(raw.retries.history)
+                self._record(host, time.perf_counter() - start, retries, failed)
+                if retries:
+                    add_to_span(retries=retries)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def stats(self):
+        """Per-host request counts, retries, errors and latency in seconds"""
+        with self._lock:
+            stats = {}
+            for host, metrics in self._metrics.items():
+                stats[host] = dict(metrics)
+                stats[host]['avg_seconds'] = round(
+                    metrics['total_seconds'] / metrics['requests'], 4)
+                stats[host]['total_seconds'] = round(metrics['total_seconds'], 4)
+                stats[host]['max_seconds'] = round(metrics['max_seconds'], 4)
+            return stats
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Return the process-wide HTTP client shared by all tools"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient(
+                connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+                read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", "60")),
+                retries=int(os.getenv("HTTP_RETRIES", "3")),
+                backoff=float(os.getenv("HTTP_RETRY_BACKOFF", "0.5")),
+                max_per_host=int(os.getenv("HTTP_MAX_PER_HOST", "4")),
+            )
+        return _default_client
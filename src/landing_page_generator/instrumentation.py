@@ -0,0 +1,310 @@
+import contextlib
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+
+# Upper bounds in seconds, from a cache hit up to a whole slow phase
+DURATION_BUCKETS = (0.005, 0.05, 0.25, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _render_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class MetricsRegistry():
+    """Process-wide counters and histograms, rendered in the Prometheus text
+    exposition format"""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def inc(self, metric, value=1, help=None, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(metric, ('counter', help or metric))
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, metric, value, help=None, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(metric, ('histogram', help or metric))
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {
+                    'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram['buckets'][i] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, (kind, description) in sorted(self._help.items()):
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} {kind}')
+                if kind == 'counter':
+                    for (metric, labels), value in sorted(self._counters.items()):
+                        if metric == name:
+                            lines.append(f'{name}{_render_labels(labels)} {value}')
+                    continue
+                for (metric, labels), histogram in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    buckets = zip(self.buckets, histogram['buckets'], strict=True)
+                    for bound, count in [*buckets, ('+Inf', histogram['count'])]:
+                        bucket_labels = _render_labels(labels, [('le', bound)])
+                        lines.append(f'{name}_bucket{bucket_labels} {count}')
+                    rendered = _render_labels(labels)
+                    lines.append(f'{name}_sum{rendered} {round(histogram["sum"], 6)}')
+                    lines.append(f'{name}_count{rendered} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+
+class Trace():
+    """Spans and step progress of one generation run.
+
+    Steps are the units of work a run is known to need (one crew kickoff
+    per phase, one per component); ``progress`` is the share completed.
+    ``on_progress(done, total)`` is called whenever either changes.
+    """
+
+    def __init__(self, trace_id=None, max_spans=5000, on_progress=None):
+        self.trace_id = trace_id
+        self.max_spans = max_spans
+        self.on_progress = on_progress
+        self.started_at = time.time()
+        self.spans = []
+        self.dropped_spans = 0
+        self.steps_total = 0
+        self.steps_done = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next_span_id(self):
+        return next(self._ids)
+
+    def add_span(self, span):
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(span)
+            else:
+                self.dropped_spans += 1
+
+    def plan_steps(self, total):
+        """Expect ``total`` steps in all (never fewer than already done)"""
+        with self._lock:
+            self.steps_total = max(total, self.steps_done)
+        self._notify()
+
+    def complete_step(self, count=1):
+        with self._lock:
+            self.steps_done += count
+            self.steps_total = max(self.steps_total, self.steps_done)
+        self._notify()
+
+    @property
+    def progress(self):
+        with self._lock:
+            return self.steps_done / self.steps_total if self.steps_total else 0.0
+
+    def _notify(self):
+        if self.on_progress is None:
+            return
+        try:
+            self.on_progress(self.steps_done, self.steps_total)
+        except Exception as e:
+            print(f"⚠️ Progress callback failed: {e}")
+
+    def summary(self):
+        """Totals per span kind and name"""
+        totals = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            entry = totals.setdefault(f"{span['kind']}:{span['name']}", {
+                'count': 0, 'errors': 0, 'seconds': 0.0, 'tokens_in': 0,
+                'tokens_out': 0, 'cache_hits': 0, 'retries': 0})
+            entry['count'] += 1
+            entry['errors'] += span['status'] == 'error'
+            entry['seconds'] = round(entry['seconds'] + span['duration'], 6)
+            attrs = span['attrs']
+            entry['tokens_in'] += attrs.get('tokens_in', 0)
+            entry['tokens_out'] += attrs.get('tokens_out', 0)
+            entry['cache_hits'] += bool(attrs.get('cache_hit'))
+            entry['retries'] += attrs.get('retries', 0)
+        return totals
+
+    def to_dict(self):
+        with self._lock:
+            spans = [dict(span, attrs=dict(span['attrs'])) for span in self.spans]
+            data = {
+                'trace_id': self.trace_id,
+                'started_at': self.started_at,
+                'steps_done': self.steps_done,
+                'steps_total': self.steps_total,
+                'dropped_spans': self.dropped_spans,
+            }
+        data['progress'] = round(self.progress, 4)
+        data['summary'] = self.summary()
+        data['spans'] = spans
+        return data
+
+    def save(self, path):
+        """Write the trace as JSON atomically"""
+        path = Path(path)
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self.to_dict(), indent=2, default=str),
+                            encoding='utf-8')
+        os.replace(tmp_path, path)
+
+
+_current_trace = ContextVar('current_trace', default=None)
+_current_span = ContextVar('current_span', default=None)
+# Spans of concurrent children are added up into their shared parent
+_rollup_lock = threading.Lock()
+ROLLUP_ATTRS = ('tokens_in', 'tokens_out', 'retries')
+
+
+def current_trace():
+    """Trace of the running generation, if it is traced"""
+    return _current_trace.get()
+
+
+@contextlib.contextmanager
+def use_trace(trace):
+    """Record the spans of this thread/task (and the ones it starts) in ``trace``"""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def plan_steps(total):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.plan_steps(total)
+
+
+def complete_step(count=1):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.complete_step(count)
+
+
+def _add_counts(span, counts):
+    with _rollup_lock:
+        for name, value in counts.items():
+            span['attrs'][name] = span['attrs'].get(name, 0) + value
+
+
+def add_to_span(**counts):
+    """Add ``counts`` (e.g. ``retries=2``) to the attributes of the current span"""
+    span = _current_span.get()
+    if span is None:
+        return
+    _add_counts(span, counts)
+    if counts.get('retries'):
+        metrics.inc('lpg_retries_total', counts['retries'],
+                    help='Retried requests and re-prompts',
+                    kind=span['kind'], name=span['name'])
+
+
+def _record_metrics(kind, name, status, duration, attrs):
+    metrics.observe('lpg_span_duration_seconds', duration,
+                    help='Wall time of phases, crew kickoffs, LLM, tool calls '
+                         'and checks',
+                    kind=kind, name=name)
+    metrics.inc('lpg_spans_total', help='Completed spans by outcome',
+                kind=kind, name=name, status=status)
+    if kind == 'llm':
+        metrics.inc('lpg_llm_cache_lookups_total', help='LLM response cache lookups',
+                    model=name, result='hit' if attrs.get('cache_hit') else 'miss')
+        for direction in ('in', 'out'):
+            tokens = attrs.get(f'tokens_{direction}')
+            if tokens:
+                metrics.inc('lpg_llm_tokens_total', tokens,
+                            help='LLM tokens by direction',
+                            model=name, direction=direction)
+
+
+@contextlib.contextmanager
+def span(kind, name, **attrs):
+    """Time a unit of work of ``kind`` (phase, crew, llm, tool).
+
+    Yields the span's attribute dict so callers can annotate it; setting
+    ``error`` marks the span as failed, as does an exception. Token and
+    retry counts are added up into the parent span, so a phase carries the
+    totals of its crews and LLM calls. The span is added to the current
+    trace, if any, and to the process metrics.
+    """
+    trace = _current_trace.get()
+    parent = _current_span.get()
+    record = {
+        'id': trace.next_span_id() if trace is not None else None,
+        'parent_id': parent['id'] if parent is not None else None,
+        'kind': kind,
+        'name': name,
+        'attrs': dict(attrs),
+    }
+    token = _current_span.set(record)
+    started_at = time.time()
+    start = time.perf_counter()
+    status = 'ok'
+    try:
+        yield record['attrs']
+    except BaseException as e:
+        status = 'error'
+        record['attrs'].setdefault('error', str(e)[:300])
+        raise
+    finally:
+        _current_span.reset(token)
+        duration = time.perf_counter() - start
+        if record['attrs'].get('error'):
+            status = 'error'
+        _record_metrics(kind, name, status, duration, record['attrs'])
+        if parent is not None:
+            counts = {attr: record['attrs'][attr] for attr in ROLLUP_ATTRS
+                      if record['attrs'].get(attr)}
+            if counts:
+                _add_counts(parent, counts)
+        if trace is not None:
+            record.update(status=status, duration=round(duration, 6),
+                          start=round(started_at - trace.started_at, 6))
+            trace.add_span(record)
+
+
+def traced_tool(name):
+    """Record every call of a tool function as a ``tool`` span; tools that
+    report failures as ``Error: ...`` strings count as failed"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span('tool', name) as attrs:
+                result = func(*args, **kwargs)
+                if isinstance(result, str) and result.startswith('Error'):
+                    attrs['error'] = result[:300]
+                return result
+        return wrapper
+    return decorator
@@ -0,0 +1,300 @@
+import asyncio
+import inspect
+import itertools
+import queue
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from log_store import LogRingBuffer
+
+MAX_LOGS_PER_JOB = 1000
+# Threads of the event loop's executor beyond what the jobs use themselves
+EXECUTOR_HEADROOM = 8
+
+
+class JobQueueFull(Exception):
+    """Raised when the generation queue cannot accept more jobs"""
+
+
+class Job():
+    """A single landing page generation with its own status, logs and output"""
+
+    def __init__(self, job_id, idea, output_dir, priority=0, base_job_id=None,
+                 sequence=0):
+        self.id = job_id
+        self.idea = idea
+        self.priority = priority
+        # Submission order, breaks ties between jobs of equal priority
+        self.sequence = sequence
+        # Job whose outputs this one iterates on, if any
+        self.base_job_id = base_job_id
+        self.output_dir = Path(output_dir)
+        self.state = 'queued'
+        self.status = 'Queued'
+        self.progress = 0
+        self.error = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self.logs = LogRingBuffer(MAX_LOGS_PER_JOB)
+        self.phases = {}
+        # Spans and step progress of the run, see instrumentation.Trace
+        self.trace = None
+        self.version = 0
+        self._lock = threading.Lock()
+        # Notified on every new log entry and status change
+        self._changed = threading.Condition(self._lock)
+
+    @property
+    def running(self):
+        return self.state in ('queued', 'running')
+
+    @property
+    def workdir(self):
+        return self.output_dir / 'workdir'
+
+    @property
+    def last_log_id(self):
+        return self.logs.last_id
+
+    def log(self, agent_name, message, level='info', **fields):
+        """Add a log message from an agent, with optional structured fields"""
+        entry = {
+            'timestamp': datetime.now().isoformat(),
+            'agent': agent_name,
+            'message': message,
+            'level': level
+        }
+        entry.update(fields)
+        with self._lock:
+            # Only the last MAX_LOGS_PER_JOB logs are kept
+            self.logs.append(entry)
+            self._changed.notify_all()
+
+    def get_logs(self, since=0):
+        """Log entries with an id greater than ``since``"""
+        with self._lock:
+            return self.logs.since(since)
+
+    def record_phase(self, phase, state, duration=None):
+        """Track the state and wall time of a LandingPageCrew phase"""
+        with self._lock:
+            self.phases[phase] = {'state': state, 'duration': duration}
+            self.version += 1
+            self._changed.notify_all()
+
+    def update(self, **fields):
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait_for_change(self, log_cursor, status_version, timeout=None):
+        """Block until a log after ``log_cursor`` or a new status version exists"""
+        with self._changed:
+            return self._changed.wait_for(
+                lambda: (self.logs.last_id > log_cursor
+                         or self.version != status_version),
+                timeout=timeout)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'id': self.id,
+                'idea': self.idea,
+                'state': self.state,
+                'status': self.status,
+                'progress': self.progress,
+                'error': self.error,
+                'running': self.running,
+                'priority': self.priority,
+                'base_job_id': self.base_job_id,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'version': self.version,
+                'last_log_id': self.logs.last_id,
+                'phases': {name: dict(phase) for name, phase in self.phases.items()},
+            }
+
+
+class JobManager():
+    """Bounded worker pool draining a priority queue of generation jobs.
+
+    Lower ``priority`` values run first; jobs with equal priority run in
+    submission order. ``runner(job)`` does the actual work and is expected
+    to report progress through ``job.update`` and ``job.log``.
+
+    If ``runner`` is a coroutine function, jobs are awaited on a single
+    event loop thread instead, with up to ``max_workers`` of them in flight.
+    Their blocking calls share the loop's default executor, sized for
+    ``threads_per_job`` threads per job in flight.
+
+    Only the last ``max_finished`` finished jobs are kept, and none longer
+    than ``finished_ttl`` seconds (0 keeps them until they are pushed out);
+    a dropped job's directory is deleted with it.
+    """
+
+    def __init__(self, runner, jobs_dir, max_workers=2, max_queued=100,
+                 max_finished=100, finished_ttl=0, threads_per_job=1):
+        self.runner = runner
+        self.jobs_dir = Path(jobs_dir)
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self.finished_ttl = finished_ttl
+        self.threads_per_job = threads_per_job
+        self._queue = queue.PriorityQueue()
+        # Job id -> Job, in submission order
+        self._jobs = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._is_async = inspect.iscoroutinefunction(runner)
+        self._loop = None
+        self._async_queue = None
+
+    def submit(self, idea, priority=0, base_job_id=None):
+        """Queue a new job and return it"""
+        self.prune()
+        with self._lock:
+            queued = sum(1 for job in self._jobs.values() if job.state == 'queued')
+            if queued >= self.max_queued:
+                raise JobQueueFull(f"Generation queue is full ({queued} jobs waiting)")
+
+            job_id = uuid.uuid4().hex[:12]
+            job = Job(job_id, idea, self.jobs_dir / job_id, priority=priority,
+                      base_job_id=base_job_id, sequence=next(self._counter))
+            job.output_dir.mkdir(parents=True, exist_ok=True)
+            self._jobs[job.id] = job
+            if self._is_async:
+                self._start_loop()
+            else:
+                self._start_workers()
+
+        item = (priority, job.sequence, job.id)
+        if self._is_async:
+            self._loop.call_soon_threadsafe(self._async_queue.put_nowait, item)
+        else:
+            self._queue.put(item)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest(self):
+        with self._lock:
+            return next(reversed(self._jobs.values()), None)
+
+    def list(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def queue_position(self, job):
+        """Number of queued jobs that will start before ``job``"""
+        if job.state != 'queued':
+            return 0
+        with self._lock:
+            place = (job.priority, job.sequence)
+            return sum(1 for other in self._jobs.values()
+                       if other.state == 'queued'
+                       and (other.priority, other.sequence) < place)
+
+    def prune(self):
+        """Drop the finished jobs beyond ``max_finished`` or older than
+        ``finished_ttl`` and delete their directories. Returns their ids"""
+        now = datetime.now()
+        with self._lock:
+            # Jobs still waiting to start from another job's files keep it
+            bases = {job.base_job_id for job in self._jobs.values() if job.running}
+            finished = [job for job in self._jobs.values()
+                        if not job.running and job.finished_at and job.id not in bases]
+            dropped = finished[:max(0, len(finished) - self.max_finished)]
+            if self.finished_ttl:
+                dropped += [job for job in finished[len(dropped):]
+                            if self._age(job, now) > self.finished_ttl]
+            for job in dropped:
+                del self._jobs[job.id]
+        for job in dropped:
+            shutil.rmtree(job.output_dir, ignore_errors=True)
+        return [job.id for job in dropped]
+
+    @staticmethod
+    def _age(job, now):
+        return (now - datetime.fromisoformat(job.finished_at)).total_seconds()
+
+    def _start_workers(self):
+        while len(self._workers) < self.max_workers:
+            name = f"generation-worker-{len(self._workers) + 1}"
+            worker = threading.Thread(target=self._work, daemon=True, name=name)
+            self._workers.append(worker)
+            worker.start()
+
+    def _work(self):
+        while True:
+            _, _, job_id = self._queue.get()
+            job = self.get(job_id)
+            try:
+                job.update(state='running', started_at=datetime.now().isoformat())
+                self.runner(job)
+                if job.state == 'running':
+                    job.update(state='completed')
+            except Exception as e:
+                job.update(state='error', status='error', error=str(e), progress=0)
+            finally:
+                job.update(finished_at=datetime.now().isoformat())
+                self.prune()
+                self._queue.task_done()
+
+    def _start_loop(self):
+        if self._loop is not None:
+            return
+        ready = threading.Event()
+        thread = threading.Thread(target=self._run_loop, args=(ready,), daemon=True,
+                                  name="generation-loop")
+        self._workers.append(thread)
+        thread.start()
+        ready.wait()
+
+    def _run_loop(self, ready):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        # The default executor stops at min(32, cpus + 4) threads, fewer than
+        # the jobs in flight can wait on at once
+        loop.set_default_executor(ThreadPoolExecutor(
+            max_workers=self.max_workers * self.threads_per_job + EXECUTOR_HEADROOM,
+            thread_name_prefix="generation-io"))
+        self._async_queue = asyncio.PriorityQueue()
+        self._loop = loop
+        ready.set()
+        loop.run_until_complete(self._dispatch())
+
+    async def _dispatch(self):
+        slots = asyncio.Semaphore(self.max_workers)
+        running = set()
+        while True:
+            await slots.acquire()
+            _, _, job_id = await self._async_queue.get()
+            task = asyncio.create_task(self._awork(self.get(job_id), slots))
+            # The loop only keeps weak references to tasks
+            running.add(task)
+            task.add_done_callback(running.discard)
+
+    async def _awork(self, job, slots):
+        try:
+            job.update(state='running', started_at=datetime.now().isoformat())
+            await self.runner(job)
+            if job.state == 'running':
+                job.update(state='completed')
+        except Exception as e:
+            job.update(state='error', status='error', error=str(e), progress=0)
+        finally:
+            job.update(finished_at=datetime.now().isoformat())
+            await asyncio.to_thread(self.prune)
+            slots.release()
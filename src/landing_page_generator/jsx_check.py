@@ -0,0 +1,539 @@
+"""Fast static checks of the components and pages written during a run.
+
+``check_source`` finds what would break the Next.js build or the page
+without running it: unbalanced brackets, strings and JSX tags, components
+used but never imported, a missing ``'use client'`` header, and the
+Markdown fences and literal ``\\n`` the model sometimes writes into code.
+
+``preflight`` runs right after a file is written. Problems the file did
+not have before the write are fixed locally when that is mechanical
+(fences, ``\\n``, the header, imports of the template's own components,
+brackets left open at the end), then by at most
+``PREFLIGHT_REPAIR_MAX_ATTEMPTS`` LLM calls that see only this file, and
+as a last resort the previous content is put back. Outcomes are counted
+per template in ``lpg_preflight_total``.
+"""
+import os
+import re
+from collections import Counter
+from pathlib import Path
+
+from component_paths import COMPONENT_EXTENSIONS, COMPONENTS_DIR, FENCE, template_folder
+from instrumentation import add_to_span, metrics, span
+from jsx_rewrite import USE_CLIENT, has_use_client
+from jsx_text import KEYWORDS_BEFORE_JSX
+from llm_cache import call_uncached
+from workspace import current_workspace
+
+# LLM calls allowed to repair one file after the local fixes
+REPAIR_MAX_ATTEMPTS = int(os.getenv("PREFLIGHT_REPAIR_MAX_ATTEMPTS", "1"))
+
+CLOSERS = {'(': ')', '[': ']', '{': '}'}
+_OPENERS = {closer: opener for opener, closer in CLOSERS.items()}
+_IDENTIFIER = re.compile(r'[A-Za-z_$][\w$]*')
+_TAG_NAME = re.compile(r'[A-Za-z_$][\w$.:\-]*')
+_REGEX_AFTER = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'yield')
+_FENCE_LINE = re.compile(r'^[ \t]*```[a-zA-Z]*[ \t]*$\n?', re.M)
+_IMPORT = re.compile(r'\bimport\s+([\w$\s{},*]+?)\s+from\s*[\'"]')
+_IMPORT_STATEMENT = re.compile(r'^import\b[^;\'"]*?[\'"][^\'"\n]+[\'"];?[ \t]*$', re.M)
+_DECLARATION = re.compile(r'\b(?:function|class|const|let|var)\s+([A-Za-z_$][\w$]*)')
+# Loose binding positions: parameters, destructuring, renames
+_BINDING = re.compile(r'[(\[{,:]\s*(?:\.\.\.)?([A-Z][\w$]*)\s*(?=[,)}\]=:])')
+_SERVER_EXPORT = re.compile(
+    r'\bexport\s+(?:const\s+metadata\b|(?:async\s+)?function\s+generateMetadata\b)')
+
+
+class Problem():
+    """Something in a file that would break the build or the page"""
+
+    def __init__(self, kind, message, pos=None, line=None, fix=None):
+        # 'syntax', 'unclosed', 'fence', 'newline', 'import' or 'use_client'
+        self.kind = kind
+        self.message = message
+        self.pos = pos
+        self.line = line
+        # What a local repair needs: the closer of an unclosed bracket, the missing name
+        self.fix = fix
+
+    @property
+    def key(self):
+        """Identity independent of where the problem is, to compare versions
+        of a file"""
+        return (self.kind, self.message)
+
+    def __str__(self):
+        return f"line {self.line}: {self.message}" if self.line else self.message
+
+    def __repr__(self):
+        return f"Problem({self.kind!r}, {str(self)!r})"
+
+
+class _Checker():
+    """Brackets, strings and JSX tags of a JS/JSX source, and the components it uses"""
+
+    def __init__(self, source):
+        self.source = source
+        self.pos = 0
+        self.problems = []
+        self.used = {}
+
+    def _line(self, pos):
+        return self.source.count('\n', 0, pos) + 1
+
+    def _problem(self, kind, message, pos, fix=None):
+        self.problems.append(Problem(kind, message, pos, self._line(pos), fix))
+
+    def _peek(self, offset=0):
+        index = self.pos + offset
+        return self.source[index] if index < len(self.source) else ''
+
+    def _skip_comment(self):
+        if self.source.startswith('//', self.pos):
+            newline = self.source.find('\n', self.pos)
+            self.pos = len(self.source) if newline == -1 else newline + 1
+            return True
+        if self.source.startswith('/*', self.pos):
+            close = self.source.find('*/', self.pos + 2)
+            if close == -1:
+                self._problem('syntax', "comment `/*` is never closed", self.pos)
+                self.pos = len(self.source)
+            else:
+                self.pos = close + 2
+            return True
+        return False
+
+    def _string(self):
+        start = self.pos
+        quote = self.source[start]
+        self.pos += 1
+        while self.pos < len(self.source):
+            char = self.source[self.pos]
+            if char == '\\':
+                self.pos += 2
+                continue
+            if char == quote:
+                self.pos += 1
+                return
+            if char == '\n':
+                break
+            self.pos += 1
+        self._problem('syntax', f"string {quote}...{quote} is never closed", start)
+
+    def _template_literal(self):
+        start = self.pos
+        self.pos += 1
+        while self.pos < len(self.source):
+            char = self.source[self.pos]
+            if char == '\\':
+                self.pos += 2
+            elif char == '`':
+                self.pos += 1
+                return
+            elif self.source.startswith('${', self.pos):
+                self.pos += 2
+                self.js(closing='}', opened_at=self.pos - 2)
+            else:
+                self.pos += 1
+        self._problem('syntax', "template literal `...` is never closed", start)
+
+    def _regex_can_start(self, previous):
+        previous = previous.rstrip()
+        return (not previous or previous[-1] in '(,=:[!&|?{};+-*%<>~^' or
+                previous.endswith(_REGEX_AFTER))
+
+    def _regex(self):
+        """Skip a /.../flags literal; False if it is not one after all"""
+        index, in_class = self.pos + 1, False
+        while index < len(self.source):
+            char = self.source[index]
+            if char == '\\':
+                index += 2
+                continue
+            if char == '\n':
+                return False
+            if char == '[':
+                in_class = True
+            elif char == ']':
+                in_class = False
+            elif char == '/' and not in_class:
+                match = _IDENTIFIER.match(self.source, index + 1)
+                self.pos = match.end() if match else index + 1
+                return True
+            index += 1
+        return False
+
+    def _jsx_can_start(self, previous):
+        following = self._peek(1)
+        if not (following.isalpha() or following == '>'):
+            return False
+        previous = previous.rstrip()
+        return (not previous or previous[-1] in '(=,?:[{};!' or
+                previous.endswith(KEYWORDS_BEFORE_JSX))
+
+    def js(self, closing=None, opened_at=None):
+        """Code up to the ``closing`` bracket of the expression it is in, if any"""
+        stack = []
+        code_start = self.pos
+        while self.pos < len(self.source):
+            char = self.source[self.pos]
+            previous = self.source[max(code_start, self.pos - 20):self.pos]
+            if char == '/':
+                if self._skip_comment():
+                    continue
+                if self._regex_can_start(previous) and self._regex():
+                    continue
+            if char in '\'"':
+                self._string()
+                continue
+            if char == '`':
+                self._template_literal()
+                continue
+            if char == '\\':
+                if self._peek(1) == 'n':
+                    self._problem('newline', "literal `\\n` in the code", self.pos)
+                else:
+                    self._problem('syntax', "stray backslash in the code", self.pos)
+                self.pos += 2
+                continue
+            if char == '<' and self._jsx_can_start(previous):
+                self.element()
+                continue
+            if char in CLOSERS:
+                stack.append((char, self.pos))
+            elif char in _OPENERS:
+                if stack and stack[-1][0] == _OPENERS[char]:
+                    stack.pop()
+                elif not stack and char == closing:
+                    self.pos += 1
+                    return
+                elif stack:
+                    opener, at = stack.pop()
+                    self._problem('syntax', f"`{char}` closes `{opener}`", self.pos)
+                else:
+                    self._problem('syntax', f"unexpected `{char}`", self.pos)
+            identifier = (_IDENTIFIER.match(self.source, self.pos)
+                          if char.isalpha() or char in '_$' else None)
+            self.pos = identifier.end() if identifier else self.pos + 1
+        for opener, at in reversed(stack):
+            self._problem('unclosed', f"`{opener}` is never closed", at,
+                          fix=CLOSERS[opener])
+        if closing is not None:
+            self._problem('unclosed', f"`{_OPENERS[closing]}` is never closed",
+                          opened_at, fix=closing)
+
+    def element(self):
+        """A JSX element starting at its ``<``"""
+        start = self.pos
+        self.pos += 1
+        match = _TAG_NAME.match(self.source, self.pos)
+        tag = match.group(0) if match else ''
+        if match:
+            self.pos = match.end()
+            root = tag.split('.')[0]
+            if root[0].isupper():
+                self.used.setdefault(root, start)
+        while self.pos < len(self.source):
+            char = self.source[self.pos]
+            if char.isspace():
+                self.pos += 1
+            elif self.source.startswith('/>', self.pos):
+                self.pos += 2
+                return
+            elif char == '>':
+                self.pos += 1
+                self.children(tag, start)
+                return
+            elif char == '{':
+                self.pos += 1
+                self.js(closing='}', opened_at=self.pos - 1)
+            elif char in '\'"':
+                # JSX attribute strings have no escapes and may span lines
+                close = self.source.find(char, self.pos + 1)
+                self.pos = len(self.source) if close == -1 else close + 1
+            elif char == '<':
+                self.element()
+            elif self.source.startswith(('/*', '//'), self.pos):
+                self._skip_comment()
+            else:
+                self.pos += 1
+        self._problem('syntax', f"`<{tag}>` is never closed", start)
+
+    def children(self, tag, start):
+        while self.pos < len(self.source):
+            char = self.source[self.pos]
+            if char == '{':
+                self.pos += 1
+                self.js(closing='}', opened_at=self.pos - 1)
+            elif char == '<' and self._peek(1) == '/':
+                close = self.source.find('>', self.pos)
+                end = len(self.source) if close == -1 else close + 1
+                name = self.source[self.pos + 2:end - 1].strip()
+                if name != tag:
+                    self._problem('syntax', f"`</{name}>` closes `<{tag}>`", self.pos)
+                self.pos = end
+                return
+            elif char == '<':
+                self.element()
+            else:
+                self.pos += 1
+        self._problem('syntax', f"`<{tag}>` is never closed", start)
+
+
+def declared_names(source):
+    """Names imported or bound in ``source``, loosely: a miss only hides a problem"""
+    names = set()
+    for match in _IMPORT.finditer(source):
+        for part in match.group(1).replace('{', ',').replace('}', ',').split(','):
+            words = part.split()
+            if words:
+                names.add(words[-1])
+    names.update(_DECLARATION.findall(source))
+    names.update(_BINDING.findall(source))
+    return names
+
+
+def needs_use_client(path, source):
+    """Whether the rules want ``'use client'`` in the file: components and pages,
+    except server-only ones that export metadata"""
+    path = Path(path)
+    parts = path.parts
+    is_component = any(parts[i:i + 2] == COMPONENTS_DIR for i in range(len(parts) - 1))
+    return (is_component or path.stem == 'page') and not _SERVER_EXPORT.search(source)
+
+
+def check_source(source, path=''):
+    """Problems of a component or page ``source``; files that are not code have none"""
+    if Path(path).suffix not in COMPONENT_EXTENSIONS:
+        return []
+    problems = []
+    for match in _FENCE_LINE.finditer(source):
+        start = match.start()
+        problems.append(Problem('fence', "Markdown code fence in the code", start,
+                                source.count('\n', 0, start) + 1))
+    # Fences would read as template literals and hide everything after them
+    checker = _Checker(_FENCE_LINE.sub(lambda match: ' ' * len(match.group(0)), source))
+    checker.js()
+    problems.extend(checker.problems)
+
+    declared = declared_names(source)
+    for name, pos in sorted(checker.used.items(), key=lambda item: item[1]):
+        if name not in declared:
+            problems.append(Problem('import', f"`<{name}>` is used but never imported",
+                                    pos, checker._line(pos), fix=name))
+
+    if needs_use_client(path, source) and not has_use_client(source):
+        problems.append(Problem('use_client', f"missing {USE_CLIENT} at the beginning",
+                                0, 1))
+    elif has_use_client(source) and _SERVER_EXPORT.search(source):
+        problems.append(Problem('use_client',
+                                f"exports metadata but is marked {USE_CLIENT}", 0, 1))
+    return problems
+
+
+def new_problems(problems, baseline_problems):
+    """``problems`` the previous version of the file did not have"""
+    known = Counter(problem.key for problem in baseline_problems)
+    found = []
+    for problem in problems:
+        if known[problem.key]:
+            known[problem.key] -= 1
+        else:
+            found.append(problem)
+    return found
+
+
+def _component_import(name, path, template_root):
+    """Import statement for the template's own component ``name``, if there is one"""
+    components_dir = template_root.joinpath(*COMPONENTS_DIR)
+    if not components_dir.is_dir():
+        return None
+    for candidate in sorted(components_dir.rglob(f'{name}.*')):
+        if candidate.suffix not in COMPONENT_EXTENSIONS or candidate == path:
+            continue
+        source = candidate.read_text(encoding='utf-8', errors='replace')
+        escaped = re.escape(name)
+        if re.search(rf'\bexport\s+(?:async\s+)?(?:function|const|class|let)\s+'
+                     rf'{escaped}\b|\bexport\s*{{[^}}]*\b{escaped}\b', source):
+            binding = f"{{ {name} }}"
+        elif re.search(r'\bexport\s+default\b', source):
+            binding = name
+        else:
+            continue
+        module = candidate.relative_to(components_dir).with_suffix('').as_posix()
+        if _has_alias(template_root):
+            return f"import {binding} from '@/components/{module}'"
+        relative = os.path.relpath(candidate.with_suffix(''), path.parent)
+        relative = relative.replace(os.sep, '/')
+        if not relative.startswith('.'):
+            relative = './' + relative
+        return f"import {binding} from '{relative}'"
+    return None
+
+
+def _has_alias(template_root):
+    for name in ('jsconfig.json', 'tsconfig.json'):
+        config = template_root / name
+        if config.is_file() and \
+                '"@/*"' in config.read_text(encoding='utf-8', errors='replace'):
+            return True
+    return False
+
+
+def _add_imports(source, statements):
+    matches = list(_IMPORT_STATEMENT.finditer(source))
+    if matches:
+        end = matches[-1].end()
+    elif has_use_client(source):
+        end = re.search(r'''['"]use client['"];?''', source).end()
+    else:
+        return '\n'.join(statements) + '\n\n' + source
+    return source[:end] + '\n' + '\n'.join(statements) + source[end:]
+
+
+def repair_locally(source, problems, path, template_root=None, baseline_problems=()):
+    """``source`` with the mechanical ``problems`` fixed, and what was fixed"""
+    fixed = []
+    kinds = {problem.kind for problem in problems}
+    if 'fence' in kinds:
+        source = _FENCE_LINE.sub('', source).strip() + '\n'
+        fixed.append('fence')
+    if 'newline' in kinds:
+        if source.count('\\n') > source.count('\n'):
+            # The whole file was written as one line
+            source = source.replace('\\n', '\n')
+        else:
+            for problem in sorted((p for p in problems if p.kind == 'newline'),
+                                  key=lambda problem: problem.pos, reverse=True):
+                if source.startswith('\\n', problem.pos):
+                    source = source[:problem.pos] + '\n' + source[problem.pos + 2:]
+        fixed.append('newline')
+    if fixed:
+        # Positions moved, find what is left
+        problems = new_problems(check_source(source, path), baseline_problems)
+
+    imports = []
+    for problem in problems:
+        if problem.kind == 'import' and template_root is not None:
+            statement = _component_import(problem.fix, Path(path), Path(template_root))
+            if statement:
+                imports.append(statement)
+    if imports:
+        source = _add_imports(source, imports)
+        fixed.append('import')
+
+    unclosed = [problem for problem in problems if problem.kind == 'unclosed']
+    if unclosed and not [problem for problem in problems if problem.kind == 'syntax']:
+        # Only brackets left open at the end, in the order they must close
+        closers = '\n'.join(problem.fix for problem in unclosed)
+        source = f"{source.rstrip()}\n{closers}\n"
+        fixed.append('unclosed')
+
+    if (any(problem.kind == 'use_client' for problem in problems)
+            and not has_use_client(source) and needs_use_client(path, source)):
+        source = f"{USE_CLIENT}\n\n{source.lstrip()}"
+        fixed.append('use_client')
+    return source, fixed
+
+
+def _repair_prompt(relative, source, problems):
+    return (
+        f"The file {relative} was just written and will break the Next.js build:\n"
+        + "\n".join(f"- {problem}" for problem in problems) + "\n\n"
+        "FILE\n----------\n" + source + "\n----------\n\n"
+        "Reply with ONLY the complete corrected file content. Fix only the problems "
+        "listed, keep everything else exactly as it is. All components used must be "
+        f"imported, components and pages start with {USE_CLIENT}."
+    )
+
+
+class PreflightResult():
+    """Outcome of ``preflight`` for one file"""
+
+    def __init__(self, path, template, status, problems, repairs, source):
+        self.path = path
+        self.template = template
+        # 'passed', 'repaired', 'restored' or 'failed'
+        self.status = status
+        # Problems left in the file
+        self.problems = problems
+        self.repairs = repairs
+        # Content of the file afterwards
+        self.source = source
+
+    @property
+    def ok(self):
+        return self.status != 'failed'
+
+    def __repr__(self):
+        return f"PreflightResult({self.path!r}, {self.status!r}, {self.problems!r})"
+
+
+def preflight(path, baseline=None, llm=None, workdir=None, restore=True,
+              max_attempts=REPAIR_MAX_ATTEMPTS):
+    """Check the file just written at ``path`` and repair it in place.
+
+    Only problems ``baseline`` (the content before the write) did not have
+    count. ``llm`` allows up to ``max_attempts`` repair calls; with
+    ``restore`` a file that is still broken gets ``baseline`` back.
+    """
+    path = Path(path)
+    workdir = Path(workdir or current_workspace().workdir).resolve()
+    try:
+        relative = path.resolve().relative_to(workdir)
+    except ValueError:
+        relative = Path(path.name)
+    template = template_folder(relative.as_posix()) or ''
+    template_root = workdir / template if template else None
+    known = check_source(baseline, path) if baseline else []
+
+    with span('check', 'preflight', file=relative.as_posix(),
+              template=template) as attrs:
+        source = path.read_text(encoding='utf-8', errors='replace')
+        problems = new_problems(check_source(source, path), known)
+        repairs = []
+        if problems:
+            print(f"🔎 {relative}: {len(problems)} problem(s), e.g. {problems[0]}")
+            repaired, fixed = repair_locally(source, problems, path, template_root,
+                                             known)
+            repaired_problems = new_problems(check_source(repaired, path), known)
+            if fixed and len(repaired_problems) < len(problems):
+                source, problems = repaired, repaired_problems
+                repairs.append('local:' + '+'.join(fixed))
+                path.write_text(source, encoding='utf-8')
+
+        attempts = 0
+        while problems and llm is not None and attempts < max_attempts:
+            attempts += 1
+            add_to_span(retries=1)
+            try:
+                prompt = _repair_prompt(relative.as_posix(), source, problems)
+                answer = str(call_uncached(llm, [{"role": "user", "content": prompt}]))
+            except Exception as e:
+                print(f"⚠️ Repair of {relative} failed: {e}")
+                break
+            answer = FENCE.sub('', answer).strip() + '\n'
+            answer_problems = new_problems(check_source(answer, path), known)
+            if len(answer_problems) < len(problems):
+                source, problems = answer, answer_problems
+                repairs.append('llm')
+                path.write_text(source, encoding='utf-8')
+
+        if not problems:
+            status = 'repaired' if repairs else 'passed'
+        elif restore and baseline is not None:
+            path.write_text(baseline, encoding='utf-8')
+            source, status, problems = baseline, 'restored', []
+        else:
+            status = 'failed'
+        attrs.update(status=status, repairs=repairs)
+        if problems:
+            attrs['error'] = '; '.join(str(problem) for problem in problems[:5])[:300]
+        metrics.inc('lpg_preflight_total',
+                    help='Static checks of written files by template and outcome',
+                    template=template or '-', result=status)
+    if status != 'passed':
+        print(f"🔎 {relative}: {status}"
+              + (f" ({', '.join(repairs)})" if repairs else "")
+              + (f", still {len(problems)} problem(s)" if problems else ""))
+    return PreflightResult(relative.as_posix(), template, status, problems, repairs,
+                           source)
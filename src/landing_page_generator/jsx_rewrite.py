@@ -0,0 +1,72 @@
+"""Local rewrite of a component into a single page landing page section.
+
+Applies what ``update_component_task`` used to ask the model to do when
+re-emitting the whole file: the new texts go in (see ``jsx_text.splice``),
+the file starts with ``'use client'``, every ``href`` points at ``#`` and
+``target``/``rel`` are dropped, since nothing links away from the page.
+Imports, components, classes and markup are kept byte for byte.
+"""
+import re
+
+from jsx_text import jsx_attributes, splice
+
+USE_CLIENT = "'use client'"
+# Attributes only meaningful on links to other pages
+LINK_ONLY_ATTRIBUTES = {'target', 'rel'}
+# href values that already point at #
+_HASH_HREFS = ('"#"', "'#'", '{"#"}', "{'#'}")
+
+_LEADING_COMMENTS = re.compile(r'\A(?:\s+|//[^\n]*|/\*.*?\*/)*', re.DOTALL)
+_USE_CLIENT = re.compile(r'''['"]use client['"];?''')
+
+
+def has_use_client(source):
+    """Whether the file starts (after comments) with the ``'use client'`` directive"""
+    return bool(_USE_CLIENT.match(source, _LEADING_COMMENTS.match(source).end()))
+
+
+def apply_page_rules(source):
+    """``source`` with the single page rules applied, and counts of what changed"""
+    edits = []
+    report = {'hrefs': 0, 'removed_attributes': 0, 'use_client_added': False}
+    for attribute in jsx_attributes(source):
+        if attribute.name == 'href' and attribute.value_start is not None:
+            if source[attribute.value_start:attribute.value_end] not in _HASH_HREFS:
+                edits.append((attribute.value_start, attribute.value_end, '"#"'))
+                report['hrefs'] += 1
+        elif attribute.name in LINK_ONLY_ATTRIBUTES:
+            # Take the whitespace before the attribute with it
+            start = attribute.start
+            while start > 0 and source[start - 1] in ' \t':
+                start -= 1
+            own_line = (start > 0 and source[start - 1] == '\n'
+                        and source[attribute.end:attribute.end + 1] == '\n')
+            if own_line:
+                # The attribute had a line of its own
+                start -= 1
+            edits.append((start, attribute.end, ''))
+            report['removed_attributes'] += 1
+
+    parts, position = [], 0
+    for start, end, replacement in sorted(edits):
+        parts.append(source[position:start])
+        parts.append(replacement)
+        position = end
+    parts.append(source[position:])
+    source = ''.join(parts)
+
+    if not has_use_client(source):
+        source = f"{USE_CLIENT}\n\n{source.lstrip()}"
+        report['use_client_added'] = True
+    return source, report
+
+
+def rewrite_component(source, slots, replacements):
+    """Splice the replacement texts into ``source`` and apply the page rules.
+
+    Returns the new source and a report with the number of texts replaced.
+    """
+    source, replaced = splice(source, slots, replacements)
+    source, report = apply_page_rules(source)
+    report['texts'] = replaced
+    return source, report
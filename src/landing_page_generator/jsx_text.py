@@ -0,0 +1,393 @@
+"""User-visible texts of a React component, and how to put new ones back.
+
+``extract_texts`` finds the JSX text nodes, the visible string attributes
+(``alt``, ``title``, ...) and the prose string literals of data such as
+``{ title: 'Fast setup', description: '...' }``, each with a stable id
+(``t1``, ``t2``, ... in source order). The LLM only sees ``skeleton`` of
+them and answers with replacements keyed by id, which ``splice`` writes
+into the original source, leaving classes, imports and markup untouched.
+"""
+import ast
+import html
+import json
+import re
+
+from component_paths import FENCE, balanced_spans
+
+# JSX attributes whose string value is shown to the user
+VISIBLE_ATTRIBUTES = {
+    'alt', 'title', 'placeholder', 'aria-label', 'aria-description', 'label',
+    'summary', 'caption', 'content',
+}
+# Object keys whose string value is never shown as text
+HIDDEN_KEYS = {
+    'className', 'class', 'href', 'src', 'id', 'key', 'icon', 'variant', 'color',
+    'type', 'to', 'path', 'url', 'image', 'imageUrl', 'link', 'target', 'rel',
+    'as', 'size', 'width', 'height', 'slug', 'logo',
+}
+DIRECTIVES = {'use client', 'use server', 'use strict'}
+KEYWORDS_BEFORE_JSX = ('return', 'yield', 'default', 'case', '&&', '||', '??', '=>')
+_CLASS_TOKEN = re.compile(r'^[a-z0-9:\-\[\]/.!#%()&>_,]+$')
+_IDENTIFIER = re.compile(r'[A-Za-z_$][\w$]*')
+_ATTRIBUTE_NAME = re.compile(r'[A-Za-z_:][\w:.\-]*')
+_TAG_NAME = re.compile(r'[A-Za-z_$][\w$.:\-]*')
+# An object key right before a ``:``, only after ``{`` or ``,`` (not a ternary's ``?``)
+_OBJECT_KEY = re.compile(r'[{,]\s*([A-Za-z_$][\w$]*)\s*$')
+_REPLACEMENT_LINE = re.compile(
+    r'^\s*[-*]?\s*["\']?(t\d+)["\']?\s*[:=]\s*(.+?)\s*,?\s*$')
+
+
+class TextSlot():
+    """One visible text: ``source[start:end] == text``"""
+
+    def __init__(self, slot_id, kind, text, start, end, context, quote=None):
+        self.id = slot_id
+        # 'text' (JSX text node), 'attribute' (JSX string attribute)
+        # or 'string' (JS literal)
+        self.kind = kind
+        self.text = text
+        self.start = start
+        self.end = end
+        # Enclosing element, attribute or object key, shown to the LLM
+        self.context = context
+        self.quote = quote
+
+    def __repr__(self):
+        return f"TextSlot({self.id!r}, {self.kind!r}, {self.text!r})"
+
+
+class JsxAttribute():
+    """An attribute of a JSX element; ``source[start:end]`` is all of it,
+    ``source[value_start:value_end]`` its quoted or braced value, if any"""
+
+    def __init__(self, tag, name, start, end, value_start=None, value_end=None):
+        self.tag = tag
+        self.name = name
+        self.start = start
+        self.end = end
+        self.value_start = value_start
+        self.value_end = value_end
+
+    def __repr__(self):
+        return f"JsxAttribute({self.tag!r}, {self.name!r})"
+
+
+def looks_like_prose(text):
+    """Whether a string literal reads as text rather than classes, paths
+    or identifiers"""
+    text = text.strip()
+    if not text or text in DIRECTIVES or not any(char.isalpha() for char in text):
+        return False
+    if re.match(r'^(https?:|mailto:|tel:|/|#|\.{1,2}/|@/)', text):
+        return False
+    tokens = text.split()
+    if all(_CLASS_TOKEN.match(token) for token in tokens) and \
+            any('-' in token or ':' in token for token in tokens):
+        return False
+    # A single lowercase word is an identifier ('solid', 'outline'), not copy
+    return len(tokens) > 1 or text[0].isupper()
+
+
+class _Scanner():
+    """Just enough of a JS/JSX tokenizer to find texts; never raises on odd input"""
+
+    def __init__(self, source):
+        self.source = source
+        self.pos = 0
+        self.slots = []
+        self.attributes = []
+
+    # Helpers
+    def _peek(self, offset=0):
+        index = self.pos + offset
+        return self.source[index] if index < len(self.source) else ''
+
+    def _add(self, kind, start, end, context, quote=None):
+        text = self.source[start:end]
+        if kind == 'text':
+            stripped = text.strip()
+            # Entities such as &nbsp; alone are spacing, not copy
+            visible = html.unescape(stripped).strip()
+            if not visible or not any(char.isalnum() for char in visible):
+                return
+            start += len(text) - len(text.lstrip())
+            end = start + len(stripped)
+            text = stripped
+        self.slots.append(TextSlot(f't{len(self.slots) + 1}', kind, text, start, end,
+                                   context, quote))
+
+    def _skip_comment(self):
+        if self.source.startswith('//', self.pos):
+            newline = self.source.find('\n', self.pos)
+            self.pos = len(self.source) if newline == -1 else newline + 1
+            return True
+        if self.source.startswith('/*', self.pos):
+            close = self.source.find('*/', self.pos + 2)
+            self.pos = len(self.source) if close == -1 else close + 2
+            return True
+        return False
+
+    def _string(self):
+        """Skip a '...' or "..." literal, returning the span of its content"""
+        quote = self._peek()
+        self.pos += 1
+        start = self.pos
+        while self.pos < len(self.source):
+            char = self.source[self.pos]
+            if char == '\\':
+                self.pos += 2
+                continue
+            if char == quote or char == '\n':
+                break
+            self.pos += 1
+        end = self.pos
+        self.pos += 1
+        return start, end
+
+    def _template_literal(self):
+        self.pos += 1
+        while self.pos < len(self.source):
+            char = self.source[self.pos]
+            if char == '\\':
+                self.pos += 2
+            elif char == '`':
+                self.pos += 1
+                return
+            elif self.source.startswith('${', self.pos):
+                self.pos += 2
+                self.js(until_brace=True)
+            else:
+                self.pos += 1
+
+    def _jsx_can_start(self, previous):
+        """A ``<`` after ``previous`` (the code before it) opens an element"""
+        following = self._peek(1)
+        if not (following.isalpha() or following == '>'):
+            return False
+        previous = previous.rstrip()
+        return (not previous or previous[-1] in '(=,?:[{};!' or
+                previous.endswith(KEYWORDS_BEFORE_JSX))
+
+    # Contexts
+    def js(self, until_brace=False):
+        """Scan code, up to the ``}`` closing an expression if ``until_brace``"""
+        depth = 0
+        code_start = self.pos
+        last_key = None
+        while self.pos < len(self.source):
+            char = self.source[self.pos]
+            if char == '/' and self._skip_comment():
+                continue
+            if char in '\'"':
+                start, end = self._string()
+                if self._is_key(start - 1):
+                    last_key = None
+                    continue
+                if last_key not in HIDDEN_KEYS and \
+                        looks_like_prose(self.source[start:end]) and \
+                        not self._in_import(start):
+                    self._add('string', start, end, last_key or 'string', quote=char)
+                last_key = None
+                continue
+            if char == '`':
+                self._template_literal()
+                continue
+            previous = self.source[max(code_start, self.pos - 20):self.pos]
+            if char == '<' and self._jsx_can_start(previous):
+                self.element()
+                continue
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                if until_brace and depth == 0:
+                    self.pos += 1
+                    return
+                depth -= 1
+            elif char == ':':
+                match = _OBJECT_KEY.search(self.source, max(0, self.pos - 40), self.pos)
+                last_key = match.group(1) if match else None
+            elif char in ',;)]':
+                last_key = None
+            identifier = (_IDENTIFIER.match(self.source, self.pos)
+                          if char.isalpha() or char in '_$' else None)
+            self.pos = identifier.end() if identifier else self.pos + 1
+
+    def _is_key(self, quote_at):
+        """The string literal opening at ``quote_at`` is an object key
+        (``{'title': ...``) or a ``case`` label rather than a value"""
+        before = self.source[max(0, quote_at - 40):quote_at].rstrip()
+        if re.search(r'\bcase$', before):
+            return True
+        rest = self.source[self.pos:self.pos + 40].lstrip()
+        return (rest.startswith(':') and not rest.startswith('::')
+                and before.endswith(('{', ',')))
+
+    def _in_import(self, index):
+        line_start = self.source.rfind('\n', 0, index) + 1
+        line = self.source[line_start:index].lstrip()
+        return (line.startswith(('import ', 'export * from', 'export {'))
+                or 'require(' in line)
+
+    def element(self):
+        """Scan a JSX element starting at its ``<``"""
+        self.pos += 1
+        match = _TAG_NAME.match(self.source, self.pos)
+        tag = match.group(0) if match else ''
+        self.pos = match.end() if match else self.pos
+        while self.pos < len(self.source):
+            char = self.source[self.pos]
+            if char.isspace():
+                self.pos += 1
+            elif self.source.startswith('/>', self.pos):
+                self.pos += 2
+                return
+            elif char == '>':
+                self.pos += 1
+                self.children(tag)
+                return
+            elif char == '{':
+                self.pos += 1
+                self.js(until_brace=True)
+            elif self.source.startswith(('/*', '//'), self.pos):
+                self._skip_comment()
+            else:
+                self._attribute(tag)
+
+    def _attribute(self, tag):
+        match = _ATTRIBUTE_NAME.match(self.source, self.pos)
+        if not match:
+            self.pos += 1
+            return
+        name = match.group(0)
+        self.pos = match.end()
+        while self._peek().isspace():
+            self.pos += 1
+        if self._peek() != '=':
+            self.attributes.append(JsxAttribute(tag, name, match.start(), match.end()))
+            return
+        self.pos += 1
+        while self._peek().isspace():
+            self.pos += 1
+        value_start = self.pos
+        char = self._peek()
+        if char in '\'"':
+            quote = char
+            start, end = self._string()
+            value = self.source[start:end]
+            if name in VISIBLE_ATTRIBUTES and any(c.isalpha() for c in value):
+                self._add('attribute', start, end, name, quote=quote)
+        elif char == '{':
+            self.pos += 1
+            self.js(until_brace=True)
+        elif char == '<':
+            self.element()
+        self.attributes.append(JsxAttribute(tag, name, match.start(), self.pos,
+                                            value_start, self.pos))
+
+    def children(self, tag):
+        """Scan the children of ``tag`` up to its closing tag"""
+        text_start = self.pos
+        while self.pos < len(self.source):
+            char = self.source[self.pos]
+            if char not in '<{':
+                self.pos += 1
+                continue
+            self._add('text', text_start, self.pos, tag or 'fragment')
+            if char == '{':
+                self.pos += 1
+                self.js(until_brace=True)
+            elif self._peek(1) == '/':
+                close = self.source.find('>', self.pos)
+                self.pos = len(self.source) if close == -1 else close + 1
+                return
+            else:
+                self.element()
+            text_start = self.pos
+        self._add('text', text_start, self.pos, tag or 'fragment')
+
+
+def extract_texts(source):
+    """Visible texts of a component's source, as ``TextSlot``s with ids
+    ``t1``, ``t2``, ..."""
+    scanner = _Scanner(source)
+    scanner.js()
+    return scanner.slots
+
+
+def jsx_attributes(source):
+    """Attributes of every JSX element in ``source``, as ``JsxAttribute``s"""
+    scanner = _Scanner(source)
+    scanner.js()
+    return scanner.attributes
+
+
+def skeleton(slots):
+    """Compact listing of ``slots`` for the prompt, one ``id <context>: text``
+    per line"""
+    lines = []
+    for slot in slots:
+        text = slot.text if slot.kind == 'string' else html.unescape(slot.text)
+        lines.append(f"{slot.id} <{slot.context}>: {' '.join(text.split())}")
+    return '\n'.join(lines)
+
+
+def parse_replacements(output, slots=None):
+    """``{id: text}`` from an LLM answer: a JSON/Python object, or ``id: text`` lines.
+
+    With ``slots`` only their ids are kept.
+    """
+    text = FENCE.sub('', str(output))
+    replacements = {}
+    for candidate in balanced_spans(text, '{', '}'):
+        for parse in (json.loads, ast.literal_eval):
+            try:
+                value = parse(candidate)
+            except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+                continue
+            if isinstance(value, dict) and value:
+                replacements = {str(key): str(item) for key, item in value.items()
+                                if isinstance(item, (str, int, float))}
+                break
+        if replacements:
+            break
+    if not replacements:
+        for line in text.splitlines():
+            match = _REPLACEMENT_LINE.match(line)
+            if match:
+                replacements[match.group(1)] = match.group(2).strip().strip('"\'')
+    if slots is not None:
+        ids = {slot.id for slot in slots}
+        replacements = {key: value for key, value in replacements.items() if key in ids}
+    return replacements
+
+
+def _encode(slot, text):
+    text = ' '.join(str(text).split())
+    if slot.kind == 'text':
+        # JSX text decodes HTML entities, braces and angle brackets would be code
+        return (text.replace('&', '&amp;').replace('{', '&#123;').replace('}', '&#125;')
+                .replace('<', '&lt;').replace('>', '&gt;'))
+    if slot.kind == 'attribute':
+        # JSX attribute strings have no backslash escapes, only entities
+        entity = '&quot;' if slot.quote == '"' else '&#39;'
+        return text.replace('&', '&amp;').replace(slot.quote, entity)
+    return text.replace('\\', '\\\\').replace(slot.quote, '\\' + slot.quote)
+
+
+def splice(source, slots, replacements):
+    """``source`` with the text of each slot replaced by ``replacements[slot.id]``.
+
+    Missing or empty replacements keep the original text. Returns the new
+    source and the number of texts replaced.
+    """
+    parts, position, replaced = [], 0, 0
+    for slot in sorted(slots, key=lambda slot: slot.start):
+        text = replacements.get(slot.id)
+        if text is None or not str(text).strip():
+            continue
+        parts.append(source[position:slot.start])
+        parts.append(_encode(slot, text))
+        position = slot.end
+        replaced += 1
+    parts.append(source[position:])
+    return ''.join(parts), replaced
@@ -0,0 +1,141 @@
+import os
+import threading
+from collections import OrderedDict
+
+from crewai import LLM
+from disk_cache import DiskCache, cache_dir, make_key
+from instrumentation import span
+
+DEFAULT_MODEL = "google/gemini-2.5-flash"
+# Cached answers remembered per LLM, so an unusable one can be dropped again
+RECENT_ANSWERS = 256
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def llm_cache_enabled() -> bool:
+    return os.getenv("LLM_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+
+
+def get_llm_cache():
+    """Return the process-wide LLM response cache shared by all crews"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = DiskCache(
+                cache_dir() / "llm_responses.sqlite3",
+                ttl=int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600))),
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000")),
+                max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+            )
+        return _default_cache
+
+
+def llm_cache_key(model, messages, tools=None):
+    """Key a completion by model, rendered prompt and tool context"""
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    rendered = [(m.get("role"), m.get("content")) for m in messages]
+    return make_key("llm", model, rendered, tools or [])
+
+
+class CachedLLM(LLM):
+    """crewai LLM that answers repeated prompts from the on-disk cache"""
+
+    def __init__(self, model=DEFAULT_MODEL, cache=None, **kwargs):
+        super().__init__(model=model, **kwargs)
+        self.cache = cache
+        # Response -> cache key of the answers this LLM gave lately
+        self._recent = OrderedDict()
+        self._recent_lock = threading.Lock()
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, cache=True):
+        """``cache=False`` neither reads nor writes the cache, for re-asks
+        whose prompt comes out the same every time the answer was unusable"""
+        kwargs = {
+            'tools': tools, 'callbacks': callbacks,
+            'available_functions': available_functions,
+            'from_task': from_task, 'from_agent': from_agent,
+        }
+
+        with span('llm', self.model, cache_hit=False) as attrs:
+            # Native function calls execute tools as a side effect, never replay them
+            if self.cache is None or available_functions or not cache:
+                return self._counted_call(messages, attrs, **kwargs)
+
+            key = llm_cache_key(self.model, messages, tools)
+            cached = self.cache.get(key)
+            if cached is not None:
+                attrs['cache_hit'] = True
+                self._remember(cached, key)
+                return cached
+
+            response = self._counted_call(messages, attrs, **kwargs)
+            if isinstance(response, str) and response.strip():
+                self.cache.set(key, response)
+                self._remember(response, key)
+            return response
+
+    def _remember(self, response, key):
+        with self._recent_lock:
+            self._recent[response] = key
+            self._recent.move_to_end(response)
+            while len(self._recent) > RECENT_ANSWERS:
+                self._recent.popitem(last=False)
+
+    def forget(self, answer):
+        """Drop the cached responses ``answer`` was taken from, so the next
+        run asks the model again. Returns how many were dropped"""
+        answer = str(answer or '').strip()
+        if not answer or self.cache is None:
+            return 0
+        with self._recent_lock:
+            keys = [(response, key) for response, key in self._recent.items()
+                    if answer in response]
+            for response, _key in keys:
+                del self._recent[response]
+        for _response, key in keys:
+            self.cache.delete(key)
+        return len(keys)
+
+    def _counted_call(self, messages, attrs, **kwargs):
+        """Uncached call, recording the tokens crewai's token handler saw"""
+        processes = [callback.token_cost_process
+                     for callback in kwargs['callbacks'] or []
+                     if getattr(callback, 'token_cost_process', None) is not None]
+        before = [(p.prompt_tokens, p.completion_tokens) for p in processes]
+        try:
+            return self._uncached_call(messages, **kwargs)
+        finally:
+            for process, (prompt_tokens, completion_tokens) in zip(
+                    processes, before, strict=True):
+                attrs['tokens_in'] = (attrs.get('tokens_in', 0)
+                                      + process.prompt_tokens - prompt_tokens)
+                attrs['tokens_out'] = (attrs.get('tokens_out', 0)
+                                       + process.completion_tokens - completion_tokens)
+
+    def _uncached_call(self, messages, **kwargs):
+        return super().call(messages, **kwargs)
+
+
+def call_uncached(llm, messages):
+    """Ask ``llm`` past the response cache, for re-asks and repairs"""
+    if isinstance(llm, CachedLLM):
+        return llm.call(messages, cache=False)
+    return llm.call(messages)
+
+
+def forget_answer(llm, answer):
+    """Drop an unusable answer from the response cache, so retrying the job
+    does not replay it"""
+    if isinstance(llm, CachedLLM):
+        return llm.forget(answer)
+    return 0
+
+
+def build_llm(model=DEFAULT_MODEL):
+    """Build the LLM used by the crews, cached unless LLM_CACHE_DISABLED is set"""
+    cache = get_llm_cache() if llm_cache_enabled() else None
+    return CachedLLM(model=model, cache=cache)
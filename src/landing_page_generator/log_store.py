@@ -0,0 +1,115 @@
+import contextlib
+import re
+import sys
+import threading
+from contextvars import ContextVar
+
+
+class LogRingBuffer():
+    """Fixed-capacity log store with monotonically increasing entry ids.
+
+    Entries live in a preallocated array indexed by ``id % capacity``, so
+    appending never copies and reading the entries after a cursor only
+    touches the entries that are returned. Callers handle locking.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.last_id = 0
+        self._slots = [None] * capacity
+
+    def __len__(self):
+        return min(self.last_id, self.capacity)
+
+    @property
+    def first_id(self):
+        """Id of the oldest entry still held"""
+        return max(1, self.last_id - self.capacity + 1)
+
+    def append(self, entry):
+        """Store ``entry`` under the next id and return that id"""
+        self.last_id += 1
+        entry['id'] = self.last_id
+        self._slots[self.last_id % self.capacity] = entry
+        return self.last_id
+
+    def since(self, cursor=0, limit=None):
+        """Entries with an id greater than ``cursor``, oldest first"""
+        start = max(cursor + 1, self.first_id)
+        end = self.last_id
+        if limit is not None:
+            end = min(end, start + limit - 1)
+        return [self._slots[i % self.capacity] for i in range(start, end + 1)]
+
+
+_ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;?]*[ -/]*[@-~]')
+
+_capture_sink = ContextVar('capture_sink', default=None)
+_install_lock = threading.Lock()
+
+
+class _LineSink():
+    """Buffers captured writes and hands complete, non-blank lines to ``emit``"""
+
+    def __init__(self, emit):
+        self.emit = emit
+        self._buffer = ''
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        with self._lock:
+            self._buffer += text
+            *lines, self._buffer = self._buffer.split('\n')
+        for line in lines:
+            self._emit(line)
+
+    def flush(self):
+        with self._lock:
+            line, self._buffer = self._buffer, ''
+        self._emit(line)
+
+    def _emit(self, line):
+        line = _ANSI_ESCAPE.sub('', line).rstrip()
+        if line.strip():
+            self.emit(line)
+
+
+class _CapturingStream():
+    """stdout proxy that also copies writes to the capture sink of the caller"""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text):
+        sink = _capture_sink.get()
+        if sink is not None:
+            sink.write(text)
+        return self._stream.write(text)
+
+    def flush(self):
+        return self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _install():
+    with _install_lock:
+        if not isinstance(sys.stdout, _CapturingStream):
+            sys.stdout = _CapturingStream(sys.stdout)
+
+
+@contextlib.contextmanager
+def capture_output(emit):
+    """Copy stdout written by this thread/task (crew verbose output) to ``emit``.
+
+    Output still reaches the real stdout. ``emit`` is called once per line.
+    """
+    _install()
+    sink = _LineSink(emit)
+    token = _capture_sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _capture_sink.reset(token)
+        sink.flush()
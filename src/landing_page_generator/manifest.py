@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+
+def content_hash(*parts) -> str:
+    """Stable hash of the given strings"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def file_hash(path):
+    """Hash of a file's text content, or None if it does not exist"""
+    path = Path(path)
+    if not path.is_file():
+        return None
+    return content_hash(path.read_text(encoding='utf-8'))
+
+
+class RunManifest():
+    """Inputs and outputs of the last run in a workspace.
+
+    Records the hash of the idea, the expanded idea, the chosen components
+    and, per component, the hash of the content it was generated from and
+    of the file it produced, so a later run can skip unchanged work.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.data = self._load()
+
+    @classmethod
+    def for_workspace(cls, workspace):
+        return cls(workspace.root / MANIFEST_NAME)
+
+    def _load(self):
+        empty = {'version': MANIFEST_VERSION, 'components': {}}
+        if not self.path.exists():
+            return empty
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable manifest {self.path}: {e}")
+            return empty
+        if data.get('version') != MANIFEST_VERSION:
+            return empty
+        data.setdefault('components', {})
+        return data
+
+    def save(self):
+        """Write the manifest atomically"""
+        with self._lock:
+            payload = json.dumps(self.data, indent=2, ensure_ascii=False)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(payload, encoding='utf-8')
+        os.replace(tmp_path, self.path)
+
+    # Phase 1
+    def expanded_idea_for(self, idea):
+        """Expanded idea recorded for ``idea``, if it is unchanged"""
+        if self.data.get('idea_hash') == content_hash(idea):
+            return self.data.get('expanded_idea')
+        return None
+
+    def record_expanded_idea(self, idea, expanded_idea):
+        with self._lock:
+            self.data['idea_hash'] = content_hash(idea)
+            self.data['expanded_idea'] = expanded_idea
+            self.data['expanded_idea_hash'] = content_hash(expanded_idea)
+
+    # Phase 2
+    def components_for(self, expanded_idea):
+        """Component list recorded for ``expanded_idea``, if it is unchanged"""
+        if self.data.get('template_input_hash') == content_hash(expanded_idea):
+            return self.data.get('component_paths')
+        return None
+
+    def record_components(self, expanded_idea, component_paths):
+        with self._lock:
+            self.data['template_input_hash'] = content_hash(expanded_idea)
+            self.data['component_paths'] = list(component_paths)
+
+    # Phase 3
+    def component_is_current(self, component_path, expanded_idea, file_content):
+        """True if the component was already generated for this expanded idea
+        and the file still holds exactly what that run wrote"""
+        with self._lock:
+            entry = self.data['components'].get(component_path)
+        return bool(entry
+                    and entry.get('expanded_idea_hash') == content_hash(expanded_idea)
+                    and entry.get('output_hash') == content_hash(file_content))
+
+    def record_component(self, component_path, expanded_idea, file_content,
+                         output_path):
+        with self._lock:
+            self.data['components'][component_path] = {
+                'expanded_idea_hash': content_hash(expanded_idea),
+                'input_hash': content_hash(file_content),
+                'output_hash': file_hash(output_path),
+            }
@@ -0,0 +1,104 @@
+import errno
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# How template files are placed in a workdir: 'auto' tries reflink, then
+# hardlink, then falls back to a plain copy
+MATERIALIZE_MODES = ('auto', 'reflink', 'hardlink', 'copy')
+DEFAULT_MODE = os.getenv('TEMPLATE_MATERIALIZATION', 'auto').strip().lower()
+
+# Linux ioctl cloning a whole file (btrfs, xfs, ...)
+_FICLONE = 0x40049409
+
+# Errors meaning "this filesystem cannot do that", not "something is wrong"
+_UNSUPPORTED = {errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP, errno.ENOTTY,
+                errno.EINVAL, errno.EMLINK, errno.ENOSYS}
+
+
+def _reflink(src, dst):
+    if not sys.platform.startswith('linux'):
+        raise OSError(errno.EOPNOTSUPP, 'reflink is only supported on Linux')
+    import fcntl
+
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            os.unlink(dst)
+            raise
+    shutil.copystat(src, dst)
+
+
+_STRATEGIES = {
+    'reflink': _reflink,
+    'hardlink': os.link,
+    'copy': shutil.copy2,
+}
+
+
+def materialize_tree(source, destination, mode=None):
+    """Make ``destination`` a view of the ``source`` tree without copying data.
+
+    Files are reflinked or hardlinked where the filesystem allows it and
+    copied otherwise. Hardlinked files share their data with the source, so
+    anything writing into the tree must call ``break_link`` first. Returns
+    a count of files per strategy used.
+    """
+    mode = mode or DEFAULT_MODE
+    if mode not in MATERIALIZE_MODES:
+        raise ValueError(f"Unknown materialization mode '{mode}', "
+                         f"expected one of {', '.join(MATERIALIZE_MODES)}")
+    if mode == 'auto':
+        candidates = ['reflink', 'hardlink', 'copy']
+    else:
+        candidates = [mode, 'copy'] if mode != 'copy' else ['copy']
+
+    source, destination = Path(source), Path(destination)
+    counts = dict.fromkeys(_STRATEGIES, 0)
+    for root, _dirs, filenames in os.walk(source):
+        target_dir = destination / Path(root).relative_to(source)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        for filename in filenames:
+            src, dst = Path(root) / filename, target_dir / filename
+            while True:
+                strategy = candidates[0]
+                try:
+                    _STRATEGIES[strategy](src, dst)
+                    break
+                except OSError as e:
+                    if strategy == 'copy' or e.errno not in _UNSUPPORTED:
+                        raise
+                    # Unsupported here, no point trying it for the other files
+                    candidates.pop(0)
+            counts[strategy] += 1
+    return counts
+
+
+def break_link(path):
+    """Give ``path`` its own copy of its data if it shares it via a hardlink.
+
+    Must be called before writing to a file that may have been materialized
+    from a template, so the write does not reach the template or other
+    workdirs. Reflinked and copied files are left alone.
+    """
+    path = Path(path)
+    try:
+        if path.is_symlink() or not path.is_file() or path.stat().st_nlink <= 1:
+            return False
+    except OSError:
+        return False
+
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    os.close(fd)
+    try:
+        shutil.copy2(path, tmp_name)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    return True
@@ -0,0 +1,232 @@
+"""Precomputed inventory of the templates, so choosing one takes one LLM call.
+
+``load_catalog`` scans every template listed in ``templates.json`` once.
+For each template it records the page entry (``src/app/page.jsx``,
+``src/app/(main)/page.jsx``, ...), its components with their text sizes,
+whether the page renders them, which ones are pricing sections, and a
+sample of the visible text of its page sections. Scans
+are kept in memory and in ``cache_dir()/template_catalog.json``. A
+template is only scanned again when the size or mtime of one of its
+source files changed.
+"""
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+from component_paths import (
+    COMPONENT_EXTENSIONS,
+    COMPONENTS_DIR,
+    normalize_component_path,
+    page_entry,
+)
+from disk_cache import cache_dir
+from jsx_text import extract_texts
+from materialize import materialize_tree
+
+# Bump when the scanned fields change, so old cache files are ignored
+CATALOG_VERSION = 3
+CATALOG_NAME = 'template_catalog.json'
+# Characters of visible text kept per template, for template_search
+MAX_TEMPLATE_TEXT = 8000
+
+_PRICING_NAME = re.compile(r'pricing|plans?\b|tiers?\b', re.IGNORECASE)
+_PRICING_TEXT = re.compile(
+    r'[$€£]\s?\d|/\s?mo(?:nth)?\b|per month|billed (?:monthly|annually)',
+    re.IGNORECASE)
+_IMPORT_SOURCE = re.compile(r'''\bfrom\s*['"]([^'"]+)['"]''')
+
+_lock = threading.Lock()
+# templates_dir -> {folder: scan}
+_scans = {}
+
+
+def _source_files(template_root):
+    """Code files of a template that the scan reads"""
+    src = template_root / 'src'
+    if not src.is_dir():
+        return []
+    found = []
+    for root, dirs, files in os.walk(src):
+        dirs[:] = sorted(name for name in dirs if name != 'node_modules')
+        for name in sorted(files):
+            if os.path.splitext(name)[1] in COMPONENT_EXTENSIONS:
+                found.append(Path(root) / name)
+    return found
+
+
+def _signature(template_root, files):
+    """Changes whenever a source file is added, removed or modified"""
+    entries = []
+    for path in files:
+        stat = path.stat()
+        entries.append([path.relative_to(template_root).as_posix(),
+                        stat.st_size, stat.st_mtime_ns])
+    return entries
+
+
+def _page_modules(page_source):
+    """``components/...`` modules imported by the page, without extension"""
+    modules = set()
+    for module in _IMPORT_SOURCE.findall(page_source):
+        if 'components/' in module:
+            modules.add(module.split('components/', 1)[1])
+    return modules
+
+
+def scan_template(template_root, folder):
+    """Page entry and components of the template at ``template_root``"""
+    template_root = Path(template_root)
+    page = page_entry(template_root)
+    page_source = page.read_text(encoding='utf-8', errors='replace') if page else ''
+    on_page = _page_modules(page_source)
+    components_dir = template_root.joinpath(*COMPONENTS_DIR)
+
+    components, texts = [], []
+    for path in _source_files(template_root):
+        try:
+            module = path.relative_to(components_dir).with_suffix('').as_posix()
+        except ValueError:
+            continue
+        source = path.read_text(encoding='utf-8', errors='replace')
+        slots = extract_texts(source)
+        if module in on_page or not on_page:
+            texts.extend(slot.text for slot in slots)
+        relative = path.relative_to(components_dir).as_posix()
+        components.append({
+            'path': f"{folder}/{'/'.join(COMPONENTS_DIR)}/{relative}",
+            'name': path.stem,
+            'on_page': module in on_page,
+            'texts': len(slots),
+            'text_chars': sum(len(slot.text) for slot in slots),
+            'pricing': bool(_PRICING_NAME.search(path.stem)
+                            or _PRICING_TEXT.search(source)),
+        })
+    return {
+        'page': page.relative_to(template_root).as_posix() if page else None,
+        'components': components,
+        'has_pricing': any(component['pricing'] for component in components),
+        'text': ' '.join(' '.join(texts).split())[:MAX_TEMPLATE_TEXT],
+    }
+
+
+def _read_templates_config(config_dir):
+    path = Path(config_dir) / 'templates.json'
+    if not path.is_file():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _cache_path():
+    return cache_dir() / CATALOG_NAME
+
+
+def _read_cache(templates_dir):
+    try:
+        with open(_cache_path(), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('version') != CATALOG_VERSION:
+        return {}
+    return data.get('templates', {}).get(str(templates_dir), {})
+
+
+def _write_cache(templates_dir, scans):
+    path = _cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        if data.get('version') != CATALOG_VERSION:
+            data = {'version': CATALOG_VERSION, 'templates': {}}
+        data['templates'][str(templates_dir)] = scans
+        tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}')
+        tmp_path.write_text(json.dumps(data), encoding='utf-8')
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Could not save the template catalog: {e}")
+
+
+def load_catalog(templates_dir, config_dir):
+    """Entries of ``templates.json`` with their scans, for templates that exist.
+
+    Each entry has the config's ``name``, ``theme``, ``folder`` and
+    ``description`` plus ``page``, ``components``, ``has_pricing`` and ``text``.
+    """
+    templates_dir = Path(templates_dir).resolve()
+    catalog = []
+    with _lock:
+        scans = _scans.get(templates_dir)
+        if scans is None:
+            scans = _scans[templates_dir] = _read_cache(templates_dir)
+        changed = False
+        for template in _read_templates_config(config_dir):
+            folder = str(template.get('folder', '')).strip().strip('/')
+            root = (templates_dir / folder).resolve()
+            inside = str(root).startswith(str(templates_dir) + os.sep)
+            if not folder or not inside or not root.is_dir():
+                continue
+            signature = _signature(root, _source_files(root))
+            scan = scans.get(folder)
+            if scan is None or scan['signature'] != signature:
+                scan = dict(scan_template(root, folder), signature=signature)
+                scans[folder] = scan
+                changed = True
+            entry = dict(template, folder=folder)
+            entry.update({key: value for key, value in scan.items()
+                          if key != 'signature'})
+            catalog.append(entry)
+        if changed:
+            _write_cache(templates_dir, scans)
+    return catalog
+
+
+def candidate_components(entry):
+    """Components of a template worth choosing: the sections on its page, never
+    pricing"""
+    components = [component for component in entry['components']
+                  if not component['pricing']]
+    sections = [component for component in components if component['on_page']]
+    return sections or components
+
+
+def render_catalog(catalog):
+    """Compact listing of the catalog for the choose_template prompt"""
+    blocks = []
+    for entry in catalog:
+        lines = [f"{entry.get('name', entry['folder'])} ({entry.get('theme', '')}): "
+                 f"{entry.get('description', '')}",
+                 f"  page: {entry['folder']}/{entry['page']}" if entry['page']
+                 else "  page: none"]
+        for component in candidate_components(entry):
+            lines.append(f"  - {component['path']} ({component['texts']} texts, "
+                         f"{component['text_chars']} characters)")
+        blocks.append('\n'.join(lines))
+    return '\n\n'.join(blocks)
+
+
+def catalog_entry_for(catalog, paths):
+    """The template the component ``paths`` belong to, the first one that matches"""
+    by_depth = sorted(catalog, key=lambda entry: len(entry['folder']), reverse=True)
+    for path in paths or ():
+        path = normalize_component_path(path)
+        for entry in by_depth:
+            if path.startswith(entry['folder'] + '/'):
+                return entry
+    return None
+
+
+def materialize_template(entry, workspace):
+    """Place the template of ``entry`` in the workspace's workdir, once"""
+    destination = workspace.workdir / entry['folder']
+    if destination.exists():
+        return False
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    materialize_tree(workspace.templates_dir / entry['folder'], destination)
+    return True
@@ -0,0 +1,135 @@
+"""Shortlist of the templates that fit an idea, before the LLM sees any.
+
+``TemplateIndex`` holds TF-IDF vectors of the catalog's templates: their
+name, theme and description (weighted up), component names and the
+visible text of their page sections. ``shortlist_templates`` ranks the
+templates by cosine similarity with the expanded idea and keeps the top
+``TEMPLATE_SHORTLIST_SIZE``, so the choose prompt stays the same size as
+the template library grows. An idea sharing no word with any template
+gets the whole catalog. Indexes are rebuilt only when the catalog
+changes.
+"""
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+
+# Templates shown to the choose step, 0 shows all of them
+DEFAULT_SHORTLIST_SIZE = int(os.getenv("TEMPLATE_SHORTLIST_SIZE", "3"))
+# Times the catalog's own words count against the component texts
+DESCRIPTION_WEIGHT = 3
+
+_WORD = re.compile(r'[a-z0-9]+')
+_CAMEL = re.compile(r'(?<=[a-z0-9])(?=[A-Z])')
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have', 'in',
+    'into', 'is', 'it', 'its', 'of', 'on', 'or', 'our', 'so', 'that', 'the', 'their',
+    'them', 'they', 'this', 'to', 'was', 'we', 'will', 'with', 'you', 'your', 'page',
+    'landing', 'template',
+})
+
+_lock = threading.Lock()
+# Catalog fingerprint -> TemplateIndex, for the few catalogs of a process
+_indexes = {}
+_MAX_INDEXES = 8
+
+
+def tokenize(text):
+    """Lowercase words of ``text``, CamelCase split, without stopwords"""
+    text = _CAMEL.sub(' ', str(text)).lower()
+    return [word for word in _WORD.findall(text)
+            if word not in STOPWORDS and len(word) > 1]
+
+
+def template_document(entry):
+    """Words describing the template of a catalog ``entry``"""
+    described = ' '.join(str(entry.get(field, ''))
+                         for field in ('name', 'theme', 'description'))
+    names = ' '.join(component['name'] for component in entry.get('components', ()))
+    return (tokenize(described) * DESCRIPTION_WEIGHT + tokenize(entry.get('folder', ''))
+            + tokenize(names) + tokenize(entry.get('text', '')))
+
+
+class TemplateIndex():
+    """TF-IDF matrix of the templates of a catalog, one L2-normalized row each"""
+
+    def __init__(self, catalog):
+        self.folders = [entry['folder'] for entry in catalog]
+        counts = [Counter(template_document(entry)) for entry in catalog]
+        document_frequency = Counter(word for count in counts for word in count)
+        self.vocabulary = {word: i for i, word in enumerate(sorted(document_frequency))}
+        documents = len(counts)
+        self.idf = np.array(
+            [math.log((1 + documents) / (1 + document_frequency[word])) + 1
+             for word in sorted(document_frequency)], dtype=np.float32)
+        self.matrix = np.zeros((documents, len(self.vocabulary)), dtype=np.float32)
+        for row, count in enumerate(counts):
+            for word, frequency in count.items():
+                self.matrix[row, self.vocabulary[word]] = 1 + math.log(frequency)
+        self.matrix *= self.idf
+        norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
+        self.matrix /= np.where(norms == 0, 1, norms)
+
+    def vector(self, text):
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for word, frequency in Counter(tokenize(text)).items():
+            index = self.vocabulary.get(word)
+            if index is not None:
+                vector[index] = 1 + math.log(frequency)
+        vector *= self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def scores(self, text):
+        """Cosine similarity of ``text`` with every template, in catalog order"""
+        if not self.folders:
+            return np.zeros(0, dtype=np.float32)
+        return self.matrix @ self.vector(text)
+
+    def top(self, text, k):
+        """``[(folder, score)]`` of the ``k`` templates closest to ``text``, best first.
+
+        Ties (e.g. no word of ``text`` is known) keep the catalog order.
+        """
+        scores = self.scores(text)
+        order = np.argsort(-scores, kind='stable')[:k]
+        return [(self.folders[i], float(scores[i])) for i in order]
+
+
+def _fingerprint(catalog):
+    payload = json.dumps([[entry['folder'], entry.get('name'), entry.get('theme'),
+                           entry.get('description'), entry.get('text'),
+                           [component['name']
+                            for component in entry.get('components', ())]]
+                          for entry in catalog], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def template_index(catalog):
+    """The ``TemplateIndex`` of ``catalog``, built once per catalog content"""
+    key = _fingerprint(catalog)
+    with _lock:
+        index = _indexes.get(key)
+        if index is None:
+            if len(_indexes) >= _MAX_INDEXES:
+                _indexes.pop(next(iter(_indexes)))
+            index = _indexes[key] = TemplateIndex(catalog)
+    return index
+
+
+def shortlist_templates(catalog, idea, k=None):
+    """The ``k`` catalog entries closest to ``idea``, best first, with their
+    scores; all of them when nothing in ``idea`` ranks one above another"""
+    k = DEFAULT_SHORTLIST_SIZE if k is None else k
+    if k <= 0 or len(catalog) <= k:
+        return list(catalog), {}
+    by_folder = {entry['folder']: entry for entry in catalog}
+    ranked = template_index(catalog).top(idea, k)
+    if not any(score for _, score in ranked):
+        return list(catalog), {}
+    return [by_folder[folder] for folder, _ in ranked], dict(ranked)
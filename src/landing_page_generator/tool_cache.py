@@ -0,0 +1,71 @@
+import os
+import threading
+
+from disk_cache import DiskCache, cache_dir, make_key
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def tool_cache_enabled() -> bool:
+    return os.getenv("TOOL_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+
+
+def get_tool_cache():
+    """Return the process-wide cache of search results, pages and summaries"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = DiskCache(
+                cache_dir() / "tool_results.sqlite3",
+                ttl=int(os.getenv("TOOL_CACHE_TTL", str(24 * 3600))),
+                stale_ttl=int(os.getenv("TOOL_CACHE_STALE_TTL", str(7 * 24 * 3600))),
+                max_entries=int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "5000")),
+                max_bytes=int(os.getenv("TOOL_CACHE_MAX_BYTES",
+                                        str(512 * 1024 * 1024))),
+            )
+        return _default_cache
+
+
+def _refresh(cache, key, compute):
+    try:
+        cache.set(key, compute())
+    except Exception as e:
+        print(f"⚠️ Background refresh failed, keeping the stale result: {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+
+def cached_result(kind, parts, compute, cache=None):
+    """Return the cached result of ``compute()`` for ``kind`` and ``parts``.
+
+    Fresh entries are returned as is. A stale entry is returned right away
+    while a background thread recomputes it (stale-while-revalidate). On a
+    miss ``compute`` runs inline; its result must be JSON-serializable and is
+    only stored if it returns without raising.
+    """
+    if cache is None:
+        if not tool_cache_enabled():
+            return compute()
+        cache = get_tool_cache()
+
+    key = make_key("tool", kind, parts)
+    found = cache.lookup(key)
+    if found is not None:
+        value, stale = found
+        if stale:
+            with _refreshing_lock:
+                start = key not in _refreshing
+                _refreshing.add(key)
+            if start:
+                threading.Thread(target=_refresh, args=(cache, key, compute),
+                                 name=f"refresh-{kind}", daemon=True).start()
+        return value
+
+    value = compute()
+    cache.set(key, value)
+    return value
@@ -1,38 +1,165 @@
+import contextvars
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-import requests
-from crewai import Agent, Task
+from http_client import get_http_client
+from instrumentation import traced_tool
 from langchain.tools import tool
+from llm_cache import build_llm
+from manifest import content_hash
+from tool_cache import cached_result
 from unstructured.partition.html import partition_html
 
+BROWSERLESS_URL = os.getenv("BROWSERLESS_URL", "https://chrome.browserless.io")
+SUMMARY_CHUNK_SIZE = int(os.getenv("SUMMARY_CHUNK_SIZE", "8000"))
+SUMMARY_MAX_CONCURRENCY = int(os.getenv("SUMMARY_MAX_CONCURRENCY", "4"))
+SUMMARY_REDUCE = os.getenv("SUMMARY_REDUCE", "false").lower() in ("1", "true", "yes")
+
+RESEARCHER_PROMPT = (
+    "You're a Principal Researcher at a big company and you need to do a "
+    "research about a given topic. Do amazing researches and summaries based "
+    "on the content you are working with."
+)
+SUMMARIZE_PROMPT = (
+    "Analyze and summarize the content bellow, make sure to include the most "
+    "relevant information in the summary, return only the summary nothing else."
+    "\n\nCONTENT\n----------\n{content}"
+)
+
+
+def chunk_elements(elements, chunk_size=SUMMARY_CHUNK_SIZE):
+  """Pack the text of page elements into chunks of at most ``chunk_size``
+  characters without cutting an element in two. Only an element longer than
+  a whole chunk is split."""
+  chunks = []
+  current, current_size = [], 0
+  for element in elements:
+    text = str(element).strip()
+    if not text:
+      continue
+    pieces = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+    for piece in pieces:
+      # Account for the blank line joining this piece to the previous one
+      added = len(piece) + (2 if current else 0)
+      if current and current_size + added > chunk_size:
+        chunks.append("\n\n".join(current))
+        current, current_size = [], 0
+        added = len(piece)
+      current.append(piece)
+      current_size += added
+  if current:
+    chunks.append("\n\n".join(current))
+  return chunks
+
+
+class MapReduceSummarizer():
+  """Summarizes page chunks concurrently and optionally merges the summaries.
+
+  Identical chunks are summarized once. At most ``max_concurrency`` LLM
+  calls run at a time. With ``reduce`` the chunk summaries are merged in
+  rounds, each round summarizing groups that fit in one chunk, until a
+  single summary is left. ``llm`` is anything with a crewai-style
+  ``call(messages)``, e.g. ``fake_llm.FakeLLM`` for offline runs.
+  """
+
+  def __init__(self, llm=None, max_concurrency=SUMMARY_MAX_CONCURRENCY,
+               chunk_size=SUMMARY_CHUNK_SIZE, reduce=SUMMARY_REDUCE):
+    self.llm = llm or build_llm()
+    self.max_concurrency = max(1, max_concurrency)
+    self.chunk_size = chunk_size
+    self.reduce = reduce
+
+  def summarize_chunk(self, content):
+    messages = [
+        {"role": "system", "content": RESEARCHER_PROMPT},
+        {"role": "user", "content": SUMMARIZE_PROMPT.format(content=content)},
+    ]
+    return str(self.llm.call(messages)).strip()
+
+  def map(self, chunks):
+    """Summaries of the distinct ``chunks``, in order of first appearance"""
+    unique = list(dict.fromkeys(chunks))
+    if len(unique) <= 1 or self.max_concurrency == 1:
+      return [self.summarize_chunk(chunk) for chunk in unique]
+    workers = min(self.max_concurrency, len(unique))
+    with ThreadPoolExecutor(max_workers=workers,
+                            thread_name_prefix="summarize") as executor:
+      futures = [executor.submit(contextvars.copy_context().run,
+                                 self.summarize_chunk, chunk)
+                 for chunk in unique]
+      return [future.result() for future in futures]
+
+  def merge(self, summaries):
+    """Merge summaries hierarchically until one is left"""
+    summaries = [summary for summary in summaries if summary]
+    while len(summaries) > 1:
+      groups = chunk_elements(summaries, self.chunk_size)
+      if len(groups) >= len(summaries):
+        # Summaries too long to be grouped, merging would not shrink them
+        break
+      summaries = self.map(groups)
+    return summaries[0] if len(summaries) == 1 else "\n\n".join(summaries)
+
+  def settings(self):
+    """What besides the content determines the summary, for cache keys"""
+    return [getattr(self.llm, "model", type(self.llm).__name__),
+            self.chunk_size, self.reduce]
+
+  def summarize(self, elements):
+    """Summary of the text of page ``elements``"""
+    summaries = self.map(chunk_elements(elements, self.chunk_size))
+    if self.reduce and len(summaries) > 1:
+      return self.merge(summaries)
+    return "\n\n".join(summaries)
+
+
+_summarizer = None
+_summarizer_lock = threading.Lock()
+
+
+def get_summarizer():
+  """Summarizer used by the scrape tool, built on first use"""
+  global _summarizer
+  with _summarizer_lock:
+    if _summarizer is None:
+      _summarizer = MapReduceSummarizer()
+    return _summarizer
+
+
+def set_summarizer(summarizer):
+  """Replace the summarizer used by the scrape tool (e.g. one with a fake LLM)"""
+  global _summarizer
+  with _summarizer_lock:
+    _summarizer = summarizer
+
+
+def fetch_page(website):
+  """Rendered HTML of ``website`` as returned by browserless"""
+  token = os.environ['BROWSERLESS_API_KEY']
+  url = f"{BROWSERLESS_URL.rstrip('/')}/content?token={token}"
+  payload = json.dumps({"url": website})
+  headers = {'cache-control': 'no-cache', 'content-type': 'application/json'}
+  response = get_http_client().post(url, headers=headers, data=payload)
+  response.raise_for_status()
+  return response.text
+
 
 class BrowserTools():
 
   @tool("Scrape website content")
+  @traced_tool("scrape_and_summarize_website")
   def scrape_and_summarize_website(website: str) -> str:
     """Useful to scrape and summarize a website content"""
-    url = f"https://chrome.browserless.io/content?token={os.environ['BROWSERLESS_API_KEY']}"
-    payload = json.dumps({"url": website})
-    headers = {'cache-control': 'no-cache', 'content-type': 'application/json'}
-    response = requests.request("POST", url, headers=headers, data=payload)
-    elements = partition_html(text=response.text)
-    content = "\n\n".join([str(el) for el in elements])
-    content = [content[i:i + 8000] for i in range(0, len(content), 8000)]
-    summaries = []
-    for chunk in content:
-      agent = Agent(
-          role='Principal Researcher',
-          goal=
-          'Do amazing researches and summaries based on the content you are working with',
-          backstory=
-          "You're a Principal Researcher at a big company and you need to do a research about a given topic.",
-          allow_delegation=False)
-      task = Task(
-          agent=agent,
-          description=
-          f'Analyze and summarize the content bellow, make sure to include the most relevant information in the summary, return only the summary nothing else.\n\nCONTENT\n----------\n{chunk}'
-      )
-      summary = task.execute()
-      summaries.append(summary)
-    return "\n\n".join(summaries)
+    # Stages are cached separately, so a page fetched again after its HTML
+    # expired still reuses the parsed elements and summary if it is unchanged
+    html = cached_result("html", [website], lambda: fetch_page(website))
+    page_hash = content_hash(html)
+    elements = cached_result(
+        "elements", [page_hash],
+        lambda: [str(el) for el in partition_html(text=html)])
+    summarizer = get_summarizer()
+    return cached_result(
+        "summary", [page_hash, summarizer.settings()],
+        lambda: summarizer.summarize(elements))
@@ -1,12 +1,17 @@
 from langchain.tools import tool
 import os
-from pathlib import Path
 import re
 
+from instrumentation import traced_tool
+from jsx_check import preflight
+from materialize import break_link
+from workspace import current_workspace
+
 
 class FileTools():
 
   @tool("Write File with content")
+  @traced_tool("write_file")
   def write_file(data: str) -> str:
     """Useful to write a file to a given path with a given content. 
        The input to this tool should be a pipe (|) separated text 
@@ -30,8 +35,8 @@ class FileTools():
       if not re.match(r'^[a-zA-Z0-9._/\-]+$', path):
         return "Error: Path contains invalid characters. Only alphanumeric, dots, slashes, and hyphens are allowed."
       
-      # Establish the safe working directory
-      workdir = Path("./workdir").resolve()
+      # Establish the safe working directory of the current run
+      workdir = current_workspace().workdir.resolve()
       
       # Handle path normalization
       if path.startswith("./workdir/"):
@@ -68,10 +73,26 @@ class FileTools():
       # Create parent directories if they don't exist
       resolved_path.parent.mkdir(parents=True, exist_ok=True)
       
-      # Write the file
+      # Keep what was there, problems it already had are not the writer's
+      previous = None
+      if resolved_path.is_file():
+        previous = resolved_path.read_text(encoding="utf-8", errors="replace")
+
+      # Write the file, detaching it from the template it may be linked to
+      break_link(resolved_path)
       with open(resolved_path, "w", encoding="utf-8") as f:
         f.write(content)
       
+      # Check it before anything builds on it, the agent fixes what is left
+      result = preflight(resolved_path, baseline=previous, workdir=workdir,
+                         restore=False)
+      if not result.ok:
+        problems = "\n".join(f"- {problem}" for problem in result.problems)
+        return (f"File written to {resolved_path}, but it will break the build:\n"
+                f"{problems}\nFix only these problems and write the whole file again.")
+      if result.repairs:
+        repairs = ', '.join(result.repairs)
+        return f"File written to {resolved_path} (fixed: {repairs})."
       return f"File written to {resolved_path}."
       
     except ValueError as e:
@@ -1,23 +1,35 @@
 import os
 import json
-import requests
 from langchain.tools import tool
 
+from http_client import get_http_client
+from instrumentation import traced_tool
+from tool_cache import cached_result
+
+SERPER_URL = os.getenv("SERPER_URL", "https://google.serper.dev")
+
+
+def _search(query):
+  """Raw serper.dev response for ``query``"""
+  url = f"{SERPER_URL.rstrip('/')}/search"
+  payload = json.dumps({"q": query})
+  headers = {
+      'X-API-KEY': os.environ['SERPER_API_KEY'],
+      'content-type': 'application/json'
+  }
+  response = get_http_client().post(url, headers=headers, data=payload)
+  response.raise_for_status()
+  return response.json()
+
 
 class SearchTools():
 
   @tool("Search the internet")
+  @traced_tool("search_internet")
   def search_internet(query: str) -> str:
     """Useful to search the internet 
     about a given topic and return relevant results"""
-    url = "https://google.serper.dev/search"
-    payload = json.dumps({"q": query})
-    headers = {
-        'X-API-KEY': os.environ['SERPER_API_KEY'],
-        'content-type': 'application/json'
-    }
-    response = requests.request("POST", url, headers=headers, data=payload)
-    results = response.json()['organic']
+    results = cached_result("search", [query], lambda: _search(query))['organic']
     string = []
     for result in results:
       string.append('\n'.join([
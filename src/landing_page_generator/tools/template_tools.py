@@ -1,19 +1,22 @@
 import json
-import shutil
 import re
-from pathlib import Path
 
 from langchain.tools import tool
 
+from instrumentation import traced_tool
+from materialize import materialize_tree
+from workspace import current_workspace
+
 
 class TemplateTools():
 
   @tool("Learn landing page options")
+  @traced_tool("learn_landing_page_options")
   def learn_landing_page_options(input: str) -> str:
     """Learn the templates at your disposal"""
     try:
       # Safely read the templates configuration file
-      config_path = Path("config/templates.json").resolve()
+      config_path = (current_workspace().config_dir / "templates.json").resolve()
       
       # Validate the config file exists and is readable
       if not config_path.exists():
@@ -31,6 +34,7 @@ class TemplateTools():
       return f"Error reading templates configuration: {str(e)}"
 
   @tool("Copy landing page template to project folder")
+  @traced_tool("copy_landing_page_template_to_project_folder")
   def copy_landing_page_template_to_project_folder(landing_page_template: str) -> str:
     """Copy a landing page template to your project 
     folder so you can start modifying it, it expects 
@@ -51,9 +55,10 @@ class TemplateTools():
       if ".." in template_name or "/" in template_name or "\\" in template_name:
         return "Error: Template name cannot contain path traversal characters."
       
-      # Establish safe base directories
-      templates_base = Path("templates").resolve()
-      workdir_base = Path("workdir").resolve()
+      # Establish safe base directories of the current run
+      workspace = current_workspace()
+      templates_base = workspace.templates_dir.resolve()
+      workdir_base = workspace.workdir.resolve()
       
       # Create source and destination paths
       source_path = templates_base / template_name
@@ -86,8 +91,9 @@ class TemplateTools():
       # Create parent directories if needed
       destination_resolved.parent.mkdir(parents=True, exist_ok=True)
       
-      # Copy the template
-      shutil.copytree(source_resolved, destination_resolved)
+      # Link the template files instead of copying them, FileTools.write_file
+      # gives a file its own copy the first time it is written
+      materialize_tree(source_resolved, destination_resolved)
       
       return f"Template '{template_name}' copied successfully to workdir and ready to be modified. Main files should be under ./{template_name}/src/components, you should focus on those."
       
@@ -0,0 +1,60 @@
+import contextlib
+import os
+from contextvars import ContextVar
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).resolve().parent
+
+
+def default_templates_dir():
+    """Templates shared by all workspaces, ``LANDING_PAGE_TEMPLATES_DIR`` or
+    the package's"""
+    return Path(os.getenv('LANDING_PAGE_TEMPLATES_DIR') or PACKAGE_DIR / 'templates')
+
+
+def default_config_dir():
+    """Configuration shared by all workspaces, ``LANDING_PAGE_CONFIG_DIR`` or
+    the package's"""
+    return Path(os.getenv('LANDING_PAGE_CONFIG_DIR') or PACKAGE_DIR / 'config')
+
+
+class Workspace():
+    """Filesystem roots used by one generation run.
+
+    ``workdir`` is where the template is copied and components are written.
+    Templates and configuration are read-only and shared by default, so many
+    workspaces can run side by side in one process.
+    """
+
+    def __init__(self, root, templates_dir=None, config_dir=None):
+        self.root = Path(root).resolve()
+        self.workdir = self.root / 'workdir'
+        self.templates_dir = Path(templates_dir or default_templates_dir()).resolve()
+        self.config_dir = Path(config_dir or default_config_dir()).resolve()
+
+    @classmethod
+    def from_cwd(cls):
+        """Workspace rooted at the current directory, like the original CLI"""
+        cwd = Path.cwd()
+        return cls(cwd, templates_dir=cwd / 'templates', config_dir=cwd / 'config')
+
+    def __repr__(self):
+        return f"Workspace({str(self.root)!r})"
+
+
+_current_workspace = ContextVar('current_workspace', default=None)
+
+
+def current_workspace():
+    """Workspace of the running generation, or one rooted at the current directory"""
+    return _current_workspace.get() or Workspace.from_cwd()
+
+
+@contextlib.contextmanager
+def use_workspace(workspace):
+    """Make ``workspace`` the one seen by the tools in this thread/task"""
+    token = _current_workspace.set(workspace)
+    try:
+        yield workspace
+    finally:
+        _current_workspace.reset(token)
@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The package's modules import each other as top-level modules
+PACKAGE_DIR = Path(__file__).resolve().parent.parent / 'src' / 'landing_page_generator'
+for path in (PACKAGE_DIR / 'tools', PACKAGE_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+class Clock():
+    """Stand-in for ``time.time`` that only moves when a test moves it"""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze the clock the disk caches expire and evict entries by"""
+    import disk_cache
+
+    clock = Clock()
+    monkeypatch.setattr(disk_cache.time, 'time', clock)
+    return clock
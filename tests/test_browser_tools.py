@@ -0,0 +1,60 @@
+import hashlib
+
+from browser_tools import MapReduceSummarizer, chunk_elements
+from fake_llm import FakeLLM
+
+
+def summarize_content(messages):
+    """Ten character summary of the content of a summarize prompt"""
+    content = messages[-1]['content'].split('CONTENT\n----------\n', 1)[1]
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:10]
+
+
+def test_chunks_break_only_between_elements():
+    elements = ['a' * 30, 'b' * 30, '', 'c' * 30]
+    assert chunk_elements(elements, chunk_size=70) == [
+        'a' * 30 + '\n\n' + 'b' * 30, 'c' * 30]
+
+
+def test_element_longer_than_a_chunk_is_split():
+    chunks = chunk_elements(['x' * 250, 'tail'], chunk_size=100)
+    assert chunks == ['x' * 100, 'x' * 100, 'x' * 50 + '\n\n' + 'tail']
+    assert all(len(chunk) <= 100 for chunk in chunks)
+
+
+def test_identical_chunks_are_summarized_once():
+    llm = FakeLLM(responder=summarize_content)
+    summarizer = MapReduceSummarizer(llm=llm, chunk_size=20, reduce=False)
+    summary = summarizer.summarize(['same paragraph', 'same paragraph', 'other one'])
+    assert llm.calls == 2
+    assert len(summary.split('\n\n')) == 2
+
+
+def test_reduce_merges_summaries_in_levels():
+    prompts = []
+
+    def responder(messages):
+        prompts.append(messages[-1]['content'])
+        return summarize_content(messages)
+
+    llm = FakeLLM(responder=responder)
+    summarizer = MapReduceSummarizer(llm=llm, chunk_size=25, max_concurrency=4,
+                                     reduce=True)
+    elements = [f'paragraph number {i:03d}' for i in range(8)]
+    summary = summarizer.summarize(elements)
+
+    # 8 chunk summaries, merged two at a time: 4, then 2, then 1
+    assert llm.calls == 8 + 4 + 2 + 1
+    # The last level merges the two summaries left into the final one
+    merged = prompts[-1].split('CONTENT\n----------\n', 1)[1].split('\n\n')
+    assert [len(part) for part in merged] == [10, 10]
+    assert summary == summarize_content([{'content': prompts[-1]}])
+
+
+def test_reduce_stops_when_summaries_cannot_be_grouped():
+    llm = FakeLLM(responder=lambda messages: summarize_content(messages) * 3)
+    summarizer = MapReduceSummarizer(llm=llm, chunk_size=40, reduce=True)
+    summary = summarizer.summarize(['a' * 30, 'b' * 30])
+    # Two 30 character summaries do not fit in one chunk, so no merge call
+    assert llm.calls == 2
+    assert [len(part) for part in summary.split('\n\n')] == [30, 30]
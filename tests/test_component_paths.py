@@ -0,0 +1,148 @@
+import json
+
+import pytest
+from component_paths import (
+    extract_string_array,
+    normalize_component_path,
+    template_folder,
+    validate_component_paths,
+)
+
+HERO = 'tpl/src/components/Hero.jsx'
+FEATURES = 'tpl/src/components/Features.jsx'
+
+
+def write_template(root):
+    components = root / 'tpl' / 'src' / 'components'
+    components.mkdir(parents=True)
+    for name in ('Hero', 'Features'):
+        (components / f'{name}.jsx').write_text(
+            f'export default function {name}() {{ return <h2>{name} title</h2> }}\n',
+            encoding='utf-8')
+    app = root / 'tpl' / 'src' / 'app'
+    app.mkdir(parents=True)
+    (app / 'page.jsx').write_text(
+        "import Hero from '@/components/Hero'\n"
+        "import Features from '@/components/Features'\n", encoding='utf-8')
+    (root / 'tpl' / 'notes.md').write_text('not a component', encoding='utf-8')
+
+
+def test_array_is_found_inside_prose_and_code_fences():
+    output = ('Here are the components I picked:\n```json\n'
+              f'["{HERO}", "{FEATURES}"]\n```\nThey cover the page.')
+    assert extract_string_array(output) == [HERO, FEATURES]
+
+
+def test_python_list_literal_is_accepted():
+    assert extract_string_array(f"Final Answer: ['{HERO}']") == [HERO]
+
+
+def test_brackets_inside_strings_and_nested_arrays():
+    assert extract_string_array('["src/[slug]/page.jsx"]') == ['src/[slug]/page.jsx']
+    # The outer array holds lists, the first array of strings inside wins
+    assert extract_string_array(f'[["{HERO}"], ["{FEATURES}"]]') == [HERO]
+
+
+def test_unbalanced_or_missing_array_gives_none():
+    assert extract_string_array(f'["{HERO}", "{FEATURES}"') is None
+    assert extract_string_array('I could not find any components.') is None
+    assert extract_string_array('[]') is None
+    assert extract_string_array('[1, 2]') is None
+
+
+def test_normalize_component_path():
+    assert normalize_component_path(f' `./workdir/{HERO}` ') == HERO
+    assert normalize_component_path('tpl\\src\\components\\Hero.jsx') == HERO
+    assert template_folder('group/tpl-js/src/components/Hero.jsx') == 'group/tpl-js'
+    assert template_folder('Hero.jsx') is None
+
+
+def test_validate_keeps_existing_components_in_order(tmp_path):
+    write_template(tmp_path)
+    valid, rejected = validate_component_paths(
+        [FEATURES, f'./workdir/{HERO}', FEATURES], tmp_path)
+    assert valid == [FEATURES, HERO]
+    assert rejected == {}
+
+
+OUTSIDE = 'not a relative path inside the workdir'
+
+
+@pytest.mark.parametrize('path, reason', [
+    ('../tpl/src/components/Hero.jsx', OUTSIDE),
+    ('tpl/src/components/../../../etc/passwd', OUTSIDE),
+    ('/etc/src/components/passwd', OUTSIDE),
+    ('tpl/notes.md', 'not under src/components'),
+    ('tpl/src/app/page.jsx', 'not under src/components'),
+    ('tpl/src/components/Missing.jsx', 'file does not exist'),
+])
+def test_validate_rejects_paths_outside_a_template(tmp_path, path, reason):
+    write_template(tmp_path)
+    assert validate_component_paths([path], tmp_path) == ([], {path: reason})
+
+
+def test_validate_rejects_symlinks_leaving_the_workdir(tmp_path):
+    workdir, outside = tmp_path / 'workdir', tmp_path / 'outside'
+    write_template(workdir)
+    outside.mkdir()
+    (outside / 'Secret.jsx').write_text('secret', encoding='utf-8')
+    (workdir / 'tpl' / 'src' / 'components' / 'Secret.jsx').symlink_to(
+        outside / 'Secret.jsx')
+    path = 'tpl/src/components/Secret.jsx'
+    assert validate_component_paths([path], workdir) == (
+        [], {path: 'resolves outside the workdir'})
+
+
+@pytest.fixture
+def landing_page_crew(tmp_path, monkeypatch):
+    import crew
+    from fake_llm import FakeLLM
+    from workspace import Workspace
+
+    monkeypatch.setenv('LANDING_PAGE_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(crew, 'CHOOSE_TEMPLATE_MAX_REASKS', 2)
+    templates_dir, config_dir = tmp_path / 'templates', tmp_path / 'config'
+    write_template(templates_dir)
+    config_dir.mkdir()
+    (config_dir / 'templates.json').write_text(json.dumps([{
+        'name': 'Tpl', 'theme': 'Test', 'folder': 'tpl', 'description': 'A test'}]),
+        encoding='utf-8')
+    workspace = Workspace(tmp_path / 'run', templates_dir=templates_dir,
+                          config_dir=config_dir)
+    return crew.LandingPageCrew('a bakery', llm=FakeLLM(), workspace=workspace)
+
+
+def reask_with(monkeypatch, answers):
+    import crew
+
+    prompts = []
+
+    def call_uncached(_llm, messages):
+        prompts.append(messages[-1]['content'])
+        return answers[len(prompts) - 1]
+
+    monkeypatch.setattr(crew, 'call_uncached', call_uncached)
+    return prompts
+
+
+def test_parse_components_places_the_template(landing_page_crew, monkeypatch):
+    prompts = reask_with(monkeypatch, [])
+    assert landing_page_crew._parse_components(f'["{HERO}"]') == [HERO]
+    assert (landing_page_crew.workspace.workdir / HERO).is_file()
+    assert prompts == []
+
+
+def test_parse_components_asks_again_for_an_unusable_list(landing_page_crew,
+                                                          monkeypatch):
+    prompts = reask_with(monkeypatch, [f'Sorry, here: ["{FEATURES}"]'])
+    assert landing_page_crew._parse_components('No idea.') == [FEATURES]
+    assert len(prompts) == 1
+    assert 'no JSON array of paths found' in prompts[0]
+    assert HERO in prompts[0] and FEATURES in prompts[0]
+
+
+def test_parse_components_reasks_are_bounded(landing_page_crew, monkeypatch):
+    prompts = reask_with(monkeypatch, ['["tpl/src/components/Missing.jsx"]'] * 5)
+    with pytest.raises(ValueError, match='none of the paths is a component'):
+        landing_page_crew._parse_components('["../../etc/passwd"]')
+    assert len(prompts) == 2
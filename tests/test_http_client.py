@@ -0,0 +1,107 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from http_client import HttpClient
+from instrumentation import metrics, span
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Answers with the next ``(status, headers, delay)`` of the server's
+    script, then 200"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        with self.server.lock:
+            self.server.requests += 1
+            step = self.server.script.pop(0) if self.server.script else (200, {}, 0)
+        status, headers, delay = step
+        if delay:
+            time.sleep(delay)
+        body = b'{"ok": true}' if status == 200 else b'{"error": "busy"}'
+        try:
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            # The client gave up waiting
+            pass
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ScriptedHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.script = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f'http://127.0.0.1:{server.server_address[1]}/search'
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_5xx_answer_is_retried(server):
+    server.script = [(503, {}, 0)]
+    client = HttpClient(backoff=0)
+    with span('tool', 'search') as attrs:
+        response = client.post(server.url, data='{}')
+
+    assert response.status_code == 200
+    assert server.requests == 2
+    assert attrs['retries'] == 1
+    stats = client.stats()[f'127.0.0.1:{server.server_address[1]}']
+    assert (stats['requests'], stats['retries'], stats['errors']) == (1, 1, 0)
+
+
+def test_429_answer_waits_for_retry_after(server):
+    server.script = [(429, {'Retry-After': '1'}, 0)]
+    client = HttpClient(backoff=0)
+    start = time.perf_counter()
+    with span('tool', 'search') as attrs:
+        response = client.post(server.url, data='{}')
+
+    assert response.status_code == 200
+    assert time.perf_counter() - start >= 0.9
+    assert server.requests == 2
+    assert attrs['retries'] == 1
+
+
+def test_retries_are_bounded(server):
+    server.script = [(503, {}, 0)] * 5
+    client = HttpClient(backoff=0, retries=2)
+    response = client.post(server.url, data='{}')
+
+    assert response.status_code == 503
+    assert server.requests == 3
+    stats = client.stats()[f'127.0.0.1:{server.server_address[1]}']
+    assert (stats['retries'], stats['errors']) == (2, 1)
+
+
+def test_slow_answer_hits_the_read_timeout(server):
+    server.script = [(200, {}, 2)]
+    client = HttpClient(read_timeout=0.2, retries=0)
+    start = time.perf_counter()
+    with pytest.raises(requests.exceptions.RequestException, match='timed out'):
+        client.post(server.url, data='{}')
+
+    assert time.perf_counter() - start < 1.5
+    stats = client.stats()[f'127.0.0.1:{server.server_address[1]}']
+    assert stats['errors'] == 1
+
+
+def test_requests_are_recorded_in_the_process_metrics(server):
+    HttpClient().post(server.url, data='{}')
+    host = f'127.0.0.1:{server.server_address[1]}'
+    assert (f'lpg_http_request_seconds_count{{host="{host}",outcome="ok"}} 1'
+            in metrics.render())
@@ -0,0 +1,142 @@
+from fake_llm import FakeLLM
+from jsx_check import check_source, new_problems, preflight, repair_locally
+
+COMPONENT = 'tpl/src/components/Counter.jsx'
+PAGE = 'tpl/src/app/page.jsx'
+
+COUNTER = '''import { useState } from 'react'
+
+export default function Counter() {
+  const [count, setCount] = useState(0)
+  return <button onClick={() => setCount(count + 1)}>{count}</button>
+}
+'''
+HOME = '''import Hero from '@/components/Hero'
+
+export default function Page() {
+  return (
+    <main>
+      <Hero />
+    </main>
+  )
+}
+'''
+
+
+def kinds(problems):
+    return [problem.kind for problem in problems]
+
+
+def write_template(workdir):
+    template = workdir / 'tpl'
+    (template / 'src' / 'components').mkdir(parents=True)
+    (template / 'src' / 'app').mkdir(parents=True)
+    (template / 'jsconfig.json').write_text('{"compilerOptions": {"paths": {"@/*": '
+                                            '["./src/*"]}}}', encoding='utf-8')
+    (template / 'src' / 'components' / 'Hero.jsx').write_text(
+        "'use client'\n\nexport default function Hero() {\n  return <h1>Hi</h1>\n}\n",
+        encoding='utf-8')
+    (template / 'src' / 'components' / 'Features.jsx').write_text(
+        "'use client'\n\nexport function Features() {\n  return <ul />\n}\n",
+        encoding='utf-8')
+    return template
+
+
+def test_valid_component_has_no_problems():
+    assert check_source("'use client'\n\n" + COUNTER, COMPONENT) == []
+    assert check_source('# Notes {', 'tpl/README.md') == []
+
+
+def test_unbalanced_tag_is_detected():
+    source = ("'use client'\nexport default function A() {\n"
+              "  return <section><div>Hi</section>\n}\n")
+    problems = check_source(source, COMPONENT)
+    assert kinds(problems)[0] == 'syntax'
+    assert '`</section>` closes `<div>`' in str(problems[0])
+    assert problems[0].line == 3
+
+
+def test_unclosed_brace_is_detected():
+    source = "'use client'\nexport default function A() {\n  return <div>ok</div>\n"
+    problems = check_source(source, COMPONENT)
+    assert kinds(problems) == ['unclosed']
+    assert problems[0].fix == '}'
+
+
+def test_new_problems_ignores_what_the_baseline_already_had():
+    broken = "export default function A() {\n  return <div>ok</div>\n"
+    baseline_problems = check_source(broken, COMPONENT)
+    assert kinds(baseline_problems) == ['unclosed', 'use_client']
+    assert new_problems(check_source(broken, COMPONENT), baseline_problems) == []
+
+
+def test_missing_use_client_on_a_hooks_component_is_added():
+    problems = check_source(COUNTER, COMPONENT)
+    assert kinds(problems) == ['use_client']
+    repaired, fixed = repair_locally(COUNTER, problems, COMPONENT)
+    assert fixed == ['use_client']
+    assert repaired.startswith("'use client'\n\nimport { useState }")
+    assert check_source(repaired, COMPONENT) == []
+
+
+def test_page_exporting_metadata_must_not_be_a_client_component():
+    source = "export const metadata = { title: 'Home' }\n" + HOME
+    assert check_source(source, PAGE) == []
+    assert kinds(check_source("'use client'\n" + source, PAGE)) == ['use_client']
+
+
+def test_missing_component_import_is_repaired_locally(tmp_path):
+    workdir = tmp_path / 'workdir'
+    template = write_template(workdir)
+    page = template / 'src' / 'app' / 'page.jsx'
+    source = ("'use client'\nimport Hero from '@/components/Hero'\n\n"
+              "export default function Page() {\n"
+              "  return <main><Hero /><Features /></main>\n}\n")
+    page.write_text(source, encoding='utf-8')
+
+    result = preflight(page, baseline=None, workdir=workdir)
+    assert result.status == 'repaired'
+    assert result.repairs == ['local:import']
+    written = page.read_text(encoding='utf-8')
+    assert "import { Features } from '@/components/Features'\n" in written
+    assert check_source(written, page) == []
+
+
+def test_page_still_broken_after_repair_is_restored(tmp_path):
+    workdir = tmp_path / 'workdir'
+    page = write_template(workdir) / 'src' / 'app' / 'page.jsx'
+    baseline = "'use client'\n" + HOME
+    broken = baseline.replace('</main>', '</main>)')
+    page.write_text(broken, encoding='utf-8')
+    # The repair call answers with the same broken file
+    llm = FakeLLM(responder=lambda _messages: broken)
+
+    result = preflight(page, baseline=baseline, llm=llm, workdir=workdir)
+    assert llm.calls == 1
+    assert result.status == 'restored'
+    assert page.read_text(encoding='utf-8') == baseline
+
+
+def test_page_repaired_by_the_llm_is_kept(tmp_path):
+    workdir = tmp_path / 'workdir'
+    page = write_template(workdir) / 'src' / 'app' / 'page.jsx'
+    baseline = "'use client'\n" + HOME
+    page.write_text(baseline.replace('</main>', '</main>)'), encoding='utf-8')
+    llm = FakeLLM(responder=lambda _messages: f'```jsx\n{baseline}```')
+
+    result = preflight(page, baseline=baseline, llm=llm, workdir=workdir)
+    assert result.status == 'repaired'
+    assert result.repairs == ['llm']
+    assert page.read_text(encoding='utf-8') == baseline
+
+
+def test_broken_page_without_baseline_fails(tmp_path):
+    workdir = tmp_path / 'workdir'
+    page = write_template(workdir) / 'src' / 'app' / 'page.jsx'
+    page.write_text(("'use client'\n" + HOME).replace('</main>', '</main>)'),
+                    encoding='utf-8')
+
+    result = preflight(page, workdir=workdir)
+    assert result.status == 'failed'
+    assert not result.ok
+    assert kinds(result.problems) == ['syntax', 'syntax']
@@ -0,0 +1,73 @@
+from jsx_text import extract_texts, parse_replacements, splice
+
+COMPONENT = '''import Link from 'next/link'
+
+const features = [
+  { title: 'Fast setup', href: '/start', icon: 'Bolt' },
+  { title: 'Team sharing', description: 'Invite the whole team.' },
+]
+
+export default function Features({ expanded }) {
+  return (
+    <section className="py-12">
+      <h2>Built for teams</h2>&nbsp;
+      <img src="/hero.png" alt="Team at work" />
+      <p>{expanded ? 'Show all' : 'Nothing yet'}</p>
+    </section>
+  )
+}
+'''
+
+
+def texts(source):
+    return [slot.text for slot in extract_texts(source)]
+
+
+def test_extract_texts_finds_visible_texts_in_source_order():
+    assert texts(COMPONENT) == [
+        'Fast setup', 'Team sharing', 'Invite the whole team.', 'Built for teams',
+        'Team at work', 'Show all', 'Nothing yet',
+    ]
+    assert [slot.id for slot in extract_texts(COMPONENT)] == [
+        't1', 't2', 't3', 't4', 't5', 't6', 't7']
+
+
+def test_extract_texts_keeps_both_branches_of_a_ternary():
+    source = "const label = open ? 'Hide details' : 'Show details'"
+    assert texts(source) == ['Hide details', 'Show details']
+
+
+def test_extract_texts_skips_object_keys_and_case_labels():
+    source = '''const plans = { 'Starter plan': 'For small teams' }
+switch (plan) { case 'Pro plan': return 'Best value' }'''
+    assert texts(source) == ['For small teams', 'Best value']
+
+
+def test_extract_texts_skips_entity_only_text():
+    assert texts('const a = <p>&nbsp;</p>') == []
+    assert texts('const a = <p>&nbsp;Hi there</p>') == ['&nbsp;Hi there']
+
+
+def test_splice_replaces_texts_and_escapes_them_for_their_kind():
+    slots = extract_texts(COMPONENT)
+    updated, replaced = splice(COMPONENT, slots, {
+        't1': "Set up in 'minutes'",
+        't4': 'Plans {and} <pricing>',
+        't5': 'A "happy" team',
+        't7': '   ',
+    })
+    assert replaced == 3
+    assert "title: 'Set up in \\'minutes\\''" in updated
+    assert '<h2>Plans &#123;and&#125; &lt;pricing&gt;</h2>' in updated
+    assert 'alt="A &quot;happy&quot; team"' in updated
+    # Blank replacements keep the original text
+    assert "'Nothing yet'" in updated
+    assert texts(updated)[0] == "Set up in \\'minutes\\'"
+
+
+def test_parse_replacements_reads_json_and_lines_for_known_ids():
+    slots = extract_texts(COMPONENT)
+    answer = '```json\n{"t1": "Quick start", "t99": "Unknown"}\n```'
+    assert parse_replacements(answer, slots) == {'t1': 'Quick start'}
+    assert parse_replacements('t2: Shared spaces\nt3 = "Bring everyone"') == {
+        't2': 'Shared spaces', 't3': 'Bring everyone'}
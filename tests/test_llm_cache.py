@@ -0,0 +1,101 @@
+import pytest
+from disk_cache import DiskCache
+from fake_llm import FakeLLM
+from llm_cache import llm_cache_key
+
+PROMPT = [{"role": "user", "content": "Expand the idea: a bakery in Lisbon"}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = DiskCache(tmp_path / 'llm.sqlite3', ttl=60)
+    yield cache
+    cache.close()
+
+
+def test_key_changes_with_model_prompt_and_tools():
+    key = llm_cache_key('model-a', PROMPT)
+    assert key == llm_cache_key('model-a', list(PROMPT))
+    assert key != llm_cache_key('model-b', PROMPT)
+    assert key != llm_cache_key('model-a', [{"role": "user", "content": "Other idea"}])
+    assert key != llm_cache_key('model-a', PROMPT, tools=[{'name': 'search'}])
+
+
+def test_identical_call_is_answered_from_the_cache(cache):
+    llm = FakeLLM(cache=cache)
+    first = llm.call(PROMPT)
+    assert llm.call(PROMPT) == first
+    assert llm.calls == 1
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+    llm.call([{"role": "user", "content": "Another idea"}])
+    assert llm.calls == 2
+
+
+def test_uncached_call_skips_the_cache(cache):
+    llm = FakeLLM(cache=cache)
+    llm.call(PROMPT)
+    llm.call(PROMPT, cache=False)
+    assert llm.calls == 2
+
+
+def test_entries_expire_after_the_ttl(cache, clock):
+    llm = FakeLLM(cache=cache)
+    llm.call(PROMPT)
+    clock.now += 59
+    llm.call(PROMPT)
+    assert llm.calls == 1
+    clock.now += 2
+    llm.call(PROMPT)
+    assert llm.calls == 2
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock):
+    cache = DiskCache(tmp_path / 'llm.sqlite3', max_entries=2)
+    for key in ('a', 'b'):
+        cache.set(key, key)
+        clock.now += 1
+    assert cache.get('a') == 'a'
+    clock.now += 1
+    cache.set('c', 'c')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 'a'
+    assert cache.get('c') == 'c'
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['entries'] == 2
+    cache.close()
+
+
+def test_size_bound_evicts_entries(tmp_path, clock):
+    cache = DiskCache(tmp_path / 'llm.sqlite3', max_bytes=250)
+    for i in range(5):
+        cache.set(f'key-{i}', 'x' * 100)
+        clock.now += 1
+    stats = cache.stats()
+    assert stats['bytes'] <= 250
+    assert cache.get('key-4') is not None
+    assert cache.get('key-0') is None
+    cache.close()
+
+
+def test_stats_count_hits_and_misses(cache):
+    cache.set('known', 'value')
+    cache.get('known')
+    cache.get('unknown')
+    cache.get('unknown')
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['writes']) == (1, 2, 1)
+    assert stats['hit_rate'] == pytest.approx(1 / 3)
+
+
+def test_forget_drops_the_cached_answer(cache):
+    llm = FakeLLM(cache=cache)
+    answer = llm.call(PROMPT)
+    assert llm.forget(answer) == 1
+    assert cache.stats()['entries'] == 0
+    llm.call(PROMPT)
+    assert llm.calls == 2
+    assert llm.forget('never answered') == 0
@@ -0,0 +1,70 @@
+from template_search import shortlist_templates, template_index, tokenize
+
+
+def entry(folder, name, description, components=(), text=''):
+    return {
+        'folder': folder, 'name': name, 'theme': '', 'description': description,
+        'components': [{'name': component} for component in components],
+        'text': text,
+    }
+
+
+CATALOG = [
+    entry('tailwindui-spotlight', 'Spotlight', 'A personal website and blog',
+          ['Hero', 'Articles'], 'Writing about software design'),
+    entry('tailwindui-salient', 'Salient', 'SaaS marketing site',
+          ['Hero', 'Pricing', 'Testimonials'], 'Accounting made simple for teams'),
+    entry('tailwindui-pocket', 'Pocket', 'Mobile app landing page',
+          ['AppDownload', 'Faqs'], 'Invest at the perfect time with the app'),
+    entry('tailwindui-studio', 'Studio', 'Agency website for a design studio',
+          ['CaseStudies', 'Clients'], 'Award winning design agency in Denmark'),
+]
+
+
+def folders(entries):
+    return [item['folder'] for item in entries]
+
+
+def test_tokenize_splits_camel_case_and_drops_stopwords():
+    assert tokenize('The AppDownload section for your page') == [
+        'app', 'download', 'section']
+
+
+def test_relevant_template_ranks_first():
+    shortlist, scores = shortlist_templates(
+        CATALOG, 'A mobile app to invest your savings', k=2)
+    assert folders(shortlist)[0] == 'tailwindui-pocket'
+    assert list(scores) == folders(shortlist)
+    assert scores['tailwindui-pocket'] > 0
+
+    shortlist, _ = shortlist_templates(CATALOG, 'Case studies of our design agency',
+                                       k=1)
+    assert folders(shortlist) == ['tailwindui-studio']
+
+
+def test_k_is_respected():
+    for k in (1, 2, 3):
+        shortlist, scores = shortlist_templates(CATALOG, 'design website', k=k)
+        assert len(shortlist) == len(scores) == k
+
+
+def test_small_catalog_or_no_limit_returns_everything():
+    assert shortlist_templates(CATALOG, 'design', k=4) == (CATALOG, {})
+    assert shortlist_templates(CATALOG, 'design', k=0) == (CATALOG, {})
+
+
+def test_empty_or_unknown_idea_returns_the_whole_catalog():
+    assert shortlist_templates(CATALOG, '', k=2) == (CATALOG, {})
+    assert shortlist_templates(CATALOG, 'zzyzx quuxplorer', k=2) == (CATALOG, {})
+
+
+def test_changed_catalog_rebuilds_the_index():
+    index = template_index(CATALOG)
+    assert template_index([dict(item) for item in CATALOG]) is index
+
+    changed = CATALOG[:3] + [dict(CATALOG[3], description='Bakery in Lisbon')]
+    rebuilt = template_index(changed)
+    assert rebuilt is not index
+    assert 'bakery' in rebuilt.vocabulary
+    shortlist, _ = shortlist_templates(changed, 'A bakery', k=1)
+    assert folders(shortlist) == ['tailwindui-studio']
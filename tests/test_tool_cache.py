@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+from disk_cache import DiskCache
+from tool_cache import cached_result
+
+
+class Compute():
+    """Counting ``compute``; once ``hold`` is set, waits for ``release``"""
+
+    def __init__(self):
+        self.calls = 0
+        self.hold = False
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        if self.hold:
+            self.started.set()
+            self.release.wait(5)
+        return f'result {self.calls}'
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = DiskCache(tmp_path / 'tools.sqlite3', ttl=10, stale_ttl=100)
+    yield cache
+    cache.close()
+
+
+def refresh_threads():
+    return [thread for thread in threading.enumerate()
+            if thread.name == 'refresh-search']
+
+
+def test_stale_result_is_served_while_it_is_refreshed_once(cache, clock):
+    compute = Compute()
+    assert cached_result('search', ['bakery'], compute, cache=cache) == 'result 1'
+    clock.now += 5
+    assert cached_result('search', ['bakery'], compute, cache=cache) == 'result 1'
+    assert compute.calls == 1
+
+    # Expired but within stale_ttl: served as is, refreshed in the background
+    clock.now += 10
+    compute.hold = True
+    assert cached_result('search', ['bakery'], compute, cache=cache) == 'result 1'
+    assert compute.started.wait(5)
+    assert cached_result('search', ['bakery'], compute, cache=cache) == 'result 1'
+    assert len(refresh_threads()) == 1
+    compute.release.set()
+    for thread in refresh_threads():
+        thread.join(5)
+    assert compute.calls == 2
+
+    assert cached_result('search', ['bakery'], compute, cache=cache) == 'result 2'
+    assert compute.calls == 2
+
+
+def test_result_past_the_stale_ttl_is_recomputed_inline(cache, clock):
+    compute = Compute()
+    cached_result('search', ['bakery'], compute, cache=cache)
+    clock.now += 10 + 100 + 1
+    assert cached_result('search', ['bakery'], compute, cache=cache) == 'result 2'
+    assert compute.calls == 2
+    assert not refresh_threads()
+
+
+def test_failed_refresh_keeps_the_stale_result(cache, clock):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError('search API down')
+        return 'result 1'
+
+    cached_result('search', ['bakery'], compute, cache=cache)
+    clock.now += 15
+    assert cached_result('search', ['bakery'], compute, cache=cache) == 'result 1'
+    for thread in refresh_threads():
+        thread.join(5)
+    assert len(calls) == 2
+    assert cached_result('search', ['bakery'], compute, cache=cache) == 'result 1'
+    for thread in refresh_threads():
+        thread.join(5)
+
+
+def test_parts_and_kind_key_the_result(cache):
+    compute = Compute()
+    cached_result('search', ['bakery'], compute, cache=cache)
+    cached_result('search', ['florist'], compute, cache=cache)
+    cached_result('html', ['bakery'], compute, cache=cache)
+    assert compute.calls == 3